@@ -0,0 +1,46 @@
+"""Compares loading a screen with 15 separate requests against a
+single batch request, with the sub-requests handled sequentially
+and in parallel.
+
+Usage:
+    python -m benchmarks.bench_batch
+"""
+import timeit
+from flask import Flask, request
+from flask_mux import Mux, Router
+
+SCREEN = [f'/api/widgets/{i}' for i in range(15)]
+
+
+def get_widget(id):
+    return {'id': id, 'user': request.headers.get('Authorization')}
+
+
+def main(number: int = 300):
+    router = Router(__name__)
+    router.get('/widgets/<int:id>', get_widget)
+
+    app = Flask(__name__)
+    mux = Mux(app)
+    mux.use('/api', router)
+    mux.batch('/batch')
+    mux.batch('/batch/parallel', parallel=True, endpoint='mux_batch_parallel')
+    client = app.test_client()
+    headers = {'Authorization': 'token'}
+    batch = [{'path': path} for path in SCREEN]
+
+    def separate():
+        for path in SCREEN:
+            client.get(path, headers=headers)
+
+    for label, load in (
+        ('separate', separate),
+        ('batch', lambda: client.post('/batch', headers=headers, json=batch)),
+        ('parallel', lambda: client.post('/batch/parallel', headers=headers, json=batch)),
+    ):
+        elapsed = timeit.timeit(load, number=number)
+        print(f'{label:>10} {elapsed / number * 1e6:>8.1f}us')
+
+
+if __name__ == '__main__':
+    main()
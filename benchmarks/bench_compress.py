@@ -0,0 +1,79 @@
+"""Measures the throughput and the peak memory of the compress
+middleware, on a buffered JSON response and on a CSV response
+streamed from a generator, compared to compressing the whole body
+of the streamed response at once.
+
+Usage:
+    python -m benchmarks.bench_compress [megabytes]
+"""
+import gzip
+import sys
+import time
+import tracemalloc
+from flask import Flask, Response, request
+from flask_mux import Mux, Router
+from flask_mux.middlewares import compress
+
+LINE = '{id},item {id},2026-01-01T00:00:00,{price}\n'
+
+
+def create_app(megabytes: int) -> Flask:
+    lines = megabytes * 1024 * 1024 // len(LINE.format(id=0, price=0.0))
+    rows = [{'id': i, 'name': f'item {i}', 'price': i / 100} for i in range(lines // 4)]
+
+    def get_items():
+        return {'items': rows}
+
+    def export():
+        return Response((LINE.format(id=i, price=i / 100) for i in range(lines)), mimetype='text/csv')
+
+    def export_buffered():
+        body = ''.join(LINE.format(id=i, price=i / 100) for i in range(lines)).encode()
+        if 'gzip' not in request.accept_encodings:
+            return Response(body, mimetype='text/csv')
+        return Response(gzip.compress(body, 6), mimetype='text/csv', headers={'Content-Encoding': 'gzip'})
+
+    router = Router(__name__)
+    router.get('/items', compress(), get_items)
+    router.get('/export', compress(), export)
+    router.get('/export-buffered', export_buffered)
+    app = Flask(__name__)
+    Mux(app).use('/', router)
+    return app
+
+
+def measure(client, path: str, encoding: str = 'gzip', trace: bool = False):
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    rv = client.get(path, headers={'Accept-Encoding': encoding}, buffered=False)
+    size = sum(len(chunk) for chunk in rv.response)
+    rv.close()
+    elapsed = time.perf_counter() - start
+    peak = 0
+    if trace:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return elapsed, size, peak
+
+
+def main(megabytes: int = 32):
+    client = create_app(megabytes).test_client()
+    print(f"{'response':>24} {'identity':>12} {'gzip':>12} {'size':>14} {'peak memory':>12}")
+    for path, label in (
+        ('/items', 'buffered json'),
+        ('/export', 'streamed csv'),
+        ('/export-buffered', 'csv compressed at once'),
+    ):
+        identity, raw, _ = measure(client, path, 'identity')
+        elapsed, size, _ = measure(client, path)
+        _, _, peak = measure(client, path, trace=True)
+        mb = raw / 2 ** 20
+        print(
+            f'{label:>24} {mb / identity:>8.1f}MB/s {mb / elapsed:>8.1f}MB/s'
+            f' {mb:>5.1f}->{size / 2 ** 20:>4.1f}MB {peak / 2 ** 20:>10.1f}MB'
+        )
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
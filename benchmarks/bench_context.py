@@ -0,0 +1,47 @@
+"""Compares a guard chain (is_auth, is_admin, view) decoding the
+Authorization header in every stage against decoding it once into
+a context Key, and reports the cost of a Key lookup.
+
+Usage:
+    python -m benchmarks.bench_context
+"""
+import base64
+import json
+import timeit
+from flask import Flask, request
+from flask_mux.context import Key
+
+TOKEN = base64.b64encode(json.dumps({'id': 7, 'name': 'alice', 'admin': True}).encode()).decode()
+
+
+def decode():
+    return json.loads(base64.b64decode(request.headers['Authorization']))
+
+
+CURRENT_USER = Key('user', factory=decode)
+
+
+def main(number: int = 50_000):
+    app = Flask(__name__)
+
+    def per_stage():
+        # is_auth, is_admin and the view function
+        return decode()['id'] and decode()['admin'] and decode()['name']
+
+    def once():
+        # the values of a new request are empty
+        CURRENT_USER.unset()
+        return CURRENT_USER.get()['id'] and CURRENT_USER.get()['admin'] and CURRENT_USER.get()['name']
+
+    with app.test_request_context(headers={'Authorization': TOKEN}):
+        decoded = timeit.timeit(per_stage, number=number)
+        keyed = timeit.timeit(once, number=number)
+        lookup = timeit.timeit(CURRENT_USER.get, number=number)
+
+    print(f"{'decode per stage':>18} {decoded / number * 1e6:>8.2f}us")
+    print(f"{'decode once (Key)':>18} {keyed / number * 1e6:>8.2f}us")
+    print(f"{'Key.get':>18} {lookup / number * 1e6:>8.2f}us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Compares the time spent matching requests with werkzeug, the
+static routes table and the trie dispatcher, with 100, 1k and 10k
+routes.
+
+Usage:
+    python -m benchmarks.bench_dispatch [routes ...]
+"""
+import random
+import sys
+import timeit
+from flask import Flask
+from flask_mux import Mux, Router
+from flask_mux.dispatch import Trie
+
+ROUTES_PER_ROUTER = 20
+
+
+def view(id=None):
+    return {'id': id}
+
+
+def create_app(routes: int) -> Flask:
+    app = Flask(__name__)
+    routers = {}
+    for i in range(0, routes, ROUTES_PER_ROUTER):
+        router = Router(__name__)
+        for j in range(ROUTES_PER_ROUTER):
+            router.get(f'/resource-{j}/<int:id>', view)
+        router.get('/health', view)
+        routers[f'/namespace-{i}'] = router
+    Mux(app).use_many(routers)
+    return app
+
+
+def main(sizes, number: int = 2_000):
+    print(f"{'routes':>8} {'werkzeug':>12} {'trie':>12} {'static (werkzeug)':>18} {'static (table)':>15}")
+    for size in sizes:
+        app = create_app(size)
+        paths = [
+            f'/namespace-{random.randrange(0, size, ROUTES_PER_ROUTER)}'
+            f'/resource-{random.randrange(ROUTES_PER_ROUTER)}/{i}'
+            for i in range(number)
+        ]
+
+        adapter = app.url_map.bind('localhost')
+        adapter.match(paths[0])
+        werkzeug = timeit.timeit(lambda: [adapter.match(path, 'GET', return_rule=True) for path in paths], number=1)
+
+        trie = Trie(app.url_map)
+        dispatcher = timeit.timeit(lambda: [trie.match(path, 'GET') for path in paths], number=1)
+
+        static_paths = [f'/namespace-{random.randrange(0, size, ROUTES_PER_ROUTER)}/health' for _ in range(number)]
+        static_werkzeug = timeit.timeit(lambda: [adapter.match(path, 'GET', return_rule=True) for path in static_paths], number=1)
+        table = trie.static_rules()
+        static_table = timeit.timeit(lambda: [table.get(('GET', path)) for path in static_paths], number=1)
+
+        timings = (werkzeug, dispatcher, static_werkzeug, static_table)
+        print(f'{size:>8} ' + ' '.join(
+            f'{t / number * 1e6:>{width}.1f}us' for t, width in zip(timings, (10, 10, 16, 13))
+        ))
+
+
+if __name__ == '__main__':
+    main([int(size) for size in sys.argv[1:]] or [100, 1_000, 10_000])
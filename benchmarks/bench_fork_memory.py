@@ -0,0 +1,97 @@
+"""Reports the shared and private memory of forked workers serving
+requests, with and without Mux.freeze() being called before forking.
+
+Linux only, relies on /proc/<pid>/smaps_rollup.
+
+Usage:
+    python -m benchmarks.bench_fork_memory [workers] [routes]
+"""
+import gc
+import os
+import sys
+import time
+from flask import Flask
+from flask_mux import Mux, Router
+
+ROUTES_PER_ROUTER = 50
+
+
+def view(id):
+    return {'id': id}
+
+
+def create_app(routes: int, freeze: bool):
+    app = Flask(__name__)
+    mux = Mux(app)
+    routers = {}
+    for i in range(0, routes, ROUTES_PER_ROUTER):
+        router = Router(__name__)
+        for j in range(ROUTES_PER_ROUTER):
+            router.get(f'/resource-{j}/<int:id>', view)
+        routers[f'/namespace-{i}'] = router
+    mux.use_many(routers)
+
+    if freeze:
+        mux.freeze()
+    return app
+
+
+def memory(pid: int) -> dict:
+    stats = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                stats[parts[0].rstrip(':')] = int(parts[1])
+    return {
+        'shared': stats.get('Shared_Clean', 0) + stats.get('Shared_Dirty', 0),
+        'private': stats.get('Private_Clean', 0) + stats.get('Private_Dirty', 0),
+    }
+
+
+def worker(app: Flask, done_fd: int):
+    client = app.test_client()
+    for i in range(200):
+        client.get(f'/namespace-0/resource-{i % ROUTES_PER_ROUTER}/{i}')
+    gc.collect()
+    os.close(done_fd)
+    time.sleep(60)
+
+
+def measure(workers: int, routes: int, freeze: bool) -> dict:
+    app = create_app(routes, freeze)
+    pids = []
+    for _ in range(workers):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            worker(app, write_fd)
+            os._exit(0)
+        os.close(write_fd)
+        # the pipe is closed once the worker handled its requests
+        os.read(read_fd, 1)
+        os.close(read_fd)
+        pids.append(pid)
+
+    stats = [memory(pid) for pid in pids]
+    for pid in pids:
+        os.kill(pid, 9)
+        os.waitpid(pid, 0)
+
+    if freeze:
+        gc.unfreeze()
+    return {key: sum(s[key] for s in stats) / len(stats) for key in ('shared', 'private')}
+
+
+def main(workers: int, routes: int):
+    print(f'{workers} workers, {routes} routes (average per worker)')
+    for freeze in (False, True):
+        stats = measure(workers, routes, freeze)
+        label = 'freeze' if freeze else 'no freeze'
+        print(f"{label:>10}: shared {stats['shared']:>8.0f} kB, private {stats['private']:>8.0f} kB")
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [4, 20_000][len(args):]))
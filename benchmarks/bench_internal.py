@@ -0,0 +1,36 @@
+"""Compares calling an endpoint of the app in-process with
+Mux.dispatch against going through the test client, i.e. the app's
+WSGI application.
+
+Usage:
+    python -m benchmarks.bench_internal
+"""
+import timeit
+from flask import Flask, request
+from flask_mux import Mux, Router
+
+
+def get_order(id):
+    return {'id': id, 'user': request.headers.get('Authorization')}
+
+
+def main(number: int = 5_000):
+    router = Router(__name__)
+    router.get('/orders/<int:id>', get_order)
+
+    app = Flask(__name__)
+    mux = Mux(app)
+    mux.use('/api', router)
+    client = app.test_client()
+    headers = {'Authorization': 'token'}
+
+    for label, call in (
+        ('test client', lambda: client.get('/api/orders/1', headers=headers).json),
+        ('dispatch', lambda: mux.dispatch('GET', '/api/orders/1', headers=headers).json),
+    ):
+        elapsed = timeit.timeit(call, number=number)
+        print(f'{label:>12} {elapsed / number * 1e6:>8.1f}us')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""Compares building JSON responses with Flask's generic response
+conversion and with the fast JSON path of the compiled pipelines,
+for a typical dict body, a (dict, status) rejection and a constant
+rejection.
+
+Usage:
+    python -m benchmarks.bench_json
+"""
+import timeit
+from flask import Flask
+from flask_mux.responses import ConstantJSON, compile_encoder, json_responses
+
+ITEM = {
+    'id': 42,
+    'name': 'item 42',
+    'price': 12.5,
+    'tags': ['a', 'b', 'c'],
+    'owner': {'id': 7, 'name': 'owner', 'active': True},
+}
+UNAUTHORIZED = ConstantJSON({'success': False, 'message': 'unauthorized access'}, 401)
+
+
+def get_item():
+    return ITEM
+
+
+def reject():
+    return {'success': False, 'message': 'unauthorized access'}, 401
+
+
+def reject_constant():
+    return UNAUTHORIZED
+
+
+def main(number: int = 50_000):
+    app = Flask(__name__)
+    encode = compile_encoder(app)
+
+    print(f"{'response':>20} {'flask':>10} {'fast':>10}")
+    with app.test_request_context():
+        for label, view in (('dict', get_item), ('(dict, status)', reject), ('constant', reject_constant)):
+            fast_view = json_responses(view, encode)
+            flask = timeit.timeit(lambda: app.make_response(view()), number=number)
+            fast = timeit.timeit(lambda: app.make_response(fast_view()), number=number)
+            print(f'{label:>20} {flask / number * 1e6:>8.1f}us {fast / number * 1e6:>8.1f}us')
+
+
+if __name__ == '__main__':
+    main()
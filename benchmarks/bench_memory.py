@@ -0,0 +1,48 @@
+"""Measures the memory allocated per registered route.
+
+Usage:
+    python -m benchmarks.bench_memory [routes]
+"""
+import sys
+import tracemalloc
+from flask import Flask
+from flask_mux import Mux, Router
+from flask_mux.mux import Rule
+
+
+def view(id):
+    return {'id': id}
+
+
+def measure(fn):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    rv = fn()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    return rv, size
+
+
+def main(routes: int):
+    def create_router():
+        router = Router(__name__)
+        for i in range(routes):
+            router.get(f'/resource-{i}/<int:id>', view)
+        return router
+
+    router, router_size = measure(create_router)
+    _, rules_size = measure(lambda: [Rule.create_from_route(route) for route in router.routes])
+
+    app = Flask(__name__)
+    mux = Mux(app)
+    _, mux_size = measure(lambda: mux.use('/api', router))
+
+    print(f'routes: {routes}')
+    print(f'Router (Route objects): {router_size / routes:>8.0f} bytes/route')
+    print(f'Rule objects: {rules_size / routes:>8.0f} bytes/route')
+    print(f'Mux.use (rules + url map): {mux_size / routes:>8.0f} bytes/route')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
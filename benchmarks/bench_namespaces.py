@@ -0,0 +1,67 @@
+"""Compares matching requests against the app's url map with matching
+them against the url map of their namespace (isolated=True), and the
+time spent rebuilding the url maps after mounting one more router,
+with 1k and 10k routes.
+
+Usage:
+    python -m benchmarks.bench_namespaces [routes ...]
+"""
+import random
+import sys
+import timeit
+from flask import Flask
+from flask_mux import Mux, Router
+
+ROUTES_PER_ROUTER = 20
+
+
+def view(id=None):
+    return {'id': id}
+
+
+def create_router() -> Router:
+    router = Router(__name__)
+    for j in range(ROUTES_PER_ROUTER):
+        router.get(f'/resource-{j}/<int:id>', view)
+    return router
+
+
+def create_mux(routes: int, isolated: bool) -> Mux:
+    mux = Mux(Flask(__name__))
+    for i in range(0, routes, ROUTES_PER_ROUTER):
+        mux.use(f'/namespace-{i}', create_router(), isolated=isolated)
+    return mux
+
+
+def match(mux: Mux, paths):
+    for path in paths:
+        with mux.app.test_request_context(path):
+            pass
+
+
+def main(sizes, number: int = 2_000):
+    print(f"{'routes':>8} {'global':>12} {'isolated':>12} {'rebuild (global)':>17} {'rebuild (isolated)':>19}")
+    for size in sizes:
+        paths = [
+            f'/namespace-{random.randrange(0, size, ROUTES_PER_ROUTER)}'
+            f'/resource-{random.randrange(ROUTES_PER_ROUTER)}/{i}'
+            for i in range(number)
+        ]
+        timings = []
+        rebuilds = []
+        for isolated in (False, True):
+            mux = create_mux(size, isolated)
+            match(mux, paths[:1])
+            timings.append(timeit.timeit(lambda: match(mux, paths), number=1) / number)
+
+            mux.use('/extra', create_router(), isolated=isolated)
+            rebuilds.append(timeit.timeit(lambda: match(mux, paths[:1]), number=1))
+
+        print(
+            f'{size:>8} {timings[0] * 1e6:>10.1f}us {timings[1] * 1e6:>10.1f}us'
+            f' {rebuilds[0] * 1e3:>15.1f}ms {rebuilds[1] * 1e3:>17.1f}ms'
+        )
+
+
+if __name__ == '__main__':
+    main([int(size) for size in sys.argv[1:]] or [1_000, 10_000])
@@ -0,0 +1,40 @@
+"""Measures the per-request overhead of middleware chains of growing
+length.
+
+Usage:
+    python -m benchmarks.bench_pipeline
+"""
+import timeit
+from functools import wraps
+from flask import Flask
+from flask_mux import Router
+
+
+def passthrough(next_middleware):
+    @wraps(next_middleware)
+    def wrapper(*args, **kwargs):
+        return next_middleware(*args, **kwargs)
+    return wrapper
+
+
+def view():
+    return {'success': True}
+
+
+def main(number: int = 100_000):
+    app = Flask(__name__)
+    print(f"{'middlewares':>12} {'ns/request':>12} {'ns/middleware':>14}")
+
+    with app.test_request_context('/'):
+        for length in (1, 2, 4, 6, 8, 16, 32):
+            router = Router(__name__)
+            router.get('/', *([passthrough] * length), view)
+            pipeline = router.routes[0].view_func
+
+            total = timeit.timeit(pipeline, number=number)
+            per_request = total / number * 1e9
+            print(f'{length:>12} {per_request:>12.0f} {per_request / length:>14.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""Measures the time spent taking a token from the in-process and
+the shared token buckets, with 1 and 8 threads and 10k keys.
+
+Usage:
+    python -m benchmarks.bench_rate_limit
+"""
+import os
+import random
+import tempfile
+import timeit
+from concurrent.futures import ThreadPoolExecutor
+from flask_mux.middlewares.ratelimit import SharedTokenBuckets, TokenBuckets
+
+KEYS = [f'10.0.{i // 256}.{i % 256}' for i in range(10_000)]
+
+
+def run(buckets, threads: int, number: int) -> float:
+    keys = [random.choice(KEYS) for _ in range(number)]
+
+    def acquire(chunk):
+        for key in chunk:
+            buckets.acquire(key)
+
+    chunks = [keys[i::threads] for i in range(threads)]
+    with ThreadPoolExecutor(threads) as executor:
+        return timeit.timeit(lambda: list(executor.map(acquire, chunks)), number=1) / number
+
+
+def main(number: int = 200_000):
+    with tempfile.TemporaryDirectory() as directory:
+        shared = SharedTokenBuckets(os.path.join(directory, 'buckets'), rate=100, burst=100, slots=16_384)
+        print(f"{'threads':>8} {'in-process':>12} {'shared':>12}")
+        for threads in (1, 8):
+            local = run(TokenBuckets(rate=100, burst=100), threads, number)
+            print(f'{threads:>8} {local * 1e6:>10.2f}us {run(shared, threads, number) * 1e6:>10.2f}us')
+        shared.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Measures the time spent registering routers of 27 routes each,
+with 1k, 10k and 50k routes in total.
+
+Usage:
+    python -m benchmarks.bench_startup [routes ...]
+"""
+import sys
+import time
+from flask import Flask
+from flask_mux import Mux, Router
+
+ROUTES_PER_ROUTER = 27
+
+
+def view(id):
+    return {'id': id}
+
+
+def create_routers(routes: int):
+    routers = {}
+    for i in range(0, routes, ROUTES_PER_ROUTER):
+        router = Router(__name__)
+        for j in range(min(ROUTES_PER_ROUTER, routes - i)):
+            router.get(f'/resource-{j}/<int:id>', view)
+        routers[f'/namespace-{i}'] = router
+    return routers
+
+
+def register_flask(routers):
+    app = Flask(__name__)
+    for namespace, router in routers.items():
+        for route in router.routes:
+            app.add_url_rule(
+                namespace + route.endpoint,
+                f'{namespace[1:]}.{route.endpoint}',
+                route.view_func,
+                methods=route.http_methods,
+            )
+    return app
+
+
+def register_use(routers):
+    app = Flask(__name__)
+    mux = Mux(app)
+    for namespace, router in routers.items():
+        mux.use(namespace, router)
+    return app
+
+
+def register_use_many(routers):
+    app = Flask(__name__)
+    Mux(app).use_many(routers)
+    return app
+
+
+def main(sizes):
+    print(f"{'routes':>8} {'add_url_rule':>14} {'Mux.use':>10} {'Mux.use_many':>14}")
+    for size in sizes:
+        routers = create_routers(size)
+        timings = []
+        for register in (register_flask, register_use, register_use_many):
+            start = time.perf_counter()
+            app = register(routers)
+            # force the rules to be sorted, as on the first request
+            app.url_map.bind('localhost').match('/namespace-0/resource-0/1')
+            timings.append(time.perf_counter() - start)
+        print(f'{size:>8} ' + ' '.join(f'{t:>13.2f}s' for t in timings))
+
+
+if __name__ == '__main__':
+    main([int(size) for size in sys.argv[1:]] or [1_000, 10_000, 50_000])
@@ -0,0 +1,48 @@
+"""Compares the latency of a request doing 2ms of audit logging
+inline with the same request scheduling it with after_response,
+and reports the task pool's stats.
+
+Usage:
+    python -m benchmarks.bench_tasks
+"""
+import time
+import timeit
+from flask import Flask
+from flask_mux import Mux, Router
+from flask_mux.tasks import TaskPool, after_response
+
+
+def audit(action):
+    time.sleep(0.002)
+
+
+def create_inline():
+    audit('order_created')
+    return {'success': True}, 201
+
+
+def create_deferred():
+    after_response(audit, 'order_created')
+    return {'success': True}, 201
+
+
+def main(number: int = 500):
+    router = Router(__name__)
+    router.post('/inline', create_inline)
+    router.post('/deferred', create_deferred)
+
+    app = Flask(__name__)
+    mux = Mux(app, tasks=TaskPool(workers=8, max_queued=10_000))
+    mux.use('/', router)
+    client = app.test_client()
+
+    for path in ('/inline', '/deferred'):
+        elapsed = timeit.timeit(lambda: client.post(path, buffered=True), number=number)
+        print(f'{path:>10} {elapsed / number * 1e6:>8.1f}us')
+
+    mux.tasks.drain()
+    print(mux.tasks.stats())
+
+
+if __name__ == '__main__':
+    main()
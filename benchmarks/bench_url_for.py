@@ -0,0 +1,33 @@
+"""Compares Mux.url_for with flask.url_for on a Mux endpoint.
+
+Usage:
+    python -m benchmarks.bench_url_for
+"""
+import timeit
+from flask import Flask, url_for
+from flask_mux import Mux, Router
+
+
+def get_article(id, slug):
+    return {'id': id}
+
+
+def main(number: int = 100_000):
+    router = Router(__name__)
+    router.get('/<int:id>/<slug>', get_article)
+
+    app = Flask(__name__)
+    mux = Mux(app)
+    mux.use('/articles', router)
+
+    with app.test_request_context():
+        for name, build in (('flask.url_for', url_for), ('Mux.url_for', mux.url_for)):
+            total = timeit.timeit(
+                lambda: build('articles.get_article', id=42, slug='hello', page=2),
+                number=number,
+            )
+            print(f'{name:>14}: {total / number * 1e9:>8.0f} ns/call')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from threading import Lock
+from typing import Optional
+from urllib.parse import unquote_to_bytes
+from flask import current_app, request
+from werkzeug.exceptions import NotFound
+from werkzeug.wrappers import Response
+
+# request headers describing the body, not inherited by the sub-requests
+_BODY_KEYS = ("CONTENT_TYPE", "CONTENT_LENGTH", "HTTP_CONTENT_ENCODING", "werkzeug.request")
+# hop-by-hop and transport headers of the batch request, which don't
+# apply to the sub-responses (e.g: a gzip encoded sub-response would
+# be embedded in the JSON body of the batch response)
+_TRANSPORT_KEYS = (
+    "HTTP_ACCEPT_ENCODING",
+    "HTTP_CONNECTION",
+    "HTTP_EXPECT",
+    "HTTP_KEEP_ALIVE",
+    "HTTP_PROXY_AUTHORIZATION",
+    "HTTP_PROXY_CONNECTION",
+    "HTTP_RANGE",
+    "HTTP_IF_RANGE",
+    "HTTP_TE",
+    "HTTP_TRAILER",
+    "HTTP_TRANSFER_ENCODING",
+    "HTTP_UPGRADE",
+)
+_SKIPPED_KEYS = frozenset((*_BODY_KEYS, *_TRANSPORT_KEYS))
+
+
+def subrequest_environ(
+    base: dict, method: str, path: str, body=None, headers: Optional[dict] = None
+) -> dict:
+    """Derives the WSGI environ of a sub-request from the environ of
+    another request, whose server variables and headers (e.g:
+    Authorization) are inherited, except the ones describing its body
+    or its transport (e.g: Accept-Encoding, Connection).
+
+    Args:
+        base (dict): WSGI environ the sub-request is derived from.
+        method (str): HTTP method of the sub-request.
+        path (str): URL-encoded path of the sub-request, with its
+        query string. The path is decoded the way a WSGI server
+        decodes it, e.g: "/users/caf%C3%A9".
+        body (Any): JSON body of the sub-request, None for no body.
+        headers (dict): headers of the sub-request, overriding the
+        inherited ones, the ones set to None are skipped.
+
+    Returns:
+        dict: the WSGI environ of the sub-request.
+    """
+    environ = {key: value for key, value in base.items() if key not in _SKIPPED_KEYS}
+    path, _, query_string = path.partition("?")
+
+    data = b""
+    if body is not None:
+        data = json.dumps(body).encode()
+        environ["CONTENT_TYPE"] = "application/json"
+        environ["CONTENT_LENGTH"] = str(len(data))
+
+    environ["REQUEST_METHOD"] = method.upper()
+    # WSGI servers percent-decode the path, as bytes exposed as latin-1
+    environ["PATH_INFO"] = unquote_to_bytes(path).decode("latin-1")
+    environ["QUERY_STRING"] = query_string
+    environ["wsgi.input"] = BytesIO(data)
+
+    for name, value in (headers or {}).items():
+        if value is None:
+            continue
+        key = name.upper().replace("-", "_")
+        if key not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            key = f"HTTP_{key}"
+        environ[key] = str(value)
+    return environ
+
+
+def run_subrequest(mux, environ: dict) -> Response:
+    """Handles a request within the current process, without going
+    through the WSGI application of the app.
+
+    The request is matched against the url map like any other
+    request (see :class:`Dispatcher`), and dispatched to the compiled
+    pipeline of its route with the app's request hooks and error
+    handlers, within request and app contexts of its own. Requests to
+    url rules that weren't registered by the Mux instance are
+    answered with a 404.
+
+    Args:
+        mux (Mux): the Mux instance the routes were registered with.
+        environ (dict): WSGI environ of the request, see
+        :func:`subrequest_environ`.
+
+    Returns:
+        Response: the response, which must be closed by the caller.
+    """
+    app = mux.app
+    with app.app_context(), app.request_context(environ):
+        url_rule = request.url_rule
+        if url_rule is not None and not mux._owns(url_rule.endpoint):
+            request.routing_exception = NotFound()
+
+        try:
+            return app.full_dispatch_request()
+        except Exception as e:
+            return app.handle_exception(e)
+
+
+class Batch:
+    """View function of a batch endpoint, see :meth:`Mux.batch`.
+
+    The body of a batch request is a JSON list of sub-requests, e.g:
+
+        [
+            {"method": "GET", "path": "/users/me"},
+            {"method": "POST", "path": "/orders", "body": {"item": 42}},
+            {"path": "/catalog?page=2", "headers": {"Accept-Language": "fr"}}
+        ]
+
+    Each sub-request inherits the headers of the batch request (see
+    :func:`subrequest_environ`) and is handled by
+    :func:`run_subrequest`. The response is the JSON list of their
+    results, in order, each holding the status, the headers (as a list
+    of [name, value] pairs, headers like Set-Cookie may be repeated)
+    and the body (decoded when it's JSON) of a response. A sub-request
+    failing outside of the app's error handlers gets a 500 result of
+    its own, the other ones are still handled.
+
+    When created with parallel=True, the sub-requests are handled
+    concurrently on a thread pool owned by the endpoint: they must
+    then not depend on each other.
+
+
+    Properties:
+        mux (Mux): the Mux instance whose routes are batched.
+        parallel (bool): whether the sub-requests run concurrently.
+        workers (int): maximum number of threads of the pool.
+        max_requests (int): maximum number of sub-requests per batch.
+    """
+
+    def __init__(self, mux, parallel: bool = False, workers: int = 8, max_requests: int = 50):
+        self.mux = mux
+        self.parallel = parallel
+        self.workers = workers
+        self.max_requests = max_requests
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = Lock()
+
+    def __call__(self):
+        entries = request.get_json(silent=True)
+        error = self._validate(entries)
+        if error:
+            return {"success": False, "message": error}, 400
+        if len(entries) > self.max_requests:
+            return {"success": False, "message": f"at most {self.max_requests} requests per batch"}, 413
+
+        environs = [
+            subrequest_environ(
+                request.environ,
+                entry.get("method", "GET"),
+                entry["path"],
+                entry.get("body"),
+                entry.get("headers"),
+            )
+            for entry in entries
+        ]
+        if self.parallel and len(environs) > 1:
+            results = list(self._get_executor().map(self._run, environs))
+        else:
+            results = [self._run(environ) for environ in environs]
+
+        response = current_app.response_class(
+            json.dumps([result for result, _ in results]), mimetype="application/json"
+        )
+        # the sub-responses are closed along with the batch response
+        responses = [sub_response for _, sub_response in results if sub_response is not None]
+        response.call_on_close(lambda: [sub_response.close() for sub_response in responses])
+        return response
+
+    def _run(self, environ: dict):
+        response = None
+        try:
+            response = run_subrequest(self.mux, environ)
+            return self._result(response), response
+        except Exception:
+            self.mux.app.logger.exception("batched request to %s failed", environ["PATH_INFO"])
+            if response is not None:
+                response.close()
+            body = {"success": False, "message": "the request failed"}
+            return {"status": 500, "headers": [], "body": body}, None
+
+    @staticmethod
+    def _result(response: Response) -> dict:
+        data = response.get_data()
+        body = data.decode(response.charset, "replace")
+        if response.is_json:
+            try:
+                body = json.loads(data) if data else None
+            except ValueError:  # e.g: an encoded body
+                pass
+        return {
+            "status": response.status_code,
+            "headers": [[name, value] for name, value in response.headers.items()],
+            "body": body,
+        }
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="flask-mux-batch")
+        return self._executor
+
+    @staticmethod
+    def _validate(entries) -> Optional[str]:
+        if not isinstance(entries, list):
+            return "the body must be a JSON list of requests"
+        for index, entry in enumerate(entries):
+            if not isinstance(entry, dict) or not isinstance(entry.get("path"), str):
+                return f"request {index} must be an object with a path"
+            if not entry["path"].startswith("/"):
+                return f"request {index} must have an absolute path"
+            if not isinstance(entry.get("method", "GET"), str):
+                return f"request {index} has an invalid method"
+            if not isinstance(entry.get("headers", {}), dict):
+                return f"request {index} has invalid headers"
+        return None
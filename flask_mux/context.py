@@ -0,0 +1,149 @@
+from threading import Lock
+from typing import Callable, Generic, List, Optional, TypeVar
+from flask import g
+from flask_mux.errors import MissingValueError
+
+T = TypeVar("T")
+
+_MISSING = object()
+# attribute of the request context (or of flask.g outside of a
+# request) holding the values of the current request
+_ATTR = "_flask_mux_context"
+# number of keys created so far, keys are meant to be module-level constants
+_size = 0
+_lock = Lock()
+
+# the object holding the values of the current request: its request
+# context, since an app context (and its g) may be shared by several
+# requests, e.g: requests made by a test client within app_context().
+# Outside of a request, the g of the current app context is used
+# (the flask.g proxy is returned outside of an app context, to raise)
+try:
+    from flask.globals import _cv_app, _cv_request
+
+    def _current_scope():
+        ctx = _cv_request.get(None)
+        if ctx is not None:
+            return ctx
+        ctx = _cv_app.get(None)
+        return g if ctx is None else ctx.g
+
+except ImportError:  # Flask < 2.2
+    from flask.globals import _app_ctx_stack, _request_ctx_stack
+
+    def _current_scope():
+        ctx = _request_ctx_stack.top
+        if ctx is not None:
+            return ctx
+        ctx = _app_ctx_stack.top
+        return g if ctx is None else ctx.g
+
+
+class Key(Generic[T]):
+    """Typed key of a value stored for the duration of a request,
+    e.g: the user authenticated by a middleware, so that the
+    following middlewares and the view function don't compute it
+    again.
+
+    Keys are meant to be created once, as module-level constants.
+    Each key is assigned a fixed slot when it's created, the values
+    of a request are stored in a single list, created on first use
+    and kept on the request context (on :data:`flask.g` outside of a
+    request). Reading or writing a value is then a list lookup,
+    without allocating a dict per request. The requests handled with :meth:`Mux.batch` or :meth:`Mux.dispatch`
+    have values of their own.
+
+    When created with a factory, a key whose value isn't set for the
+    current request is set by calling the factory, once.
+
+
+    Example:
+
+        CURRENT_USER: Key[User] = Key('user', factory=lambda: User.from_token(
+            request.headers['Authorization']
+        ))
+
+        def is_admin(next_middleware):
+            @wraps(next_middleware)
+            def wrapper(*args, **kwargs):
+                if not CURRENT_USER.get().is_admin:
+                    return {'success': False, 'message': 'only admins are allowed'}, 403
+                return next_middleware(*args, **kwargs)
+            return wrapper
+
+        def get_me():
+            return CURRENT_USER.get().to_dict()
+
+
+    Properties:
+        name (str): name of the key, used in error messages.
+        factory (Callable): computes the value when it's not set.
+        index (int): slot of the key in the values of a request.
+    """
+
+    __slots__ = ("name", "factory", "index")
+
+    def __init__(self, name: str, factory: Optional[Callable[[], T]] = None):
+        self.name = name
+        self.factory = factory
+        global _size
+        with _lock:
+            self.index = _size
+            _size += 1
+
+    def __repr__(self):
+        return f"Key({self.name!r})"
+
+    def get(self, default=_MISSING) -> T:
+        """Returns the value of the key for the current request,
+        calling the key's factory if it's not set yet.
+
+        Raises:
+            MissingValueError: if the value isn't set and neither a
+            factory nor a default value is provided.
+        """
+        values = _values()
+        value = values[self.index] if self.index < len(values) else _MISSING
+        if value is not _MISSING:
+            return value
+
+        if self.factory is not None:
+            return self.set(self.factory())
+        if default is not _MISSING:
+            return default
+        raise MissingValueError(f"{self.name} isn't set for the current request")
+
+    def set(self, value: T) -> T:
+        """Sets the value of the key for the current request.
+
+        Returns:
+            the value.
+        """
+        values = _values()
+        if self.index >= len(values):
+            values.extend([_MISSING] * (self.index + 1 - len(values)))
+        values[self.index] = value
+        return value
+
+    def is_set(self) -> bool:
+        """Returns whether the key has a value for the current request."""
+        values = _values()
+        return self.index < len(values) and values[self.index] is not _MISSING
+
+    def unset(self):
+        """Removes the value of the key for the current request."""
+        values = _values()
+        if self.index < len(values):
+            values[self.index] = _MISSING
+
+
+def _values() -> List:
+    """Returns the values of the current request, sized for the keys
+    created so far."""
+    scope = _current_scope()
+    try:
+        return getattr(scope, _ATTR)
+    except AttributeError:
+        values = [_MISSING] * _size
+        setattr(scope, _ATTR, values)
+        return values
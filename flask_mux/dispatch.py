@@ -0,0 +1,379 @@
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+from flask import Flask
+from werkzeug.exceptions import NotFound
+from werkzeug.routing import Map, MapAdapter, PathConverter, Rule as UrlRule, ValidationError
+from flask_mux.urls import rule_re
+
+try:
+    from werkzeug.routing import parse_converter_args
+except ImportError:  # pragma: no cover
+    parse_converter_args = None
+
+# key of the app's dispatcher in app.extensions
+EXTENSION = "flask_mux.dispatcher"
+
+# returned while walking the trie when the request must be matched by werkzeug
+_FALLBACK = object()
+
+
+class Node:
+    """Node of the segment trie, one per path segment.
+
+
+    Properties:
+        static (dict): children keyed by static segment.
+        dynamic (list): (key, variable, regex, converter, child) of
+        the children matching a converter, sorted by converter weight.
+        rules (dict): url rules ending at the node, keyed by method
+        (None for rules accepting every method).
+        fallback (bool): whether a rule that can't be matched by the
+        trie lives under the node.
+    """
+
+    __slots__ = ("static", "dynamic", "rules", "fallback")
+
+    def __init__(self):
+        self.static: Dict[str, "Node"] = {}
+        self.dynamic: List[tuple] = []
+        self.rules: Dict[Optional[str], UrlRule] = {}
+        self.fallback = False
+
+
+class Trie:
+    """Segment trie built from the rules of a url map.
+
+    Static segments are matched with dict lookups, dynamic ones
+    against the regex of their converter. When werkzeug matches the
+    rules one after the other (werkzeug < 2.2), every rule matching
+    the path is collected and the first one in werkzeug's order wins,
+    e.g: "/<x0>/b/<float:f2>" is preferred to "/<int:i0>/<x1>/<x2>"
+    for "/1/b/2.5". Otherwise static segments take precedence over
+    dynamic ones, like werkzeug's state machine matcher.
+
+    The rules the trie can't match the way werkzeug would (e.g:
+    path converters, defaults, subdomains, strict_slashes=False)
+    mark the node of their static prefix, requests walking through
+    that node are then matched by werkzeug instead.
+    """
+
+    def __init__(self, url_map: Map):
+        self.root = Node()
+        self.size = len(url_map._rules)
+        # insert the rules in werkzeug's matching order
+        url_map.update()
+        # position of the rules (keyed by id, rules compare by value) in
+        # the order werkzeug tries them, None when werkzeug matches them
+        # with a state machine
+        self.ranks: Optional[Dict[int, int]] = None
+        if getattr(url_map, "_matcher", None) is None:
+            self.ranks = {id(rule): rank for rank, rule in enumerate(url_map._rules)}
+        for rule in url_map.iter_rules():
+            self.insert(url_map, rule)
+
+    def insert(self, url_map: Map, rule: UrlRule):
+        node = self.root
+        segments = rule.rule.lstrip("/").split("/")
+        supported = self._is_supported(url_map, rule)
+
+        for segment in segments:
+            match = rule_re.fullmatch(segment)
+            if match is None and "<" not in segment:
+                node = node.static.setdefault(segment, Node())
+                continue
+
+            converter = None
+            if supported and match is not None:
+                converter = self._create_converter(url_map, match)
+            if converter is None:
+                node.fallback = True
+                return
+
+            key = (match.group("converter"), match.group("args"))
+            for child_key, variable, _, _, child in node.dynamic:
+                if child_key == key and variable == match.group("variable"):
+                    node = child
+                    break
+            else:
+                child = Node()
+                node.dynamic.append((
+                    key,
+                    match.group("variable"),
+                    re.compile(converter.regex),
+                    converter,
+                    child,
+                ))
+                node.dynamic.sort(key=lambda dynamic: dynamic[3].weight)
+                node = child
+
+        if not supported:
+            node.fallback = True
+            return
+
+        for method in rule.methods or (None,):
+            node.rules.setdefault(method, rule)
+
+    def static_rules(self) -> Dict[Tuple[str, str], UrlRule]:
+        """Returns the rules without converters the trie would match,
+        keyed by HTTP method and path."""
+        rules = {}
+        nodes = [("", self.root)]
+        while nodes:
+            path, node = nodes.pop()
+            if node.fallback:
+                continue
+            for method, rule in node.rules.items():
+                if method is not None and node is not self.root:
+                    rules[(method, path)] = rule
+            for segment, child in node.static.items():
+                nodes.append((f"{path}/{segment}", child))
+        return rules
+
+    def match(self, path: str, method: str) -> Optional[Tuple[UrlRule, dict]]:
+        """Matches the path and the method against the trie.
+
+        Returns:
+            Tuple[Rule, dict]: the matched url rule and its converted
+            arguments, or None if the request must be matched by werkzeug.
+        """
+        matches: List[tuple] = []
+        rv = self._walk(self.root, path.lstrip("/").split("/"), 0, method, {}, matches)
+        if rv is _FALLBACK or not matches:
+            return None
+
+        _, rule, values = min(matches, key=lambda match: match[0])
+        # a rule werkzeug would redirect to, with a trailing slash
+        if rule is None:
+            return None
+        return rule, values
+
+    def _walk(
+        self, node: Node, segments: List[str], index: int, method: str, values: dict, matches: List[tuple]
+    ):
+        """Collects the (rank, rule, values) of the rules matching the
+        segments into matches. Returns True once the match is known,
+        _FALLBACK if the request must be matched by werkzeug."""
+        if node.fallback:
+            return _FALLBACK
+
+        if index == len(segments):
+            return self._collect(node, method, values, matches)
+
+        segment = segments[index]
+        child = node.static.get(segment)
+        if child is not None:
+            rv = self._walk(child, segments, index + 1, method, values, matches)
+            if rv is not None:
+                return rv
+
+        for _, variable, regex, converter, child in node.dynamic:
+            if not regex.fullmatch(segment):
+                continue
+            try:
+                values[variable] = converter.to_python(segment)
+            except ValidationError:
+                continue
+
+            rv = self._walk(child, segments, index + 1, method, values, matches)
+            del values[variable]
+            if rv is not None:
+                return rv
+
+        return None
+
+    def _collect(self, node: Node, method: str, values: dict, matches: List[tuple]):
+        rule = node.rules.get(method) or node.rules.get(None)
+        if self.ranks is None:
+            if rule is None:
+                return None
+            matches.append((0, rule, dict(values)))
+            return True
+
+        for candidate in (node.rules.get(method), node.rules.get(None)):
+            if candidate is not None:
+                matches.append((self.ranks[id(candidate)], candidate, dict(values)))
+
+        # werkzeug redirects to the rule ending with a slash if it
+        # comes first, e.g: "/<name>/" for "/mehdi"
+        branch = node.static.get("")
+        if branch is not None:
+            if branch.fallback:
+                return _FALLBACK
+            for candidate in (branch.rules.get(method), branch.rules.get(None)):
+                if candidate is not None:
+                    matches.append((self.ranks[id(candidate)], None, None))
+        return None
+
+    @staticmethod
+    def _is_supported(url_map: Map, rule: UrlRule) -> bool:
+        return not (
+            url_map.host_matching
+            or rule.subdomain
+            or rule.defaults
+            or rule.redirect_to is not None
+            or not rule.strict_slashes
+            or getattr(rule, "websocket", False)
+            or rule.build_only
+        )
+
+    @staticmethod
+    def _create_converter(url_map: Map, match):
+        converter_class = url_map.converters[match.group("converter") or "default"]
+        args, kwargs = (), {}
+        if match.group("args") is not None:
+            if parse_converter_args is None:
+                return None
+            args, kwargs = parse_converter_args(match.group("args"))
+
+        converter = converter_class(url_map, *args, **kwargs)
+        if not getattr(converter, "part_isolating", not isinstance(converter, PathConverter)):
+            return None
+        return converter
+
+
+class DispatchingAdapter:
+    """Proxy of the url adapter Flask creates for each request,
+    matching the request against the :class:`Dispatcher` before
+    falling back to werkzeug's matching."""
+
+    __slots__ = ("adapter", "dispatcher", "namespace_adapter")
+
+    def __init__(self, adapter: MapAdapter, dispatcher: "Dispatcher"):
+        self.adapter = adapter
+        self.dispatcher = dispatcher
+        self.namespace_adapter: Optional[MapAdapter] = None
+
+    def __getattr__(self, name):
+        return getattr(self.adapter, name)
+
+    def __setattr__(self, name, value):
+        # e.g: url_for(_scheme=...) sets the url_scheme of the adapter
+        if name in DispatchingAdapter.__slots__:
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self.adapter, name, value)
+
+    def match(self, *args, **kwargs):
+        if not args and kwargs.keys() <= {"return_rule"} and kwargs.get("return_rule"):
+            namespace_adapter = self.dispatcher.bind_namespace(self.adapter)
+            if namespace_adapter is not None:
+                try:
+                    rv = namespace_adapter.match(return_rule=True)
+                except NotFound:
+                    pass
+                else:
+                    self.namespace_adapter = namespace_adapter
+                    return rv
+
+            rv = self.dispatcher.match(self.adapter)
+            if rv is not None:
+                return rv
+        return self.adapter.match(*args, **kwargs)
+
+    def allowed_methods(self, path_info: str = None):
+        if self.namespace_adapter is not None:
+            return self.namespace_adapter.allowed_methods(path_info)
+        return self.adapter.allowed_methods(path_info)
+
+
+class Dispatcher:
+    """Matches the requests of a Flask app before werkzeug does.
+
+    Requests to the url rules without converters registered by a
+    :class:`Mux` are matched with a single lookup in a (method, path)
+    table, the other rules of the app being matched by werkzeug. When created with
+    trie=True, the other requests are matched against a segment
+    trie built from the app's url rules (see :class:`Trie`).
+    Requests that aren't matched this way (e.g: 404, 405 and
+    redirects) are matched by werkzeug as usual.
+
+    The table and the trie are rebuilt on the first request
+    following the addition of url rules to the app.
+
+    An app has a single dispatcher (see :meth:`for_app`), shared by
+    the Mux instances registering routes on it.
+
+    Requests to the namespaces of isolated routers (see
+    :meth:`mount`) are first matched against the url map of their
+    router, selected by the first segment of their path.
+    """
+
+    def __init__(self, app: Flask, trie: bool = False):
+        self.app = app
+        self.use_trie = trie
+        self.trie: Optional[Trie] = None
+        self.static: Dict[Tuple[str, str], UrlRule] = {}
+        self.namespaces: Dict[str, List[tuple]] = {}
+        # predicates selecting the endpoints of the static table
+        self.owners: List[Callable[[str], bool]] = []
+        self._create_url_adapter = app.create_url_adapter
+
+    @classmethod
+    def for_app(cls, app: Flask, trie: bool = False) -> "Dispatcher":
+        """Returns the dispatcher of the app, creating and installing
+        it on first use. The trie is enabled if any caller asks for it."""
+        dispatcher = app.extensions.get(EXTENSION)
+        if dispatcher is None:
+            dispatcher = app.extensions[EXTENSION] = cls(app, trie=trie)
+            dispatcher.install()
+        elif trie and not dispatcher.use_trie:
+            dispatcher.use_trie = True
+            dispatcher.trie = None
+        return dispatcher
+
+    def install(self):
+        """Makes the app create its url adapters through :meth:`create_url_adapter`."""
+        if self.app.create_url_adapter != self.create_url_adapter:
+            self.app.create_url_adapter = self.create_url_adapter
+
+    def create_url_adapter(self, request):
+        adapter = self._create_url_adapter(request)
+        if request is None or adapter is None:
+            return adapter
+        return DispatchingAdapter(adapter, self)
+
+    def mount(self, namespace: str, router):
+        """Routes the requests to the namespace to an isolated router
+        (see :class:`IsolatedRouter`), once it's loaded."""
+        prefix = namespace.rstrip("/")
+        segment = prefix.lstrip("/").split("/", 1)[0]
+        self.namespaces.setdefault(segment, []).append((prefix, router))
+
+    def bind_namespace(self, adapter: MapAdapter) -> Optional[MapAdapter]:
+        """Binds the url map of the isolated router mounted on the
+        request's namespace, if any."""
+        if not self.namespaces:
+            return None
+
+        path = adapter.path_info
+        for prefix, router in self.namespaces.get(path.lstrip("/").split("/", 1)[0], ()):
+            if router.loaded and (path == prefix or path.startswith(f"{prefix}/")):
+                return router.bind(adapter)
+        return None
+
+    def match(self, adapter: MapAdapter) -> Optional[Tuple[UrlRule, dict]]:
+        """Matches the adapter's request against the table and the trie."""
+        if adapter.subdomain != adapter.map.default_subdomain or getattr(adapter, "websocket", False):
+            return None
+
+        trie = self.trie
+        if trie is None or trie.size != len(adapter.map._rules):
+            trie = self.rebuild(adapter.map)
+
+        rule = self.static.get((adapter.default_method, adapter.path_info))
+        if rule is not None:
+            return rule, {}
+        if self.use_trie:
+            return trie.match(adapter.path_info, adapter.default_method)
+        return None
+
+    def rebuild(self, url_map: Map) -> Trie:
+        trie = Trie(url_map)
+        self.static = {
+            key: rule for key, rule in trie.static_rules().items() if self._is_owned(rule.endpoint)
+        }
+        self.trie = trie
+        return trie
+
+    def _is_owned(self, endpoint: str) -> bool:
+        return not self.owners or any(owns(endpoint) for owns in self.owners)
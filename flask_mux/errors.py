@@ -8,3 +8,7 @@ class MissingHandlerError(MuxError):
 
 class UncallableMiddlewareError(MuxError):
     pass
+
+
+class MissingValueError(MuxError):
+    pass
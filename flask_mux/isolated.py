@@ -0,0 +1,155 @@
+from threading import Lock
+from typing import Callable, Dict, Optional
+from urllib.parse import quote
+from flask import current_app, has_request_context, request
+from werkzeug.routing import Map, MapAdapter, Rule as UrlRule
+
+# endpoint of the catch-all url rules reserving an isolated namespace
+MOUNT_ENDPOINT = "__mount__"
+
+
+def view_of_rule(**view_args):
+    """View function registered in the app for the endpoints of the
+    isolated routers. Calls the view function of the url rule the
+    request was matched to, rather than the one of the last url map
+    created for the endpoint."""
+    return current_app.ensure_sync(request.url_rule.view_func)(**view_args)
+
+
+class IsolatedRouter:
+    """A router whose routes are matched against a url map of their
+    own rather than against the app's url map.
+
+    The namespace is reserved in the app's url map by catch-all url
+    rules dispatching to :meth:`dispatch`. When the Mux instance has
+    a :class:`Dispatcher`, requests are routed to the namespace by a
+    lookup on the first segment of their path, and then only matched
+    against the router's routes. Either way, the cost of matching a
+    request and of rebuilding a url map only depends on the routes
+    of its namespace.
+
+    The router can be replaced while requests are being handled (see
+    :meth:`replace`), the new url map being swapped in once built.
+    The view functions are attached to the url rules of the map they
+    were created with, the endpoints of the app dispatching to the
+    view function of the matched rule (see :func:`view_of_rule`).
+
+
+    Properties:
+        namespace (str): namespace the router is mounted on.
+        router (Router): the mounted router.
+        middlewares (tuple): shared middlewares passed to :meth:`Mux.use`.
+        loaded (bool): whether the router's rules were created.
+        url_map (Map): url map of the router's routes, once loaded.
+        view_functions (dict): view functions of the router's routes,
+        keyed by endpoint.
+    """
+
+    def __init__(self, namespace: str, router=None, middlewares: tuple = ()):
+        self.namespace = namespace
+        self.router = router
+        self.middlewares = middlewares
+        self.loaded = False
+        self.url_map: Optional[Map] = None
+        self.view_functions: Dict[str, Callable] = {}
+        self._lock = Lock()
+
+    def __repr__(self):
+        return f"{self.namespace} -> {self.router.name} (loaded: {self.loaded})"
+
+    def load(self, mux):
+        """Creates the router's rules and the url map matching them."""
+        if not self.loaded:
+            self._load(mux, self.router)
+
+    def replace(self, mux, router):
+        """Creates the rules of another router and swaps them with the
+        current ones. Requests already matched against the previous
+        url map are still handled by the previous view functions."""
+        with self._lock:
+            self._load(mux, router)
+
+    def _load(self, mux, router):
+        url_map = Map(converters=mux.app.url_map.converters)
+        url_rules = mux._create_url_rules(self.namespace, router, self.middlewares)
+        view_functions = {}
+
+        for rule, endpoint, view_func, methods in url_rules:
+            # answer OPTIONS requests the way Flask does for its own rules
+            methods = set(methods)
+            options = getattr(view_func, "provide_automatic_options", "OPTIONS" not in methods)
+            if options:
+                methods.add("OPTIONS")
+
+            url_rule = UrlRule(rule, endpoint=endpoint, methods=methods)
+            url_rule.provide_automatic_options = options
+            url_rule.view_func = view_func
+            url_map.add(url_rule)
+            view_functions[endpoint] = view_func
+            mux.app.view_functions[endpoint] = view_of_rule
+
+        url_map.update()
+        self.router = router
+        self.view_functions = view_functions
+        self.url_map = url_map
+        self.loaded = True
+
+    def bind(self, adapter: MapAdapter) -> MapAdapter:
+        """Binds the router's url map to the request an adapter of
+        the app's url map is bound to."""
+        return MapAdapter(
+            self.url_map,
+            adapter.server_name,
+            adapter.script_name,
+            adapter.subdomain,
+            adapter.url_scheme,
+            adapter.path_info,
+            adapter.default_method,
+            adapter.query_args,
+        )
+
+    def dispatch(self, mux, **kwargs):
+        """View function of the catch-all url rules reserving the
+        namespace, dispatches the request to the matching route."""
+        self.load(mux)
+
+        adapter = self.url_map.bind_to_environ(request.environ)
+        url_rule, view_args = adapter.match(return_rule=True)
+        request.url_rule, request.view_args = url_rule, view_args
+
+        if request.method == "OPTIONS" and url_rule.provide_automatic_options:
+            response = current_app.response_class()
+            response.allow.update(adapter.allowed_methods())
+            return response
+
+        return current_app.ensure_sync(url_rule.view_func)(**view_args)
+
+    def build(self, endpoint: str, values: dict) -> Optional[str]:
+        """Builds the URL of one of the router's endpoints, returns
+        None if the endpoint doesn't belong to the router.
+
+        The special arguments of :func:`flask.url_for` (_external,
+        _scheme, _anchor and _method) are honored the way Flask
+        honors them for the app's url rules.
+        """
+        if not self.loaded or endpoint not in self.view_functions:
+            return None
+
+        values = dict(values)
+        external = values.pop("_external", False)
+        anchor = values.pop("_anchor", None)
+        method = values.pop("_method", None)
+        scheme = values.pop("_scheme", None)
+
+        adapter = current_app.create_url_adapter(request if has_request_context() else None)
+        if adapter is None:
+            adapter = self.url_map.bind("", script_name="/")
+        else:
+            adapter = self.bind(adapter)
+
+        url = adapter.build(
+            endpoint, values, method=method, url_scheme=scheme, force_external=bool(external)
+        )
+        if anchor is not None:
+            url = f"{url}#{quote(anchor, safe='/:')}"
+        return url
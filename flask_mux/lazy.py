@@ -0,0 +1,41 @@
+from werkzeug.utils import import_string
+from flask_mux.isolated import IsolatedRouter
+
+
+class LazyRouter(IsolatedRouter):
+    """An :class:`IsolatedRouter` registered by import string, which
+    is imported and registered on the first request hitting its
+    namespace.
+
+    Since the routes of the router are matched against a url map of
+    their own, the app's url map is never modified while requests
+    are being handled.
+
+
+    Properties:
+        namespace (str): namespace the router is mounted on.
+        import_name (str): import string of the router
+        (e.g: 'myapp.admin:router').
+        middlewares (tuple): shared middlewares passed to :meth:`Mux.use`.
+        loaded (bool): whether the router was imported and registered.
+        url_map (Map): url map of the router's routes, once loaded.
+    """
+
+    def __init__(self, namespace: str, import_name: str, middlewares: tuple = ()):
+        super().__init__(namespace, middlewares=middlewares)
+        self.import_name = import_name
+
+    def __repr__(self):
+        return f"{self.namespace} -> {self.import_name} (loaded: {self.loaded})"
+
+    def load(self, mux):
+        """Imports the router and creates its rules, only once even
+        when called concurrently."""
+        if self.loaded:
+            return
+
+        with self._lock:
+            if self.loaded:
+                return
+
+            self._load(mux, import_string(self.import_name))
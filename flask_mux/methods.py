@@ -0,0 +1,71 @@
+from typing import Callable, Dict, Iterable, Tuple
+from flask import current_app, request
+from werkzeug.exceptions import MethodNotAllowed
+from flask_mux.pipeline import is_async
+from flask_mux.router import Record, intern_methods
+
+
+def _ensure_sync(pipeline: Callable) -> Callable:
+    """Runs an async pipeline the way Flask runs async views."""
+
+    def wrapper(**kwargs):
+        return current_app.ensure_sync(pipeline)(**kwargs)
+
+    return wrapper
+
+
+class MethodTable(Record):
+    """View function of a url rule shared by the routes handling
+    different HTTP methods on the same path, dispatching each request
+    to the compiled pipeline of its method.
+
+    Registering one url rule per path rather than one per route keeps
+    the url map small, and requests using a method no route handles
+    are rejected by werkzeug with a 405 before reaching the table.
+
+    Method tables are immutable, routes are added to or removed from
+    a path by replacing its table.
+
+
+    Properties:
+        handlers (dict): pipelines keyed by HTTP method, HEAD requests
+        being handled by the GET pipeline unless a route handles HEAD.
+        methods (Tuple[str]): HTTP methods handled by the table.
+    """
+
+    __slots__ = ("handlers", "methods")
+
+    def __init__(self, handlers: Dict[str, Callable]):
+        handlers = {
+            method: _ensure_sync(pipeline) if is_async(pipeline) else pipeline
+            for method, pipeline in handlers.items()
+        }
+        if "GET" in handlers:
+            handlers.setdefault("HEAD", handlers["GET"])
+        self._init(handlers=handlers, methods=intern_methods(handlers))
+
+    def __repr__(self):
+        return f"MethodTable({', '.join(self.methods)})"
+
+    def __call__(self, **kwargs):
+        handler = self.handlers.get(request.method)
+        if handler is None:
+            raise MethodNotAllowed(valid_methods=self.methods)
+        return handler(**kwargs)
+
+    @classmethod
+    def create(cls, pipelines: Iterable[Tuple[Iterable[str], Callable]]):
+        """Creates a table from the HTTP methods and the pipeline of
+        each route, the first route handling a method takes
+        precedence, as it would be matched first by werkzeug.
+
+        Args:
+            pipelines (Iterable): (methods, pipeline) of each route.
+
+        Returns: MethodTable
+        """
+        handlers = {}
+        for methods, pipeline in pipelines:
+            for method in methods:
+                handlers.setdefault(method, pipeline)
+        return cls(handlers)
@@ -0,0 +1,156 @@
+from collections import deque
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter
+from typing import Callable, Dict, Sequence
+from flask_mux.pipeline import is_async
+
+# inclusive time of the last stage that returned, used by the
+# enclosing stage to deduce its own (self) time
+_child_time: ContextVar = ContextVar("flask_mux_child_time", default=0.0)
+
+
+def stage_name(fn: Callable) -> str:
+    """Returns a readable name for a middleware or a view function."""
+    return getattr(fn, "__name__", None) or type(fn).__name__
+
+
+class Timer:
+    """Keeps the most recent wall time samples of a pipeline stage.
+
+    Samples are stored in a bounded ring buffer, so recording a sample
+    is a single append and the memory used by a timer never grows
+    past `size` samples.
+
+
+    Properties:
+        count (int): total number of recorded samples.
+        samples (deque): most recent samples, in seconds.
+    """
+
+    __slots__ = ("count", "samples")
+
+    def __init__(self, size: int = 1024):
+        self.count = 0
+        self.samples = deque(maxlen=size)
+
+    def record(self, elapsed: float):
+        self.count += 1
+        self.samples.append(elapsed)
+
+    def wrap(self, fn: Callable, inclusive: bool = False) -> Callable:
+        """Wraps a stage of the pipeline to record its wall time.
+
+        By default, the time spent in the following stages is not
+        accounted for, only the time spent in the stage itself is.
+
+        Args:
+            fn (Callable): stage of the pipeline.
+            inclusive (bool): record the time spent in the following
+            stages as well.
+
+        Returns:
+            Callable: the timed stage.
+        """
+        record = self.record
+
+        if is_async(fn):
+
+            @wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                _child_time.set(0.0)
+                start = perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    elapsed = perf_counter() - start
+                    record(elapsed if inclusive else elapsed - _child_time.get())
+                    _child_time.set(elapsed)
+
+            return async_wrapper
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            _child_time.set(0.0)
+            start = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                record(elapsed if inclusive else elapsed - _child_time.get())
+                _child_time.set(elapsed)
+
+        return wrapper
+
+    def percentiles(self, quantiles: Sequence[float] = (50, 90, 99)) -> dict:
+        """Computes the requested percentiles of the recorded samples.
+
+        Returns:
+            dict: percentiles in milliseconds keyed by `p<quantile>`
+            along with the number of recorded samples.
+        """
+        samples = sorted(self.samples)
+        stats = {"count": self.count}
+        for q in quantiles:
+            if not samples:
+                stats[f"p{q:g}"] = None
+                continue
+            index = min(len(samples) - 1, int(round(q / 100 * (len(samples) - 1))))
+            stats[f"p{q:g}"] = samples[index] * 1000
+        return stats
+
+
+class Metrics:
+    """Registry of the timers recorded by an instrumented :class:`Mux`.
+
+    Each registered route gets a timer per middleware, one for the
+    view function and a `total` timer for the whole pipeline. Routes
+    are keyed by their HTTP methods and full path (e.g: 'GET /auth/me').
+
+
+    Example:
+
+        mux = Mux(app, instrument=True)
+        mux.use('/auth', auth_router)
+        ...
+        mux.metrics.percentiles('GET /auth/me')
+        # -> {'is_auth': {'count': 42, 'p50': 0.01, ...}, 'me': {...}, 'total': {...}}
+    """
+
+    def __init__(self, size: int = 1024):
+        self.size = size
+        self.timers: Dict[str, Dict[str, Timer]] = {}
+
+    def timer(self, route: str, stage: str) -> Timer:
+        """Returns the timer of the route's stage, creating it if needed."""
+        stages = self.timers.setdefault(route, {})
+        if stage not in stages:
+            stages[stage] = Timer(self.size)
+        return stages[stage]
+
+    def instrument(self, route: str) -> Callable:
+        """Returns the hook passed to :func:`compile_pipeline` to time
+        each stage of the route's pipeline."""
+
+        def hook(fn: Callable, middleware: Callable) -> Callable:
+            return self.timer(route, stage_name(middleware)).wrap(fn)
+
+        return hook
+
+    def percentiles(self, route: str, quantiles: Sequence[float] = (50, 90, 99)) -> dict:
+        """Returns the percentiles of every stage of the route."""
+        return {
+            stage: timer.percentiles(quantiles)
+            for stage, timer in self.timers.get(route, {}).items()
+        }
+
+    def summary(self, quantiles: Sequence[float] = (50, 90, 99)) -> dict:
+        """Returns the percentiles of every stage of every route."""
+        return {route: self.percentiles(route, quantiles) for route in self.timers}
+
+    def reset(self):
+        """Drops all the recorded samples."""
+        for stages in self.timers.values():
+            for timer in stages.values():
+                timer.count = 0
+                timer.samples.clear()
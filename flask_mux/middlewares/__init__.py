@@ -0,0 +1,5 @@
+from flask_mux.middlewares.cache import cache, ResponseCache
+from flask_mux.middlewares.ratelimit import rate_limit, RateLimiter
+from flask_mux.middlewares.conditional import conditional, ConditionalResponse
+from flask_mux.middlewares.compress import compress, Compress
+from flask_mux.middlewares.coalesce import coalesce, Coalesce
@@ -0,0 +1,181 @@
+import time
+from collections import OrderedDict
+from functools import wraps
+from threading import Lock
+from typing import Callable, Dict, Sequence
+from flask import current_app, request
+from werkzeug.wrappers import Response
+from flask_mux.pipeline import is_async
+
+
+class CachedResponse:
+    """Immutable snapshot of a response.
+
+    Response objects are mutable and bound to the request that
+    produced them, the snapshot keeps the parts needed to build
+    a fresh response for each request instead.
+    """
+
+    __slots__ = ("data", "status", "headers")
+
+    def __init__(self, data: bytes, status: int, headers: list):
+        self.data = data
+        self.status = status
+        self.headers = headers
+
+    @classmethod
+    def create(cls, response: Response):
+        return cls(response.get_data(), response.status_code, response.headers.to_wsgi_list())
+
+    def build(self) -> Response:
+        return current_app.response_class(self.data, self.status, self.headers)
+
+
+def is_shareable(response: Response) -> bool:
+    """Returns whether a response can be served to other clients: it
+    must not set cookies nor be marked as private or no-store."""
+    if "Set-Cookie" in response.headers:
+        return False
+    cache_control = response.cache_control
+    return not (cache_control.private or cache_control.no_store)
+
+
+class ResponseCache:
+    """In-memory response cache middleware.
+
+    Caches the successful responses of GET and HEAD requests for
+    `ttl` seconds, keyed by path, query string, view args and the
+    values of the provided headers. The number of entries is bounded
+    by `max_entries`, the least recently used entries being evicted
+    first.
+
+    Responses setting cookies or whose Cache-Control is private or
+    no-store are never cached.
+
+    A cache hit short-circuits the rest of the chain, so the cache
+    should be placed after the middlewares that must run on every
+    request (e.g: authentication checks). Responses that depend on
+    the user must vary on the headers identifying them, otherwise
+    the response of a user is served to the others.
+
+
+    Example:
+
+        catalog_cache = cache(ttl=30, max_entries=10_000, headers=['Authorization'])
+        router.get('/catalog', is_auth, catalog_cache, get_catalog)
+
+
+    Properties:
+        hits (int): number of requests served from the cache.
+        misses (int): number of requests that went through the chain.
+        evictions (int): number of entries evicted to bound the cache.
+    """
+
+    def __init__(
+        self, ttl: float = 60, max_entries: int = 1024, headers: Sequence[str] = ()
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.headers = tuple(headers)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: Dict[tuple, tuple] = OrderedDict()
+        self._lock = Lock()
+
+    def __call__(self, next_middleware: Callable) -> Callable:
+        if is_async(next_middleware):
+
+            @wraps(next_middleware)
+            async def async_wrapper(*args, **kwargs):
+                key = self._key(kwargs)
+                if key is None:
+                    return await next_middleware(*args, **kwargs)
+
+                cached = self._get(key)
+                if cached is not None:
+                    return cached.build()
+                return self._set(key, await next_middleware(*args, **kwargs))
+
+            return async_wrapper
+
+        @wraps(next_middleware)
+        def wrapper(*args, **kwargs):
+            key = self._key(kwargs)
+            if key is None:
+                return next_middleware(*args, **kwargs)
+
+            cached = self._get(key)
+            if cached is not None:
+                return cached.build()
+            return self._set(key, next_middleware(*args, **kwargs))
+
+        return wrapper
+
+    def stats(self) -> dict:
+        """Returns the cache counters and the current number of entries."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+        }
+
+    def clear(self):
+        """Drops all the cached entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def _key(self, view_args: dict):
+        if request.method not in ("GET", "HEAD"):
+            return None
+
+        return (
+            request.path,
+            request.query_string,
+            tuple(view_args.items()),
+            tuple(request.headers.get(header) for header in self.headers),
+        )
+
+    def _get(self, key: tuple):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, cached = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return cached
+                del self._entries[key]
+            self.misses += 1
+        return None
+
+    def _set(self, key: tuple, rv) -> Response:
+        response = current_app.make_response(rv)
+        if response.status_code != 200 or response.is_streamed or not is_shareable(response):
+            return response
+
+        entry = (time.monotonic() + self.ttl, CachedResponse.create(response))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return response
+
+
+def cache(ttl: float = 60, max_entries: int = 1024, headers: Sequence[str] = ()):
+    """Creates a :class:`ResponseCache` middleware.
+
+    Args:
+        ttl (float): number of seconds a response stays cached.
+        max_entries (int): maximum number of cached responses.
+        headers (Sequence[str]): request headers the cached
+        responses vary on (e.g: Accept-Language).
+
+    Returns:
+        ResponseCache: the cache middleware.
+    """
+    return ResponseCache(ttl=ttl, max_entries=max_entries, headers=headers)
@@ -0,0 +1,174 @@
+import asyncio
+from concurrent.futures import Future, TimeoutError
+from functools import wraps
+from threading import Lock
+from typing import Callable, Dict, Optional, Sequence
+from flask import current_app, request
+from werkzeug.wrappers import Response
+from flask_mux.middlewares.cache import CachedResponse, is_shareable
+from flask_mux.pipeline import is_async
+
+
+class _NotShared(Exception):
+    """Raised when the response of the running request can't be shared."""
+
+
+class Coalesce:
+    """Request coalescing (single-flight) middleware.
+
+    Concurrent identical requests, keyed by method, path, query
+    string, view args and the values of the provided headers, are
+    collapsed into a single execution of the rest of the chain: the
+    first request runs it, while the others wait for its response
+    and get a copy of it. If it raises, the exception is raised for
+    every waiting request as well.
+
+    A request that waits for more than `timeout` seconds stops
+    waiting and runs the chain on its own. Streamed responses, and
+    responses setting cookies or marked as private or no-store, aren't
+    shared: the waiting requests then run the chain on their own.
+
+    The requests only share a response while it's being computed,
+    the middleware is typically combined with a cache.
+
+
+    Example:
+
+        router.get('/catalog', is_auth, coalesce(timeout=5), get_catalog)
+
+
+    Properties:
+        coalesced (int): number of requests served with the response
+        of another request.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 10,
+        methods: Sequence[str] = ("GET", "HEAD"),
+        headers: Sequence[str] = ("Authorization", "Cookie"),
+    ):
+        self.timeout = timeout
+        self.methods = frozenset(method.upper() for method in methods)
+        self.headers = tuple(headers)
+        self.coalesced = 0
+        self._in_flight: Dict[tuple, Future] = {}
+        self._lock = Lock()
+
+    def __call__(self, next_middleware: Callable) -> Callable:
+        if is_async(next_middleware):
+
+            @wraps(next_middleware)
+            async def async_wrapper(*args, **kwargs):
+                key = self._key(kwargs)
+                if key is None:
+                    return await next_middleware(*args, **kwargs)
+
+                future, leader = self._join(key)
+                if not leader:
+                    try:
+                        waited = asyncio.wrap_future(future)
+                        return self._shared(await asyncio.wait_for(waited, self.timeout))
+                    except (asyncio.TimeoutError, _NotShared):
+                        return await next_middleware(*args, **kwargs)
+
+                try:
+                    rv = await next_middleware(*args, **kwargs)
+                except BaseException as e:
+                    self._fail(key, future, e)
+                    raise
+                return self._resolve(key, future, rv)
+
+            return async_wrapper
+
+        @wraps(next_middleware)
+        def wrapper(*args, **kwargs):
+            key = self._key(kwargs)
+            if key is None:
+                return next_middleware(*args, **kwargs)
+
+            future, leader = self._join(key)
+            if not leader:
+                try:
+                    return self._shared(future.result(self.timeout))
+                except (TimeoutError, _NotShared):
+                    return next_middleware(*args, **kwargs)
+
+            try:
+                rv = next_middleware(*args, **kwargs)
+            except BaseException as e:
+                self._fail(key, future, e)
+                raise
+            return self._resolve(key, future, rv)
+
+        return wrapper
+
+    def _key(self, view_args: dict) -> Optional[tuple]:
+        if request.method not in self.methods:
+            return None
+
+        return (
+            request.method,
+            request.path,
+            request.query_string,
+            tuple(view_args.items()),
+            tuple(request.headers.get(header) for header in self.headers),
+        )
+
+    def _join(self, key: tuple):
+        """Returns the future of the request in flight for the key,
+        and whether the current request must run the chain."""
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+
+            future = self._in_flight[key] = Future()
+            # running futures can't be cancelled by the waiting requests
+            future.set_running_or_notify_cancel()
+            return future, True
+
+    def _resolve(self, key: tuple, future: Future, rv) -> Response:
+        try:
+            response = current_app.make_response(rv)
+        except BaseException as e:
+            self._fail(key, future, e)
+            raise
+
+        with self._lock:
+            self._in_flight.pop(key, None)
+        shared = not response.is_streamed and is_shareable(response)
+        future.set_result(CachedResponse.create(response) if shared else None)
+        return response
+
+    def _fail(self, key: tuple, future: Future, error: BaseException):
+        with self._lock:
+            self._in_flight.pop(key, None)
+        future.set_exception(error)
+
+    def _shared(self, cached: Optional[CachedResponse]) -> Response:
+        if cached is None:
+            raise _NotShared()
+        return cached.build()
+
+
+def coalesce(
+    timeout: float = 10,
+    methods: Sequence[str] = ("GET", "HEAD"),
+    headers: Sequence[str] = ("Authorization", "Cookie"),
+):
+    """Creates a :class:`Coalesce` middleware.
+
+    Args:
+        timeout (float): maximum number of seconds a request waits
+        for the response of an identical request.
+        methods (Sequence[str]): HTTP methods of the requests to
+        coalesce.
+        headers (Sequence[str]): request headers the responses vary
+        on, requests with different values are never coalesced.
+
+    Returns:
+        Coalesce: the coalescing middleware.
+    """
+    return Coalesce(timeout=timeout, methods=methods, headers=headers)
@@ -0,0 +1,138 @@
+import zlib
+from functools import wraps
+from typing import Callable, Iterable, Iterator, Sequence
+from flask import current_app, request
+from werkzeug.wrappers import Response
+from flask_mux.pipeline import is_async
+
+# wbits of the zlib compressors producing each content coding
+_WBITS = {"gzip": 16 + zlib.MAX_WBITS, "deflate": zlib.MAX_WBITS}
+
+_COMPRESSIBLE = frozenset((
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/xhtml+xml",
+    "application/x-ndjson",
+    "image/svg+xml",
+))
+
+
+def is_compressible(mimetype: str) -> bool:
+    """Checks if responses of the mimetype are worth compressing,
+    i.e. textual and not already compressed (e.g: images, archives)."""
+    if not mimetype or mimetype == "text/event-stream":
+        return False
+    return (
+        mimetype.startswith("text/")
+        or mimetype in _COMPRESSIBLE
+        or mimetype.endswith(("+json", "+xml"))
+    )
+
+
+class Compress:
+    """Response compression middleware.
+
+    Compresses the responses with gzip or deflate, depending on the
+    request's Accept-Encoding header. Buffered responses smaller than
+    `min_size` bytes are left as is, streamed responses (e.g: built
+    from a generator) are compressed chunk by chunk as they're sent,
+    without buffering the whole body.
+
+    Responses that are already encoded, of a mimetype that doesn't
+    compress well, or with a status other than 200 are left as is.
+    Compressed responses have a weak ETag, since the strong ETag of
+    the uncompressed body doesn't identify them anymore.
+
+
+    Example:
+
+        router.get('/export', is_auth, compress(min_size=1024), export)
+    """
+
+    def __init__(
+        self, min_size: int = 500, level: int = 6, encodings: Sequence[str] = ("gzip", "deflate")
+    ):
+        self.min_size = min_size
+        self.level = level
+        self.encodings = [encoding for encoding in encodings if encoding in _WBITS]
+
+    def __call__(self, next_middleware: Callable) -> Callable:
+        if is_async(next_middleware):
+
+            @wraps(next_middleware)
+            async def async_wrapper(*args, **kwargs):
+                return self._compress(await next_middleware(*args, **kwargs))
+
+            return async_wrapper
+
+        @wraps(next_middleware)
+        def wrapper(*args, **kwargs):
+            return self._compress(next_middleware(*args, **kwargs))
+
+        return wrapper
+
+    def _compress(self, rv) -> Response:
+        response = current_app.make_response(rv)
+        if (
+            response.status_code != 200
+            or "Content-Encoding" in response.headers
+            or not is_compressible(response.mimetype)
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = request.accept_encodings.best_match(self.encodings)
+        if encoding is None or request.method == "HEAD":
+            return response
+
+        if response.is_streamed:
+            if response.content_length is not None and response.content_length < self.min_size:
+                return response
+            response.response = self._stream(response.response, encoding)
+            response.direct_passthrough = False
+            response.headers.pop("Content-Length", None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                return response
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, _WBITS[encoding])
+            response.set_data(compressor.compress(data) + compressor.flush())
+
+        response.headers["Content-Encoding"] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    def _stream(self, iterable: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, _WBITS[encoding])
+        try:
+            for chunk in iterable:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode()
+                data = compressor.compress(chunk)
+                if data:
+                    yield data
+            yield compressor.flush()
+        finally:
+            close = getattr(iterable, "close", None)
+            if close is not None:
+                close()
+
+
+def compress(min_size: int = 500, level: int = 6, encodings: Sequence[str] = ("gzip", "deflate")):
+    """Creates a :class:`Compress` middleware.
+
+    Args:
+        min_size (int): minimum size in bytes of the buffered
+        responses to compress.
+        level (int): compression level, from 1 (fastest) to 9
+        (smallest).
+        encodings (Sequence[str]): content codings to negotiate,
+        by order of preference.
+
+    Returns:
+        Compress: the compression middleware.
+    """
+    return Compress(min_size=min_size, level=level, encodings=encodings)
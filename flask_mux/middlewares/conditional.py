@@ -0,0 +1,146 @@
+from datetime import datetime, timezone
+from functools import lru_cache, wraps
+from hashlib import blake2b
+from typing import Callable, Optional, Union
+from flask import current_app, request
+from werkzeug.wrappers import Response
+from flask_mux.pipeline import is_async
+
+
+@lru_cache(maxsize=4096)
+def _version_etag(version: str) -> str:
+    return blake2b(version.encode(), digest_size=16).hexdigest()
+
+
+def _to_datetime(value: Union[datetime, float, None]) -> Optional[datetime]:
+    """Converts a timestamp to an aware datetime truncated to the
+    second, the precision of the Last-Modified header."""
+    if value is None:
+        return None
+    if not isinstance(value, datetime):
+        value = datetime.fromtimestamp(value, timezone.utc)
+    elif value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.replace(microsecond=0)
+
+
+class ConditionalResponse:
+    """Conditional GET middleware, answering GET and HEAD requests
+    with a 304 when the client's copy of the response is still fresh.
+
+    With a `version` function, the ETag is computed from the version
+    of the resource before the view is invoked, and a request
+    matching it skips the rest of the chain. The same goes for the
+    Last-Modified header with a `last_modified` function. Both
+    functions are called with the view args of the request.
+
+    Without them, the ETag is computed by hashing the body of the
+    response, which saves the bandwidth but not the work of the view.
+
+
+    Example:
+
+        def catalog_version(id):
+            return catalogs.updated_at(id)
+
+        router.get('/catalogs/<int:id>', is_auth, conditional(catalog_version), get_catalog)
+        router.get('/countries', conditional(), get_countries)
+    """
+
+    def __init__(
+        self,
+        version: Callable[..., object] = None,
+        last_modified: Callable[..., Union[datetime, float, None]] = None,
+        weak: bool = False,
+    ):
+        self.version = version
+        self.last_modified = last_modified
+        self.weak = weak
+
+    def __call__(self, next_middleware: Callable) -> Callable:
+        if is_async(next_middleware):
+
+            @wraps(next_middleware)
+            async def async_wrapper(*args, **kwargs):
+                if request.method not in ("GET", "HEAD"):
+                    return await next_middleware(*args, **kwargs)
+
+                etag, last_modified = self._validators(kwargs)
+                if self._is_fresh(etag, last_modified):
+                    return self._not_modified(etag, last_modified)
+                return self._finalize(await next_middleware(*args, **kwargs), etag, last_modified)
+
+            return async_wrapper
+
+        @wraps(next_middleware)
+        def wrapper(*args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return next_middleware(*args, **kwargs)
+
+            etag, last_modified = self._validators(kwargs)
+            if self._is_fresh(etag, last_modified):
+                return self._not_modified(etag, last_modified)
+            return self._finalize(next_middleware(*args, **kwargs), etag, last_modified)
+
+        return wrapper
+
+    def _validators(self, view_args: dict):
+        etag = last_modified = None
+        if self.version:
+            version = self.version(**view_args)
+            if version is not None:
+                etag = _version_etag(str(version))
+        if self.last_modified:
+            last_modified = _to_datetime(self.last_modified(**view_args))
+        return etag, last_modified
+
+    def _is_fresh(self, etag: Optional[str], last_modified: Optional[datetime]) -> bool:
+        if etag is not None and request.if_none_match:
+            return request.if_none_match.contains_weak(etag)
+        if last_modified is not None and request.if_modified_since and not request.if_none_match:
+            return last_modified <= request.if_modified_since
+        return False
+
+    def _not_modified(self, etag: Optional[str], last_modified: Optional[datetime]) -> Response:
+        response = current_app.response_class(status=304)
+        self._set_validators(response, etag, last_modified)
+        return response
+
+    def _finalize(self, rv, etag: Optional[str], last_modified: Optional[datetime]) -> Response:
+        response = current_app.make_response(rv)
+        if response.status_code != 200:
+            return response
+
+        if etag is None and last_modified is None and not response.is_streamed:
+            etag = blake2b(response.get_data(), digest_size=16).hexdigest()
+        self._set_validators(response, etag, last_modified)
+        # answers with a 304 if the body's ETag matches
+        return response.make_conditional(request.environ)
+
+    def _set_validators(self, response: Response, etag: Optional[str], last_modified: Optional[datetime]):
+        if etag is not None:
+            response.set_etag(etag, weak=self.weak)
+        if last_modified is not None:
+            response.last_modified = last_modified
+
+
+def conditional(
+    version: Callable[..., object] = None,
+    last_modified: Callable[..., Union[datetime, float, None]] = None,
+    weak: bool = False,
+):
+    """Creates a :class:`ConditionalResponse` middleware.
+
+    Args:
+        version (Callable): returns the version of the requested
+        resource (e.g: a revision number or an update timestamp),
+        called with the view args of the request.
+        last_modified (Callable): returns the datetime or the
+        timestamp of the last modification of the requested resource,
+        called with the view args of the request.
+        weak (bool): whether the ETags are weak validators.
+
+    Returns:
+        ConditionalResponse: the conditional GET middleware.
+    """
+    return ConditionalResponse(version=version, last_modified=last_modified, weak=weak)
@@ -0,0 +1,270 @@
+import math
+import mmap
+import os
+import struct
+import time
+from functools import wraps
+from hashlib import blake2b
+from threading import Lock
+from typing import Callable, Dict, List, Optional
+from flask import request
+from flask_mux.errors import MuxError
+from flask_mux.pipeline import is_async
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+
+class TokenBuckets:
+    """In-process token buckets, one per key.
+
+    Each bucket holds up to `burst` tokens and is refilled with `rate`
+    tokens per second, a request taking one token. The buckets are
+    spread over striped locks, so that requests with different keys
+    rarely wait for each other.
+
+    Buckets that are full again are dropped once there are more than
+    `max_keys` of them.
+    """
+
+    def __init__(self, rate: float, burst: float, stripes: int = 64, max_keys: int = 65536):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: Dict[str, List[float]] = {}
+        self._locks = [Lock() for _ in range(stripes)]
+        self._sweep_at = max_keys
+
+    def acquire(self, key: str) -> float:
+        """Takes a token from the key's bucket.
+
+        Returns:
+            float: 0 if a token was taken, otherwise the number of
+            seconds until the bucket holds a token again.
+        """
+        now = time.monotonic()
+        with self._locks[hash(key) % len(self._locks)]:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [self.burst, now]
+
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if tokens >= 1:
+                bucket[0] = tokens - 1
+                wait = 0.0
+            else:
+                bucket[0] = tokens
+                wait = (1 - tokens) / self.rate
+
+        if len(self._buckets) > self._sweep_at:
+            self._sweep(now)
+        return wait
+
+    def _sweep(self, now: float):
+        idle = self.burst / self.rate
+        for key, bucket in list(self._buckets.items()):
+            if now - bucket[1] < idle:
+                continue
+            with self._locks[hash(key) % len(self._locks)]:
+                if now - bucket[1] >= idle:
+                    self._buckets.pop(key, None)
+        self._sweep_at = max(self.max_keys, 2 * len(self._buckets))
+
+
+class SharedTokenBuckets:
+    """Token buckets stored in a memory-mapped file, shared by all the
+    processes opening the same file (e.g: the workers of a server).
+
+    The file holds a fixed number of slots (key hash, tokens, last
+    refill), split into groups of `probes` slots. A key is hashed to a
+    group, and takes a free slot of the group, or the slot of the
+    least recently used key when the group is full. Groups are locked
+    with a thread lock and a POSIX record lock (see :func:`fcntl.lockf`),
+    since the latter is held by the whole process.
+
+    All the processes must open the file with the same number of slots.
+    """
+
+    _slot = struct.Struct("<Qdd")
+
+    def __init__(
+        self, filename: str, rate: float, burst: float, slots: int = 4096, probes: int = 8
+    ):
+        if fcntl is None:
+            raise MuxError("shared rate limits require POSIX record locks (fcntl)")
+
+        self.rate = rate
+        self.burst = burst
+        self.groups = max(1, slots // probes)
+        self.probes = probes
+
+        size = self.groups * probes * self._slot.size
+        self._fd = os.open(filename, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size < size:
+            os.ftruncate(self._fd, size)
+        self._mmap = mmap.mmap(self._fd, size)
+        self._locks = [Lock() for _ in range(min(self.groups, 64))]
+
+    def acquire(self, key: str) -> float:
+        """Takes a token from the key's bucket, see :meth:`TokenBuckets.acquire`."""
+        digest = int.from_bytes(blake2b(key.encode(), digest_size=8).digest(), "little") | 1
+        group = digest % self.groups
+        offset = group * self.probes * self._slot.size
+
+        with self._locks[group % len(self._locks)]:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, group)
+            try:
+                slot = self._find(offset, digest)
+                now = time.monotonic()
+                stored, tokens, last = self._slot.unpack_from(self._mmap, slot)
+                if stored != digest:
+                    tokens, last = self.burst, now
+
+                tokens = min(self.burst, tokens + (now - last) * self.rate)
+                if tokens >= 1:
+                    tokens, wait = tokens - 1, 0.0
+                else:
+                    wait = (1 - tokens) / self.rate
+                self._slot.pack_into(self._mmap, slot, digest, tokens, now)
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, group)
+        return wait
+
+    def close(self):
+        """Unmaps and closes the file."""
+        self._mmap.close()
+        os.close(self._fd)
+
+    def _find(self, offset: int, digest: int) -> int:
+        """Returns the offset of the key's slot in its group."""
+        free = oldest = None
+        oldest_last = math.inf
+        for slot in range(offset, offset + self.probes * self._slot.size, self._slot.size):
+            stored, _, last = self._slot.unpack_from(self._mmap, slot)
+            if stored == digest:
+                return slot
+            if not stored and free is None:
+                free = slot
+            elif stored and last < oldest_last:
+                oldest, oldest_last = slot, last
+        return free if free is not None else oldest
+
+
+def _remote_addr() -> Optional[str]:
+    return request.remote_addr
+
+
+class RateLimiter:
+    """Token bucket rate limiting middleware.
+
+    Allows `limit` requests every `per` seconds for each key (the
+    client's address by default), with bursts of up to `burst`
+    requests. Limited requests are answered with a 429 and a
+    Retry-After header, without going through the rest of the chain.
+
+    By default the buckets live in the memory of each process. When
+    `shared` is provided, they're stored in a memory-mapped file so
+    that all the workers of a host enforce the same limit, without
+    an external store (e.g: shared='/dev/shm/api-rate-limit').
+
+
+    Example:
+
+        api_limit = rate_limit(100, per=60)
+        api_router.use(api_limit)
+
+        login_limit = rate_limit(5, per=60, shared='/dev/shm/login-limit')
+        auth_router.post('/login', login_limit, login)
+
+
+    Properties:
+        buckets (TokenBuckets | SharedTokenBuckets): the token buckets.
+        key (Callable): returns the bucket key of the current request,
+        requests with a None key aren't limited.
+        limited (int): number of rejected requests, in this process.
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        per: float = 1.0,
+        burst: int = None,
+        key: Callable[[], Optional[str]] = None,
+        shared: str = None,
+        slots: int = 4096,
+    ):
+        rate = limit / per
+        burst = burst or limit
+        self.key = key or _remote_addr
+        self.limited = 0
+        if shared:
+            self.buckets = SharedTokenBuckets(shared, rate, burst, slots=slots)
+        else:
+            self.buckets = TokenBuckets(rate, burst)
+
+    def __call__(self, next_middleware: Callable) -> Callable:
+        if is_async(next_middleware):
+
+            @wraps(next_middleware)
+            async def async_wrapper(*args, **kwargs):
+                rejected = self._check()
+                if rejected is not None:
+                    return rejected
+                return await next_middleware(*args, **kwargs)
+
+            return async_wrapper
+
+        @wraps(next_middleware)
+        def wrapper(*args, **kwargs):
+            rejected = self._check()
+            if rejected is not None:
+                return rejected
+            return next_middleware(*args, **kwargs)
+
+        return wrapper
+
+    def _check(self):
+        key = self.key()
+        if key is None:
+            return None
+
+        wait = self.buckets.acquire(key)
+        if not wait:
+            return None
+
+        self.limited += 1
+        return (
+            {"success": False, "message": "too many requests"},
+            429,
+            {"Retry-After": str(math.ceil(wait))},
+        )
+
+
+def rate_limit(
+    limit: int,
+    per: float = 1.0,
+    burst: int = None,
+    key: Callable[[], Optional[str]] = None,
+    shared: str = None,
+    slots: int = 4096,
+):
+    """Creates a :class:`RateLimiter` middleware.
+
+    Args:
+        limit (int): number of requests allowed every `per` seconds.
+        per (float): period of the limit, in seconds.
+        burst (int): maximum number of requests allowed at once,
+        defaults to `limit`.
+        key (Callable): returns the bucket key of the current request,
+        defaults to the client's address.
+        shared (str): path of the file storing the buckets of all
+        the processes, the buckets are per process if not provided.
+        slots (int): number of buckets of the shared file.
+
+    Returns:
+        RateLimiter: the rate limiting middleware.
+    """
+    return RateLimiter(limit, per=per, burst=burst, key=key, shared=shared, slots=slots)
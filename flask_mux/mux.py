@@ -1,15 +1,112 @@
-from flask import Flask, Blueprint
-from flask_mux.router import Router, Route
-from typing import Dict, List
+import gc
+from contextlib import contextmanager
+from functools import partial
+from threading import Lock, RLock
+from types import MappingProxyType
+from flask import Flask, Blueprint, has_request_context, request, url_for as flask_url_for
+from flask.testing import EnvironBuilder
+from werkzeug.routing import Map
+from werkzeug.utils import import_string
+from flask_mux.batch import Batch, run_subrequest, subrequest_environ
+from flask_mux.errors import MuxError
+from flask_mux.isolated import MOUNT_ENDPOINT, IsolatedRouter
+from flask_mux.lazy import LazyRouter
+from flask_mux.methods import MethodTable
+from flask_mux.metrics import Metrics
+from flask_mux.pipeline import compile_pipeline
+from flask_mux import snapshot
+from flask_mux.dispatch import Dispatcher
+from flask_mux.responses import compile_encoder, json_responses
+from flask_mux.router import Record, Router, Route, intern_methods
+from flask_mux.tasks import TaskPool, init_app as init_tasks
+from flask_mux.urls import UrlBuilder
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+_MISSING = object()
+
+
+_lazy_rule_classes: Dict[type, type] = {}
+# serializes the swaps of the apps' url rule class, see Mux._lazy_rules
+_url_rule_class_lock = RLock()
+
+
+def lazy_rule_class(base: type) -> type:
+    """Returns a subclass of the provided url rule class that defers
+    the compilation of its URL builders until a URL is built for the
+    rule (e.g: using :func:`flask.url_for`).
+
+    Compiling the builders accounts for most of the time spent adding
+    a rule to the url map, while most rules of an application are
+    never used to build URLs.
+
+    The subclass relies on werkzeug's private builder attributes
+    (`_compile_builder`, `_build` and `_build_unknown`, werkzeug 2.x).
+    It's checked against the base class once, the base class being
+    returned as is if it doesn't behave the same.
+    """
+    if not hasattr(base, "_compile_builder"):
+        return base
+
+    if base not in _lazy_rule_classes:
+
+        class LazyRule(base):
+            def _compile_builder(self, append_unknown: bool = True):
+                compile_builder = super()._compile_builder
+                attr = "_build_unknown" if append_unknown else "_build"
+
+                def build(rule, *args, **kwargs):
+                    builder = compile_builder(append_unknown).__get__(rule, None)
+                    setattr(rule, attr, builder)
+                    return builder(*args, **kwargs)
+
+                return build
+
+        _lazy_rule_classes[base] = LazyRule if _builds_like(LazyRule, base) else base
+
+    return _lazy_rule_classes[base]
+
+
+def _builds_like(rule_class: type, base: type) -> bool:
+    """Checks that rules of both classes build the same URLs, and that
+    the builders of the lazy class are compiled on first use."""
+    try:
+        urls = []
+        for cls in (rule_class, base):
+            url_map = Map([cls("/probe/<int:id>", endpoint="probe")])
+            adapter = url_map.bind("localhost")
+            urls.append((adapter.build("probe", {"id": 1}), adapter.build("probe", {"id": 2, "q": "a"})))
+            rule = next(url_map.iter_rules())
+            if cls is rule_class and rule.__dict__.get("_build_unknown") is None:
+                return False
+        return urls[0] == urls[1]
+    except Exception:
+        return False
+
 
+def _flask_endpoint(namespace: str, endpoint: str) -> str:
+    """Prefixes the endpoint with the dotted namespace the same way
+    Flask prefixes the endpoints of a blueprint, the endpoints of the
+    root namespace not being prefixed."""
+    return f"{namespace}.{endpoint}" if namespace else endpoint
 
-class Rule:
+
+def _join(namespace: str, endpoint: str) -> str:
+    """Joins the namespace and the route's endpoint the same way
+    Flask prefixes the rules of a blueprint."""
+    if not endpoint:
+        return namespace
+    return "/".join((namespace.rstrip("/"), endpoint.lstrip("/")))
+
+
+class Rule(Record):
     """Object representation of a URL rule.
 
     The Rule class is used to represent url rules upon
     when they are being registered using the :meth:`Flask.add_url_rule`
     when calling the :meth:`Mux.use` method on a router.
 
+    Rules are slotted and immutable.
+
 
     Properties:
         rule (str): 
@@ -22,6 +119,9 @@ class Rule:
             function to be called when a request
             hits the endpoint.
 
+        methods (tuple):
+            HTTP methods handled by the rule.
+
 
     Methods:
         create_from_route(namespace, route):
@@ -29,16 +129,24 @@ class Rule:
             namespace and Route.
     """
 
-    def __init__(self, rule: str = "", endpoint: str = "", view_func: callable = None):
-        self.rule = rule
-        self.endpoint = endpoint
-        self.view_func = view_func
+    __slots__ = ("rule", "endpoint", "view_func", "methods")
+
+    def __init__(
+        self,
+        rule: str = "",
+        endpoint: str = "",
+        view_func: callable = None,
+        methods: Tuple[str, ...] = (),
+    ):
+        self._init(rule=rule, endpoint=endpoint, view_func=view_func, methods=methods)
 
     def __repr__(self):
         return f"rule: {self.rule} | endpoint: {self.endpoint}"
 
     @classmethod
-    def create_from_route(cls, route: Route):
+    def create_from_route(
+        cls, route: Route, middlewares: List[Callable] = None, stage: Callable = None
+    ):
         """Creates a Rule instance using the provided route properties.
 
         Args:
@@ -47,12 +155,34 @@ class Rule:
                 route instance that will be registered
                 with the provided namespace.
 
+           middlewares (List[Callable]):
+                shared middlewares composed around the route's
+                pipeline, invoked before the route's own middlewares.
+
+           stage (Callable):
+                hook passed to :func:`compile_pipeline`, the shared
+                middlewares, the route's middlewares and its view
+                function are then composed together.
+
 
         Returns:
             Rule: new Rule based on the provided Route instance. 
         """
+        view_func = route.unwrapped_view_func
+        if stage and view_func:
+            # composed in a single pass, the route's own pipeline is
+            # left uncompiled if it wasn't used yet
+            view_func = compile_pipeline(view_func, [*(middlewares or []), *route.middlewares], stage)
+        elif view_func:
+            view_func = route.view_func
+            if middlewares:
+                view_func = compile_pipeline(view_func, middlewares)
+
         return Rule(
-            route.endpoint, route.unwrapped_view_func.__name__, route.view_func
+            route.endpoint,
+            route.unwrapped_view_func.__name__,
+            view_func,
+            route.http_methods,
         )
 
 
@@ -64,6 +194,37 @@ class Mux:
     Properties:
         app (Flask): instance of the Flask app
         rules (list): list of registered url rules
+        metrics (Metrics): timers of each middleware and view function
+        of the registered routes, only set when the Mux instance is
+        created with instrument=True.
+        lazy (dict): routers registered by import string with
+        lazy=True, keyed by namespace.
+        isolated (dict): routers registered with isolated=True or
+        lazy=True, keyed by namespace.
+        index (dict): registered rules keyed by namespace, endpoint
+        and HTTP method.
+        mounts (list): (namespace, router, middlewares) of each
+        router registered with :meth:`use` or :meth:`use_many`.
+        frozen (bool): whether :meth:`freeze` was called.
+        dispatcher (Dispatcher): matches the requests to the Mux rules
+        without converters with a single lookup before werkzeug, and
+        the other requests against a segment trie when the Mux instance
+        is created with dispatcher='trie'. The dispatcher is shared by
+        the Mux instances of an app. Not set with dispatcher=None.
+        json_encoder (Callable): encodes the dicts and lists returned by
+        the middlewares and view functions of the registered routes,
+        when the Mux instance is created with fast_json=True (the app's
+        encoder, compiled once) or with fast_json set to an encoder
+        (e.g: orjson.dumps). See :func:`json_responses`.
+        tasks (TaskPool): runs the tasks scheduled with
+        :func:`after_response` once the responses are sent, when the
+        Mux instance is created with tasks=True (a pool with the
+        default settings) or with tasks set to a :class:`TaskPool`.
+        url_rules (dict): url rules of the registered endpoints,
+        keyed by their Flask endpoint (e.g: 'auth.login').
+        aliases (dict): Flask endpoints of the url rules keyed by
+        the endpoints of their routes (e.g: 'auth.login'), when the
+        two differ, see :meth:`use`.
 
 
     Methods:
@@ -71,13 +232,94 @@ class Mux:
             registers routes created within a :class:`Router` instance
             with their endpoints.
 
+        use_many(routers):
+            registers the routes of many routers at once.
+
+        warmup(*namespaces):
+            imports and registers lazy routers ahead of the first request.
+
+        find(namespace, endpoint, method):
+            looks up a registered rule.
+
+        url_for(endpoint, **values):
+            builds the URL of a registered endpoint.
+
+        freeze():
+            finalizes the routing state before forking workers.
+
+        save_snapshot(filename):
+            exports the route table to a snapshot file.
+
+        load_snapshot(filename):
+            registers the routes of a snapshot file.
+
+        add_route(namespace, endpoint, *middlewares, methods):
+            adds a route to an isolated namespace at runtime.
+
+        remove_route(namespace, endpoint, methods):
+            removes routes from an isolated namespace at runtime.
+
+        replace_router(namespace, router):
+            replaces the router of an isolated namespace at runtime.
+
+        batch(rule, parallel):
+            registers an endpoint handling many requests at once.
+
+        dispatch(method, path, json, headers):
+            handles a request to a registered route in-process.
+
     """
 
-    def __init__(self, app: Flask):
+    def __init__(
+        self,
+        app: Flask,
+        instrument: bool = False,
+        dispatcher: str = "static",
+        fast_json: Union[bool, Callable] = False,
+        tasks: Union[bool, TaskPool] = False,
+    ):
         self.app = app
         self.rules: Dict[str, List[Rule]] = {}
-
-    def use(self, namespace: str, router: Router):
+        self.metrics: Optional[Metrics] = Metrics() if instrument else None
+        self.lazy: Dict[str, LazyRouter] = {}
+        self.isolated: Dict[str, IsolatedRouter] = {}
+        self.index: Dict[Tuple[str, str, str], Rule] = {}
+        self.mounts: List[Tuple[str, Router, tuple]] = []
+        self.frozen = False
+        self.dispatcher: Optional[Dispatcher] = None
+
+        if dispatcher not in (None, "static", "trie"):
+            raise MuxError(f"unknown dispatcher: {dispatcher}")
+        if dispatcher:
+            self.dispatcher = Dispatcher.for_app(app, trie=dispatcher == "trie")
+            self.dispatcher.owners.append(self._owns)
+        self.url_rules: Dict[str, List[str]] = {}
+        self.aliases: Dict[str, str] = {}
+        self._url_builders: Dict[str, Optional[UrlBuilder]] = {}
+        self.json_encoder: Optional[Callable] = None
+        self._json_mimetype = app.config.get("JSONIFY_MIMETYPE", "application/json")
+        if fast_json:
+            self.json_encoder = fast_json if callable(fast_json) else compile_encoder(app)
+        self.tasks: Optional[TaskPool] = None
+        if tasks:
+            self.tasks = tasks if isinstance(tasks, TaskPool) else TaskPool()
+            init_tasks(app, self.tasks)
+        # endpoints of replaced routes, still in app.view_functions
+        # for the requests matched before their removal
+        self._retired = set()
+        self._lock = Lock()
+        # WSGI environ the requests of dispatch() are derived from
+        self._environ: Optional[dict] = None
+        app.url_build_error_handlers.append(self._build_url)
+
+    def use(
+        self,
+        namespace: str,
+        router: Union[Router, str],
+        *middlewares,
+        lazy: bool = False,
+        isolated: bool = False,
+    ):
         """Registers all the router's routes with their endpoints
         in the provided namespace.
 
@@ -89,25 +331,664 @@ class Mux:
             endpoint and then register the route with the final
             endpoint.
 
+            use('/admin', admin_router, is_auth, is_admin) will also
+            invoke is_auth and is_admin before the middlewares of
+            every route of the admin_router.
+
+            use('/admin', 'myapp.admin:router', lazy=True) will only
+            import and register the router on the first request
+            hitting the '/admin' namespace.
+
+            use('/admin', admin_router, isolated=True) will match the
+            requests to '/admin' against the routes of the admin_router
+            only, using a url map of their own instead of the app's.
+
+        The routes sharing the same path are registered as a single
+        url rule, dispatching each request to the pipeline of its HTTP
+        method (see :class:`MethodTable`). The url rule is registered
+        with the endpoint of the path's first route, suffixed if it's
+        already taken (e.g: 'auth.handler_2'), the endpoints of the
+        other routes being aliases of it for :meth:`url_for` and
+        :func:`flask.url_for`.
+
 
         Args:
             namespace (str): namespace which the routes will be mapped
             to.
-            router (Router): router instance with the registered
-            routes.
+            router (Router | str): router instance with the registered
+            routes, or its import string (e.g: 'myapp.admin:router').
+            middlewares (*Callable): variadic param representing
+            a sequence of middlewares shared by all the routes,
+            invoked before the ones registered with :meth:`Router.use`.
+            lazy (bool): defer the import and the registration of the
+            router, which must then be provided as an import string.
+            Lazy routers are isolated as well.
+            isolated (bool): register the router as an
+            :class:`IsolatedRouter`, so that matching its requests and
+            adding routes to other namespaces don't depend on each other.
         """
+        self._check_frozen()
+        if lazy:
+            return self._use_lazy(namespace, router, middlewares)
+        if isinstance(router, str):
+            router = import_string(router)
+        if isolated:
+            return self._use_isolated(namespace, router, middlewares)
+
         _namespace = namespace.strip('/').replace('/', '.')
         bp = Blueprint(_namespace, router.name)
+
+        with self._registering():
+            for rule, endpoint, view_func, methods in self._create_tables(namespace, router, middlewares):
+                bp.add_url_rule(rule, endpoint, view_func, methods=methods)
+
+            with self._lazy_rules():
+                self.app.register_blueprint(bp, url_prefix=namespace)
+        self.mounts.append((namespace, router, middlewares))
+
+    def warmup(self, *namespaces: str):
+        """Imports and registers the lazy routers mounted on the
+        provided namespaces, or all of them if none is provided.
+
+        Useful to load the lazy routers ahead of the first request,
+        e.g: from a server's post-fork hook.
+        """
+        for namespace, lazy_router in self.lazy.items():
+            if not namespaces or namespace in namespaces:
+                lazy_router.load(self)
+
+    def freeze(self):
+        """Finalizes the routing state, typically right before a
+        preloading server (e.g: gunicorn --preload) forks its workers.
+
+        Lazy routers are loaded, the url map is sorted, the tables of
+        the dispatcher are built, the registry becomes read-only and
+        no router can be registered anymore.
+        Finally, all the objects created so far are moved out of the
+        garbage collector's tracking (see :func:`gc.freeze`), so that
+        collections in the workers don't write to the memory pages
+        they share with the master process.
+        """
+        if self.frozen:
+            return
+
+        self.warmup()
+        self.app.url_map.update()
+        if self.dispatcher is not None:
+            self.dispatcher.rebuild(self.app.url_map)
+
+        self.rules = MappingProxyType({ns: tuple(rules) for ns, rules in self.rules.items()})
+        self.url_rules = MappingProxyType({e: tuple(rules) for e, rules in self.url_rules.items()})
+        self.aliases = MappingProxyType(self.aliases)
+        self.index = MappingProxyType(self.index)
+        self.mounts = tuple(self.mounts)
+        self.frozen = True
+
+        gc.collect()
+        if hasattr(gc, "freeze"):
+            gc.freeze()
+
+    def save_snapshot(self, filename: str):
+        """Exports the route table to a snapshot file, that can be
+        used to register the same routes with :meth:`load_snapshot`.
+
+        The snapshot holds the namespaces, the routes and their HTTP
+        methods, the import strings of the view functions and the
+        middlewares, and the hashes of the modules defining them.
+
+        Raises:
+            MuxError: if a view function or a middleware can't be
+            imported by an import string (e.g: a lambda or a
+            middleware instance such as cache(ttl=30)).
+        """
+        snapshot.save(self, filename)
+
+    def load_snapshot(self, filename: str) -> bool:
+        """Registers the routes of a snapshot file created with
+        :meth:`save_snapshot`, without executing the router
+        definitions (only the modules defining the view functions
+        and the middlewares are imported).
+
+        The snapshot is considered stale if one of the modules it
+        was built from changed since, in which case nothing is
+        registered and the routers should be registered as usual.
+
+
+        Example:
+
+            if not mux.load_snapshot('routes.snapshot'):
+                mux.use('/auth', auth_router)
+                mux.save_snapshot('routes.snapshot')
+
+
+        Returns:
+            bool: whether the snapshot was loaded.
+        """
+        return snapshot.load(self, filename)
+
+    def add_route(
+        self, namespace: str, endpoint: str, *middlewares, methods: Sequence[str] = ("GET",)
+    ):
+        """Adds a route to the router of an isolated namespace while
+        the app is handling requests, see :meth:`replace_router`.
+
+        Example:
+
+            mux.add_route('/beta', '/search', is_auth, search, methods=['GET', 'POST'])
+
+
+        Args:
+            namespace (str): namespace of the router, mounted with
+            isolated=True or lazy=True.
+            endpoint (str): endpoint of the route.
+            middlewares (*Callable): middlewares and view function of
+            the route, as passed to :meth:`Router.get`.
+            methods (Sequence): HTTP methods handled by the route.
+        """
+        middlewares = list(middlewares)
+        Router._check_middlewares(middlewares)
+        route = Route.create(endpoint, list(methods), middlewares)
+        self._update_routes(namespace, lambda routes: [*routes, route])
+
+    def remove_route(self, namespace: str, endpoint: str, methods: Sequence[str] = None) -> bool:
+        """Removes the routes of an endpoint from the router of an
+        isolated namespace while the app is handling requests, see
+        :meth:`replace_router`. Requests to a removed route are then
+        answered with a 404, or a 405 if the endpoint still handles
+        other HTTP methods.
+
+        Args:
+            namespace (str): namespace of the router, mounted with
+            isolated=True or lazy=True.
+            endpoint (str): endpoint of the routes (e.g: '/search').
+            methods (Sequence): HTTP methods to remove, all of them
+            if not provided.
+
+        Returns:
+            bool: whether a route was removed.
+        """
+        removed = intern_methods(methods) if methods else None
+
+        def remove(routes):
+            kept = []
+            for route in routes:
+                if route.endpoint != endpoint:
+                    kept.append(route)
+                elif removed is not None and set(route.http_methods) - set(removed):
+                    kept.append(route.with_methods(m for m in route.http_methods if m not in removed))
+            return kept
+
+        return self._update_routes(namespace, remove)
+
+    def replace_router(self, namespace: str, router: Union[Router, str]):
+        """Replaces the router of an isolated namespace while the app
+        is handling requests.
+
+        The rules of the new router are created in a url map of their
+        own, which is then swapped with the namespace's url map in a
+        single assignment: in-flight requests are neither blocked nor
+        affected, and the url maps of the other namespaces are left
+        untouched. The app's url map is never modified once requests
+        are being handled, hence only namespaces mounted with
+        isolated=True or lazy=True can be changed.
+
+
+        Example:
+
+            mux.use('/beta', beta_router, isolated=True)
+            ...
+            mux.replace_router('/beta', 'myapp.beta:router_v2')
+
+
+        Args:
+            namespace (str): namespace of the router.
+            router (Router | str): the new router, or its import string.
+
+        Raises:
+            MuxError: if the namespace isn't isolated, or the Mux
+            instance is frozen.
+        """
+        self._check_frozen()
+        if isinstance(router, str):
+            router = import_string(router)
+        isolated_router = self._isolated_router(namespace)
+
+        with self._lock:
+            self._replace_router(namespace, isolated_router, router)
+
+    def batch(
+        self,
+        rule: str = "/batch",
+        parallel: bool = False,
+        workers: int = 8,
+        max_requests: int = 50,
+        endpoint: str = "mux_batch",
+    ) -> Batch:
+        """Registers an endpoint handling a list of requests to the
+        registered routes in a single HTTP request, see :class:`Batch`.
+
+        The sub-requests are matched and dispatched to the compiled
+        pipelines of their routes in-process, without going through
+        the app's WSGI application.
+
+
+        Example:
+
+            mux.batch('/batch', parallel=True)
+
+            POST /batch
+            [{"method": "GET", "path": "/auth/me"}, {"method": "GET", "path": "/api/orders"}]
+            # -> [{"status": 200, "headers": {...}, "body": {...}}, {...}]
+
+
+        Args:
+            rule (str): url rule of the batch endpoint.
+            parallel (bool): handle the sub-requests of a batch
+            concurrently, on a thread pool.
+            workers (int): maximum number of threads of the pool.
+            max_requests (int): maximum number of sub-requests per
+            batch, larger batches are answered with a 413.
+            endpoint (str): endpoint of the url rule.
+
+        Returns:
+            Batch: the view function of the batch endpoint.
+        """
+        self._check_frozen()
+        view_func = Batch(self, parallel=parallel, workers=workers, max_requests=max_requests)
+        self.app.add_url_rule(rule, endpoint, view_func, methods=["POST"])
+        return view_func
+
+    def dispatch(self, method: str, path: str, json=None, headers: dict = None):
+        """Handles a request to one of the registered routes within
+        the current process, e.g: to call the endpoints of another
+        router without going through HTTP.
+
+        The request is matched against the registered url rules and
+        dispatched to the compiled pipeline of its route, within
+        request and app contexts of its own, without going through the
+        app's WSGI application (see :func:`run_subrequest`). Its
+        environ is derived from one created once per Mux instance, so
+        it doesn't inherit the headers of the current request, which
+        can be forwarded explicitly.
+
+
+        Example:
+
+            response = mux.dispatch('GET', '/api/orders?page=2', headers={
+                'Authorization': request.headers['Authorization'],
+            })
+            orders = response.json
+
+
+        Args:
+            method (str): HTTP method of the request.
+            path (str): path of the request, with its query string.
+            json (Any): JSON body of the request, None for no body.
+            headers (dict): headers of the request.
+
+        Returns:
+            Response: the response of the route, or the app's 404 if
+            the path doesn't match a route registered with Mux. The
+            response must be closed once used, which runs the tasks
+            scheduled with :func:`after_response`.
+        """
+        if self._environ is None:
+            self._environ = EnvironBuilder(self.app).get_environ()
+        return run_subrequest(self, subrequest_environ(self._environ, method, path, json, headers))
+
+    def find(self, namespace: str, endpoint: str, method: str = "GET") -> Optional[Rule]:
+        """Looks up the rule registered in the namespace for the
+        endpoint and the HTTP method.
+
+        Example:
+
+            find('auth', 'login', 'POST')
+            # -> rule: /login | endpoint: login
+
+
+        Args:
+            namespace (str): namespace the rule was registered in,
+            as stored in :attr:`rules` (e.g: 'api.v1').
+            endpoint (str): endpoint of the rule, i.e. the name of
+            the view function, or the endpoint of its url rule when
+            several routes share a view function (e.g: 'handler_2').
+            method (str): HTTP method handled by the rule.
+
+        Returns:
+            Rule: the registered rule, None if there's none.
+        """
+        return self.index.get((namespace, endpoint, method.upper()))
+
+    def url_for(self, endpoint: str, **values) -> str:
+        """Builds the URL of an endpoint, similarly to :func:`flask.url_for`.
+
+        The url rules of the endpoints registered with Mux are split
+        into their static parts and converters once, building a URL
+        then skips werkzeug's generic building path. The URLs of
+        other endpoints, or requiring url_for's special arguments
+        (e.g: _external), are built by :func:`flask.url_for`.
+
+        Args:
+            endpoint (str): endpoint of the URL (e.g: 'auth.login').
+            values (**Any): variables of the url rule, unknown
+            variables are appended as query arguments.
+
+        Returns:
+            str: the built URL.
+        """
+        endpoint = self.aliases.get(endpoint, endpoint)
+        builder = self._url_builders.get(endpoint, _MISSING)
+        if builder is _MISSING:
+            builder = self._url_builders[endpoint] = self._compile_url_builder(endpoint)
+
+        url = None
+        if builder and not self.app.url_default_functions:
+            url = builder.build(values)
+
+        if url is None:
+            return flask_url_for(endpoint, **values)
+
+        script_root = request.script_root if has_request_context() else ""
+        return f"{script_root}{url}"
+
+    def _compile_url_builder(self, endpoint: str) -> Optional[UrlBuilder]:
+        """Compiles the URL builder of an endpoint registered with a
+        single url rule, endpoints with many rules are left to Flask."""
+        rules = self.url_rules.get(endpoint, ())
+        if len(rules) != 1:
+            return None
+        return UrlBuilder.compile(rules[0], self.app.url_map)
+
+    def use_many(self, routers: Dict[str, Router], *middlewares):
+        """Registers the routes of many routers at once.
+
+        Behaves like calling :meth:`use` for each namespace, but the
+        url rules of all the routers are added to the app's url map
+        in a single pass, without creating and registering a
+        blueprint per namespace. The routers are recorded once all
+        their url rules are added, none of them being recorded if
+        adding one fails.
+
+
+        Example:
+
+            mux.use_many({
+                '/auth': auth_router,
+                '/api': api_router,
+            })
+
+
+        Args:
+            routers (Dict[str, Router | str]): routers, or their import
+            strings, keyed by the namespace which their routes will be
+            mapped to.
+            middlewares (*Callable): variadic param representing
+            a sequence of middlewares shared by all the routes.
+        """
+        self._check_frozen()
+        mounts = []
+        with self._registering():
+            rules = []
+            for namespace, router in routers.items():
+                if isinstance(router, str):
+                    router = import_string(router)
+                mounts.append((namespace, router, middlewares))
+                rules.extend(self._create_url_rules(namespace, router, middlewares))
+
+            with self._lazy_rules():
+                for rule, endpoint, view_func, methods in rules:
+                    self.app.add_url_rule(rule, endpoint, view_func, methods=methods)
+        self.mounts.extend(mounts)
+
+    def _isolated_router(self, namespace: str) -> IsolatedRouter:
+        isolated_router = self.isolated.get(namespace)
+        if isolated_router is None:
+            raise MuxError(
+                f"routes can only be changed at runtime in isolated namespaces: {namespace}"
+            )
+        return isolated_router
+
+    def _update_routes(self, namespace: str, update: Callable) -> bool:
+        """Replaces the router of an isolated namespace with a copy
+        whose routes are updated by the provided function.
+
+        Returns:
+            bool: whether the routes were changed.
+        """
+        self._check_frozen()
+        isolated_router = self._isolated_router(namespace)
+
+        with self._lock:
+            isolated_router.load(self)
+            current = isolated_router.router
+            routes = update(current.routes)
+            if routes == current.routes:
+                return False
+
+            router = Router(current.name)
+            router.module = current.module
+            router.middlewares = list(current.middlewares)
+            router.routes = routes
+            self._replace_router(namespace, isolated_router, router)
+            return True
+
+    def _replace_router(self, namespace: str, isolated_router: IsolatedRouter, router: Router):
+        """Forgets the rules of the namespace's router, registers the
+        ones of the new router and swaps the url maps."""
+        _namespace = namespace.strip('/').replace('/', '.')
+        endpoints = set(isolated_router.view_functions)
+
+        self.rules[_namespace] = []
+        for key in [key for key in self.index if key[0] == _namespace]:
+            self.index.pop(key, None)
+        for alias in [alias for alias, endpoint in self.aliases.items() if endpoint in endpoints]:
+            self.aliases.pop(alias, None)
+        for endpoint in endpoints:
+            self.url_rules.pop(endpoint, None)
+            self._url_builders.pop(endpoint, None)
+        self._retired.update(endpoints)
+
+        isolated_router.replace(self, router)
+
+        self.lazy.pop(namespace, None)
+        self.mounts = [mount for mount in self.mounts if mount[0] != namespace]
+        self.mounts.append((namespace, router, isolated_router.middlewares))
+
+    def _check_frozen(self):
+        if self.frozen:
+            raise MuxError("can't register routers once the Mux instance is frozen")
+
+    def _create_rules(self, namespace: str, router: Router, middlewares: tuple):
+        """Creates the rules of the router's routes and records them
+        in the provided namespace.
+
+        Returns:
+            List[Tuple[Rule, Route]]: the created rules along with
+            the routes they were created from.
+        """
+        if middlewares:
+            Router._check_middlewares(list(middlewares))
+
+        _namespace = namespace.strip('/').replace('/', '.')
         if not self.rules.get(_namespace):
             self.rules[_namespace] = []
         bp_rules = self.rules.get(_namespace)
+        shared = [*middlewares, *router.middlewares]
+        created = []
 
         for route in router.routes:
-            rule = Rule.create_from_route(route)
+            stage = None
+            if self.metrics:
+                key = f"{','.join(sorted(route.http_methods))} {_join(namespace, route.endpoint)}"
+                stage = self.metrics.instrument(key)
+
+            rule = Rule.create_from_route(route, shared, stage)
+            view_func = rule.view_func
+            if self.json_encoder and view_func:
+                view_func = json_responses(view_func, self.json_encoder, self._json_mimetype)
+            if stage and view_func:
+                view_func = self.metrics.timer(key, "total").wrap(view_func, inclusive=True)
+            if view_func is not rule.view_func:
+                rule = Rule(rule.rule, rule.endpoint, view_func, rule.methods)
 
             if rule.view_func:
-                bp.add_url_rule(rule.rule, rule.endpoint,
-                                rule.view_func, methods=route.http_methods)
                 bp_rules.append(rule)
+                created.append((rule, route))
+                for method in rule.methods:
+                    self.index.setdefault((_namespace, rule.endpoint, method), rule)
 
-        self.app.register_blueprint(bp, url_prefix=namespace)
+        return created
+
+    def _create_tables(self, namespace: str, router: Router, middlewares: tuple):
+        """Creates the rules of the router's routes and merges the
+        ones sharing the same path into a single url rule, whose view
+        function is a :class:`MethodTable` when they're many.
+
+        Returns:
+            List[Tuple[str, str, Callable, Tuple[str]]]: the url rule,
+            endpoint, view function and HTTP methods of each path,
+            not prefixed with the namespace.
+        """
+        _namespace = namespace.strip('/').replace('/', '.')
+        paths: Dict[str, List[Rule]] = {}
+        for rule, _ in self._create_rules(namespace, router, middlewares):
+            paths.setdefault(rule.rule, []).append(rule)
+
+        tables = []
+        for path, rules in paths.items():
+            endpoint = self._unique_endpoint(_namespace, rules[0].endpoint)
+            view_func, methods = rules[0].view_func, rules[0].methods
+            if len(rules) > 1:
+                view_func = MethodTable.create((rule.methods, rule.view_func) for rule in rules)
+                methods = view_func.methods
+
+            self.url_rules[_flask_endpoint(_namespace, endpoint)] = [_join(namespace, path)]
+            for rule in rules:
+                # routes sharing a view function are also found by the
+                # suffixed endpoint of their url rule (e.g: handler_2)
+                for method in rule.methods:
+                    self.index.setdefault((_namespace, endpoint, method), rule)
+                alias = _flask_endpoint(_namespace, rule.endpoint)
+                if alias not in self.url_rules:
+                    self.aliases.setdefault(alias, _flask_endpoint(_namespace, endpoint))
+            tables.append((path, endpoint, view_func, methods))
+
+        return tables
+
+    def _unique_endpoint(self, namespace: str, endpoint: str) -> str:
+        """Suffixes the endpoint if it's already registered in the namespace."""
+        unique, suffix = endpoint, 1
+        while self._is_taken(_flask_endpoint(namespace, unique)):
+            suffix += 1
+            unique = f"{endpoint}_{suffix}"
+        return unique
+
+    def _owns(self, endpoint: str) -> bool:
+        """Returns whether the url rules of the endpoint were registered
+        by the Mux instance."""
+        return (
+            endpoint in self.url_rules
+            or endpoint.rpartition(".")[2] == MOUNT_ENDPOINT
+            or any(endpoint in router.view_functions for router in self.isolated.values())
+        )
+
+    def _is_taken(self, endpoint: str) -> bool:
+        if endpoint in self.url_rules or endpoint in self.aliases:
+            return True
+        return endpoint in self.app.view_functions and endpoint not in self._retired
+
+    def _use_lazy(self, namespace: str, import_name: str, middlewares: tuple):
+        """Reserves the namespace for a router registered by import
+        string, see :class:`LazyRouter`."""
+        if not isinstance(import_name, str):
+            raise MuxError("lazy routers must be provided as import strings")
+        if middlewares:
+            Router._check_middlewares(list(middlewares))
+
+        lazy_router = LazyRouter(namespace, import_name, middlewares)
+        self.lazy[namespace] = lazy_router
+        self._mount(namespace, lazy_router)
+
+    def _use_isolated(self, namespace: str, router: Router, middlewares: tuple):
+        """Registers the router's routes in a url map of their own,
+        see :class:`IsolatedRouter`."""
+        isolated_router = IsolatedRouter(namespace, router, middlewares)
+        isolated_router.load(self)
+        self.mounts.append((namespace, router, middlewares))
+        self._mount(namespace, isolated_router)
+
+    def _mount(self, namespace: str, isolated_router: IsolatedRouter):
+        """Reserves the namespace of an isolated router with catch-all
+        url rules, and routes its requests through the dispatcher."""
+        self.isolated[namespace] = isolated_router
+        if self.dispatcher:
+            self.dispatcher.mount(namespace, isolated_router)
+
+        _namespace = namespace.strip('/').replace('/', '.')
+        endpoint = _flask_endpoint(_namespace, MOUNT_ENDPOINT)
+        view_func = partial(isolated_router.dispatch, self)
+        # OPTIONS requests are answered by the isolated router
+        methods = ["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"]
+
+        prefix = namespace.rstrip('/')
+        for rule in dict.fromkeys((prefix or '/', f"{prefix}/", f"{prefix}/<path:__path__>")):
+            self.app.add_url_rule(
+                rule, endpoint, view_func, methods=methods, provide_automatic_options=False
+            )
+
+    def _build_url(self, error, endpoint: str, values: dict):
+        """Url build error handler building the URLs of the aliased
+        endpoints and of the endpoints of the isolated routers."""
+        if endpoint in self.aliases:
+            return flask_url_for(self.aliases[endpoint], **values)
+        for isolated_router in self.isolated.values():
+            url = isolated_router.build(endpoint, values)
+            if url is not None:
+                return url
+        return None
+
+    def _create_url_rules(self, namespace: str, router: Router, middlewares: tuple):
+        """Creates the rules of the router's routes, prefixed with the
+        namespace the same way a blueprint prefixes its rules.
+
+        Returns:
+            List[Tuple[str, str, Callable, Tuple[str]]]: the url rule,
+            endpoint, view function and HTTP methods of each path.
+        """
+        _namespace = namespace.strip('/').replace('/', '.')
+        return [
+            (_join(namespace, rule), _flask_endpoint(_namespace, endpoint), view_func, methods)
+            for rule, endpoint, view_func, methods in self._create_tables(namespace, router, middlewares)
+        ]
+
+    @contextmanager
+    def _registering(self):
+        """Restores the registry of the Mux instance if registering
+        routes within the context fails (e.g: a url rule with an
+        unknown converter), so that it's never left half-updated. The
+        url rules already added to the app are left in its url map."""
+        rules = {namespace: list(rules) for namespace, rules in self.rules.items()}
+        url_rules, aliases, index = dict(self.url_rules), dict(self.aliases), dict(self.index)
+        try:
+            yield
+        except BaseException:
+            self.rules, self.url_rules, self.aliases, self.index = rules, url_rules, aliases, index
+            self._url_builders.clear()
+            raise
+
+    @contextmanager
+    def _lazy_rules(self):
+        """Makes the url rules added to the app within the context
+        compile their URL builders on first use instead of when
+        they are added to the url map.
+
+        The swap of the app's url rule class is serialized between
+        threads, and the class is restored even if registering fails.
+        """
+        with _url_rule_class_lock:
+            url_rule_class = self.app.url_rule_class
+            self.app.url_rule_class = lazy_rule_class(url_rule_class)
+            try:
+                yield
+            finally:
+                self.app.url_rule_class = url_rule_class
@@ -0,0 +1,141 @@
+import inspect
+from functools import partial, wraps
+from typing import Callable, Optional, Sequence
+
+
+def is_async(fn: Callable) -> bool:
+    """Checks if the provided callable is a coroutine function
+    (e.g: an ``async def`` view or middleware wrapper)."""
+    return inspect.iscoroutinefunction(fn) or inspect.iscoroutinefunction(
+        getattr(fn, "__call__", None)
+    )
+
+
+def _to_async(fn: Callable) -> Callable:
+    """Turns a sync callable into a coroutine function so it can be
+    awaited by an async middleware."""
+
+    @wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return fn(*args, **kwargs)
+
+    return wrapper
+
+
+def _awaiting(fn: Callable) -> Callable:
+    """Turns a sync middleware wrapping an async pipeline into a
+    coroutine function.
+
+    The sync wrapper either returns a response straight away or the
+    awaitable produced by the next stage, which is awaited on the
+    same event loop.
+    """
+
+    @wraps(fn)
+    async def wrapper(*args, **kwargs):
+        rv = fn(*args, **kwargs)
+        if inspect.isawaitable(rv):
+            rv = await rv
+        return rv
+
+    return wrapper
+
+
+class _NextStage:
+    """Next stage handed to a middleware whose code doesn't tell if it
+    awaits it, pointed to the sync or async stage once the middleware
+    returned its wrapper."""
+
+    __slots__ = ("target",)
+
+    def __init__(self):
+        self.target = None
+
+    def __call__(self, *args, **kwargs):
+        return self.target(*args, **kwargs)
+
+
+def _awaits_next(mw: Callable) -> Optional[bool]:
+    """Tells from the code of a middleware whether the wrappers it
+    creates are all coroutine functions (e.g: an async middleware),
+    without calling it. Middlewares also defining sync functions
+    (e.g: the ones following the next stage, see :func:`is_async`)
+    don't await a sync next stage. None when the middleware doesn't
+    define any function itself.
+    """
+    fn = mw.func if isinstance(mw, partial) else mw
+    code = getattr(fn, "__code__", None)
+    if code is None:
+        code = getattr(getattr(type(fn), "__call__", None), "__code__", None)
+
+    flags = [const.co_flags for const in getattr(code, "co_consts", ()) if inspect.iscode(const)]
+    if not flags:
+        return None
+    return all(flag & inspect.CO_COROUTINE for flag in flags)
+
+
+def compile_pipeline(
+    view_func: Callable, middlewares: Sequence[Callable], stage: Callable = None
+) -> Callable:
+    """Composes the middlewares around the view function once and
+    returns the resulting callable.
+
+    Middlewares are composed from the innermost to the outermost one,
+    so that the first middleware in the sequence is the first one to
+    be invoked when a request hits the endpoint:
+
+        compile_pipeline(view, [is_auth, is_json])
+        # -> is_auth(is_json(view))
+
+    Since the composition happens at registration time, a request
+    only pays for the calls performed by the middlewares themselves,
+    regardless of the length of the chain.
+
+    Sync and async (``async def``) middlewares and views can be mixed.
+    As soon as one stage is async, every stage above it is adapted so
+    that the whole chain is a single coroutine function, which Flask's
+    async view support runs with one event loop hop per request.
+
+    Args:
+        view_func (Callable): view function at the tail of the chain.
+        middlewares (Sequence): middlewares to wrap the view_func.
+        stage (Callable): optional hook called with each stage of the
+        pipeline and the middleware (or view function) it was built
+        from, its return value replaces the stage (e.g: to time it).
+
+    Returns:
+        Callable: the pre-composed pipeline.
+    """
+    pipeline = view_func
+    asynchronous = is_async(view_func)
+    if stage:
+        pipeline = stage(pipeline, view_func)
+
+    for mw in reversed(middlewares):
+        # an async middleware awaits the next stage, which must
+        # therefore be awaitable as well. Each middleware is called
+        # once, its code telling whether the stage must be adapted
+        next_stage = pipeline
+        if not asynchronous:
+            awaits = _awaits_next(mw)
+            if awaits:
+                next_stage = _to_async(pipeline)
+            elif awaits is None:
+                next_stage = _NextStage()
+
+        wrapped = mw(next_stage)
+        if isinstance(next_stage, _NextStage):
+            next_stage.target = _to_async(pipeline) if is_async(wrapped) else pipeline
+            next_stage = next_stage.target
+        elif is_async(wrapped) and not is_async(next_stage):
+            # the async wrapper isn't defined by the middleware itself
+            next_stage = _to_async(pipeline)
+            wrapped = mw(next_stage)
+
+        if is_async(next_stage) and not is_async(wrapped):
+            wrapped = _awaiting(wrapped)
+        asynchronous = is_async(wrapped)
+
+        pipeline = stage(wrapped, mw) if stage else wrapped
+
+    return pipeline
@@ -0,0 +1,175 @@
+import json
+from functools import wraps
+from typing import Any, Callable, Union
+from flask import Flask, current_app, jsonify
+from werkzeug.datastructures import Headers
+from werkzeug.http import HTTP_STATUS_CODES
+from flask_mux.pipeline import is_async
+from flask_mux.router import Record
+
+try:
+    from _json import encode_basestring, encode_basestring_ascii, make_encoder
+except ImportError:  # pragma: no cover
+    make_encoder = None
+
+
+class ConstantJSON(Record):
+    """JSON response whose body is encoded once, when it's created,
+    instead of on every request (e.g: the rejections of a middleware).
+
+    Constant responses are opt-in: a middleware or a view function
+    returning a dict still has it encoded on every request, it must
+    return a ConstantJSON created beforehand instead (as the guards
+    of the examples do). They're built straight into a response by
+    the pipelines compiled with fast JSON responses (see
+    :func:`json_responses`), and are otherwise run as a WSGI
+    application by Flask. The body is always compact, with sorted
+    keys, regardless of the app's pretty printing settings.
+
+
+    Example:
+
+        UNAUTHORIZED = ConstantJSON({'success': False, 'message': 'unauthorized access'}, 401)
+
+        def is_auth(next_middleware):
+            @wraps(next_middleware)
+            def wrapper(*args, **kwargs):
+                if not request.headers.get('Authorization'):
+                    return UNAUTHORIZED
+                return next_middleware(*args, **kwargs)
+            return wrapper
+
+
+    Properties:
+        data (bytes): the encoded body.
+        status (int): status code of the response.
+        headers (list): headers of the response.
+    """
+
+    __slots__ = ("data", "status", "headers")
+
+    def __init__(self, body: Any, status: int = 200, headers: dict = None):
+        data = f"{json.dumps(body, separators=(',', ':'), sort_keys=True)}\n".encode()
+        headers = Headers(headers)
+        headers.setdefault("Content-Type", "application/json")
+        headers["Content-Length"] = str(len(data))
+        self._init(data=data, status=status, headers=headers.to_wsgi_list())
+
+    def build(self):
+        return current_app.response_class(self.data, self.status, self.headers)
+
+    def __call__(self, environ: dict, start_response: Callable):
+        start_response(f"{self.status} {HTTP_STATUS_CODES.get(self.status, 'UNKNOWN')}", self.headers)
+        return [self.data]
+
+
+def compile_encoder(app: Flask) -> Callable[[Any], bytes]:
+    """Compiles the JSON encoder of the app once, producing the same
+    bodies as :func:`flask.jsonify` (sorted keys, compact separators
+    and a trailing newline, values of other types being converted by
+    the app's JSON encoder).
+
+    The C encoder of the json module is created once rather than on
+    every call, without the detection of circular references. When
+    jsonify pretty prints its output (JSONIFY_PRETTYPRINT_REGULAR or
+    debug mode, checked on every call), the bodies are encoded by
+    jsonify itself.
+    """
+    provider = getattr(app, "json", None)
+    if provider is not None and hasattr(provider, "default"):
+        default, sort_keys, ensure_ascii = provider.default, provider.sort_keys, provider.ensure_ascii
+
+        def pretty() -> bool:
+            compact = getattr(provider, "compact", None)
+            return compact is False or (compact is None and app.debug)
+
+    else:
+        default = app.json_encoder().default
+        sort_keys, ensure_ascii = app.config["JSON_SORT_KEYS"], app.config["JSON_AS_ASCII"]
+
+        def pretty() -> bool:
+            return app.config["JSONIFY_PRETTYPRINT_REGULAR"] or app.debug
+
+    if make_encoder is None:  # pragma: no cover
+        encoder = json.JSONEncoder(
+            default=default, sort_keys=sort_keys, ensure_ascii=ensure_ascii, separators=(",", ":")
+        )
+
+        def iterencode(obj, _):
+            return encoder.iterencode(obj)
+
+    else:
+        iterencode = make_encoder(
+            None,
+            default,
+            encode_basestring_ascii if ensure_ascii else encode_basestring,
+            None,
+            ":",
+            ",",
+            sort_keys,
+            False,
+            True,
+        )
+
+    def encode(obj) -> bytes:
+        if pretty():
+            return jsonify(obj).get_data()
+        return f"{''.join(iterencode(obj, 0))}\n".encode()
+
+    return encode
+
+
+def _to_response(rv, encode: Callable, mimetype: str):
+    """Builds the response of a dict or list return value, or of a
+    (body, status), (body, headers) or (body, status, headers) tuple
+    whose body is a dict or a list. Other values are left to Flask."""
+    rv_type = type(rv)
+    if rv_type is dict or rv_type is list:
+        return current_app.response_class(encode(rv), mimetype=mimetype)
+    if rv_type is ConstantJSON:
+        return rv.build()
+    if rv_type is not tuple or not rv or type(rv[0]) not in (dict, list):
+        return rv
+
+    status = headers = None
+    if len(rv) == 3:
+        _, status, headers = rv
+    elif len(rv) == 2:
+        if isinstance(rv[1], (Headers, dict, tuple, list)):
+            headers = rv[1]
+        else:
+            status = rv[1]
+    else:
+        return rv
+    return current_app.response_class(encode(rv[0]), status, headers, mimetype=mimetype)
+
+
+def json_responses(
+    pipeline: Callable, encode: Callable[[Any], Union[bytes, str]], mimetype: str = "application/json"
+) -> Callable:
+    """Wraps a compiled pipeline so that the dicts and lists returned
+    by its middlewares and view function are encoded by `encode`
+    rather than by Flask's generic response conversion.
+
+    Args:
+        pipeline (Callable): the compiled pipeline.
+        encode (Callable): JSON encoder, returning bytes or a str
+        (e.g: the encoder returned by :func:`compile_encoder`).
+        mimetype (str): mimetype of the JSON responses.
+
+    Returns:
+        Callable: the wrapped pipeline.
+    """
+    if is_async(pipeline):
+
+        @wraps(pipeline)
+        async def async_wrapper(*args, **kwargs):
+            return _to_response(await pipeline(*args, **kwargs), encode, mimetype)
+
+        return async_wrapper
+
+    @wraps(pipeline)
+    def wrapper(*args, **kwargs):
+        return _to_response(pipeline(*args, **kwargs), encode, mimetype)
+
+    return wrapper
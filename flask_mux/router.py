@@ -1,9 +1,43 @@
+import sys
 from functools import wraps
-from typing import List, Callable, Sequence
+from threading import Lock
+from typing import Dict, FrozenSet, Iterable, List, Callable, Optional, Sequence, Tuple
 from flask_mux.errors import MissingHandlerError, UncallableMiddlewareError
+from flask_mux.pipeline import compile_pipeline
 
+_interned_methods: Dict[FrozenSet[str], Tuple[str, ...]] = {}
+# serializes the compilation of the routes' pipelines
+_compile_lock = Lock()
 
-class Route:
+
+def intern_methods(methods: Iterable[str]) -> Tuple[str, ...]:
+    """Returns the sorted tuple of the provided HTTP methods, the same
+    tuple instance being shared by all the routes allowing the same
+    set of methods."""
+    key = frozenset(method.upper() for method in methods)
+    if key not in _interned_methods:
+        _interned_methods[key] = tuple(sorted(key))
+    return _interned_methods[key]
+
+
+class Record:
+    """Base class of the slotted, immutable objects created when
+    registering routes (e.g: :class:`Route`)."""
+
+    __slots__ = ()
+
+    def _init(self, **fields):
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} objects are immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} objects are immutable")
+
+
+class Route(Record):
     """Object representation of a route.
 
     As the name implies, the Route class represents a route
@@ -15,43 +49,76 @@ class Route:
     The created instance will be used to create the url rule
     which will be registered to the Flask url map.
 
+    Routes are immutable, and routes allowing the same HTTP methods
+    share the same http_methods tuple.
+
 
     Properties:
         endpoint (str):
             the endpoint to be handled.
 
-        http_methods (List[str]):
-            list of the HTTP methods that are allowed within the route.
+        http_methods (Tuple[str]):
+            the HTTP methods that are allowed within the route.
 
         view_func (Callable):
             the view function wrapped within the provided middlewares
-            which will be registred with url rule.
+            which will be registred with url rule, compiled on first
+            use (see :meth:`create`).
 
         unwrapped_view_func (Callable):
             the unwrapped version of the view function.
 
+        middlewares (tuple):
+            the middlewares wrapping the view function.
+
     """
 
+    __slots__ = (
+        "endpoint", "http_methods", "_view_func", "unwrapped_view_func", "middlewares"
+    )
+
     def __init__(
         self,
         endpoint: str,
-        view_func: Callable,
-        http_methods: list = None,
+        view_func: Optional[Callable],
+        http_methods: Iterable[str] = None,
         unwrapped=None,
+        middlewares: Sequence[Callable] = (),
     ):
-        self.endpoint: str = endpoint
-        self.http_methods = http_methods or ["GET"]
-        self.view_func = view_func
-        self.unwrapped_view_func = unwrapped or self.view_func
+        self._init(
+            endpoint=endpoint,
+            http_methods=intern_methods(http_methods or ["GET"]),
+            _view_func=view_func,
+            unwrapped_view_func=unwrapped or view_func,
+            middlewares=tuple(middlewares),
+        )
 
     def __repr__(self):
         return f"{self.endpoint} -> {self.http_methods}"
 
+    @property
+    def view_func(self) -> Callable:
+        if self._view_func is None:
+            with _compile_lock:
+                if self._view_func is None:
+                    self._init(_view_func=compile_pipeline(self.unwrapped_view_func, self.middlewares))
+        return self._view_func
+
+    def with_methods(self, methods: Iterable[str]) -> "Route":
+        """Returns a copy of the route allowing other HTTP methods,
+        sharing its pipeline."""
+        return Route(self.endpoint, self._view_func, methods, self.unwrapped_view_func, self.middlewares)
+
     @classmethod
     def create(cls, endpoint: str, methods: Sequence[str], middlewares: list):
-        """Calls the :meth`_wrap_view_func` to wrap the view function
-        within the provided middlwares, and then creates a new instance
-        of the Route class.
+        """Creates a new instance of the Route class, whose view
+        function is the pipeline composed from the provided
+        middlewares and the view function by :func:`compile_pipeline`.
+
+        The pipeline is compiled on first use of :attr:`view_func`,
+        when the route is registered: a Mux instance compiling the
+        middlewares along with timing stages (see :class:`Metrics`)
+        then calls each middleware once.
 
         Args:
             endpoint (str): Request's endpoint.
@@ -73,60 +140,18 @@ class Route:
         # that element is the view function, no wrapping needed
         # returning the Route instance
         if len(middlewares) == 1:
-            return cls(endpoint, view_func, http_methods=[*set(methods)])
+            return cls(endpoint, view_func, http_methods=methods)
 
-        # call the self._wrap_view_func to wrap the view_function within
-        # the provied the middlewares
+        # compose the middlewares around the view function once,
+        # requests will be handled by the pre-composed pipeline
         return cls(
             endpoint,
-            cls._wrap_view_func(view_func, middlewares[:-1]),
-            http_methods=[*set(methods)],
+            None,
+            http_methods=methods,
             unwrapped=view_func,
+            middlewares=middlewares[:-1],
         )
 
-    @staticmethod
-    def _wrap_view_func(view_func, middlewares: List):
-        """Returns a wrapper that wraps the view function
-        within the the middlewares by `dequeueing` each middleware
-        from the passed middlewares list.
-
-        Args:
-            view_func (callable): view function.
-            middlewares (list): list of middlewares to wrap the
-            view_func.
-
-        Returns:
-            callable: the new wrapped view function that will be passed
-            to the Flask.add_url_rule method.
-        """
-
-        def wrapper(*args, **kwargs):
-
-            # perform a deep copy of the middlewares list to not
-            # mutate it.
-            mws = middlewares.copy()
-            mw = mws.pop(0)
-
-            # loop until the copied list is empty
-            while mws:
-                # call each middleware by passing
-                # the next one as argument
-                mw = mw(mws.pop(0))
-
-            # if current mw is a tuple
-            # (not a callable -> not a view func)
-            # return the mw since it's the response that will be
-            # supplied to Flask
-            if isinstance(mw, tuple):
-                return mw
-
-            view_fn = mw(view_func)
-            if isinstance(view_fn, Callable):
-                return view_fn(*args, **kwargs)
-            return mw(view_func)
-
-        return wrapper
-
 
 class Router:
     """A router that stores routes defined within a namespace.
@@ -155,11 +180,44 @@ class Router:
             those routes are appended to the list automatically
             when created using the methods the Router class
             implements.
+        middlewares (List[Callable]):
+            list of middlewares shared by all the routes defined
+            within the namespace, registered using :meth:`use`.
+        module (str):
+            name of the module the router was created in, which
+            may differ from its name.
     """
 
     def __init__(self, name: str):
         self.name = name
         self.routes: List[Route] = []
+        self.middlewares: List[Callable] = []
+        self.module = sys._getframe(1).f_globals.get("__name__", name)
+
+    def use(self, *middlewares):
+        """Registers middlewares that will be invoked before the
+        ones of every route defined within the router, regardless
+        of the order in which the routes were created.
+
+        The middlewares are composed with each route's pipeline
+        once, when the router is registered using :meth:`Mux.use`.
+
+
+        Example:
+
+            admin_router.use(is_auth, is_admin)
+            admin_router.get('/users', get_users)
+            # -> equivalent to admin_router.get('/users', is_auth, is_admin, get_users)
+
+
+        Args:
+            middlewares (*Callable): variadic param representing
+            a sequence of middlewares.
+        """
+        self._check_middlewares(
+            list(middlewares), "no middleware was provided to Router.use, expected at least one"
+        )
+        self.middlewares.extend(middlewares)
 
     def route(self, endpoint: str, http_methods: list = None):
         """Acts similarly to :meth:`Flask.route` decorator.
@@ -264,12 +322,13 @@ class Router:
         self.routes.append(route)
 
     @staticmethod
-    def _check_middlewares(middlewares: list):
+    def _check_middlewares(middlewares: list, missing: str = "no handler was provided"):
         """Checks if the provided middlawares are valid callable
-        objects."""
+        objects, raising a MissingHandlerError with the `missing`
+        message if there are none."""
 
         if not middlewares:
-            raise MissingHandlerError("no handler was provided")
+            raise MissingHandlerError(missing)
 
         for mw in middlewares:
             if not isinstance(mw, Callable):
@@ -0,0 +1,166 @@
+import hashlib
+import json
+from importlib.util import find_spec
+from typing import Callable, Dict, Optional
+from werkzeug.utils import import_string
+from flask_mux.errors import MuxError
+from flask_mux.router import Route, Router
+
+SNAPSHOT_VERSION = 2
+
+
+def import_path(fn: Callable) -> str:
+    """Returns the import string of a module level function.
+
+    Raises:
+        MuxError: if the callable can't be imported back (e.g: a
+        lambda, a closure or a middleware instance).
+    """
+    module = getattr(fn, "__module__", None)
+    qualname = getattr(fn, "__qualname__", None)
+    if not module or not qualname or "<" in qualname or "." in qualname:
+        raise MuxError(f"{fn!r} can't be imported by an import string")
+    return f"{module}:{qualname}"
+
+
+def module_hash(module: str) -> Optional[str]:
+    """Returns the sha256 of the module's source file, without
+    importing the module itself."""
+    try:
+        spec = find_spec(module)
+    except (ImportError, ValueError):
+        return None
+    if spec is None or not spec.origin or not spec.has_location:
+        return None
+
+    with open(spec.origin, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def content_hash(modules: Dict[str, Optional[str]]) -> str:
+    """Hashes the source hashes of the modules the snapshot was built from."""
+    digest = hashlib.sha256()
+    for module, source_hash in sorted(modules.items()):
+        digest.update(f"{module}={source_hash};".encode())
+    return digest.hexdigest()
+
+
+def dump(mux) -> dict:
+    """Exports the route table of the Mux instance.
+
+    Returns:
+        dict: the namespaces, routes, HTTP methods and the import
+        strings of the view functions and middlewares, along with
+        the hashes of the modules defining them.
+    """
+    modules = {}
+    mounts = []
+
+    def path(fn: Callable) -> str:
+        import_name = import_path(fn)
+        modules.setdefault(import_name.split(":")[0], None)
+        return import_name
+
+    for namespace, router, middlewares in mux.mounts:
+        # the routes are usually defined in the module creating the
+        # router, whose name isn't necessarily the router's name
+        modules.setdefault(router.module, None)
+        mounts.append({
+            "namespace": namespace,
+            "name": router.name,
+            "module": router.module,
+            "isolated": namespace in mux.isolated,
+            "middlewares": [path(mw) for mw in (*middlewares, *router.middlewares)],
+            "routes": [
+                {
+                    "endpoint": route.endpoint,
+                    "methods": list(route.http_methods),
+                    "view": path(route.unwrapped_view_func),
+                    "middlewares": [path(mw) for mw in route.middlewares],
+                }
+                for route in router.routes
+            ],
+        })
+
+    for namespace, lazy_router in mux.lazy.items():
+        modules.setdefault(lazy_router.import_name.split(":")[0], None)
+        mounts.append({
+            "namespace": namespace,
+            "lazy": lazy_router.import_name,
+            "middlewares": [path(mw) for mw in lazy_router.middlewares],
+        })
+
+    modules = {module: module_hash(module) for module in modules}
+    return {
+        "version": SNAPSHOT_VERSION,
+        "hash": content_hash(modules),
+        "modules": modules,
+        "mounts": mounts,
+    }
+
+
+def is_fresh(snapshot: dict) -> bool:
+    """Checks that the modules the snapshot was built from didn't
+    change since."""
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        return False
+
+    modules = {module: module_hash(module) for module in snapshot.get("modules", {})}
+    return modules == snapshot["modules"] and content_hash(modules) == snapshot.get("hash")
+
+
+def save(mux, filename: str):
+    """Writes the snapshot of the Mux instance's route table to a file."""
+    snapshot = dump(mux)
+    with open(filename, "w") as f:
+        json.dump(snapshot, f)
+
+
+def load(mux, filename: str) -> bool:
+    """Registers the routes of a snapshot file with the Mux instance.
+
+    Returns:
+        bool: False if the snapshot file is missing, invalid or
+        stale, in which case nothing was registered.
+    """
+    try:
+        with open(filename) as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return False
+
+    if not isinstance(snapshot, dict) or not is_fresh(snapshot):
+        return False
+
+    try:
+        routers = {}
+        isolated = {}
+        lazy = []
+        for mount in snapshot["mounts"]:
+            middlewares = [import_string(mw) for mw in mount["middlewares"]]
+            if "lazy" in mount:
+                lazy.append((mount["namespace"], mount["lazy"], middlewares))
+                continue
+
+            router = Router(mount["name"])
+            router.module = mount["module"]
+            router.middlewares = middlewares
+            for route in mount["routes"]:
+                router.routes.append(Route.create(
+                    route["endpoint"],
+                    route["methods"],
+                    [*map(import_string, route["middlewares"]), import_string(route["view"])],
+                ))
+            if mount.get("isolated"):
+                isolated[mount["namespace"]] = router
+            else:
+                routers[mount["namespace"]] = router
+    except (ImportError, KeyError, TypeError):
+        return False
+
+    mux.use_many(routers)
+    for namespace, router in isolated.items():
+        mux.use(namespace, router, isolated=True)
+    for namespace, import_name, middlewares in lazy:
+        mux.use(namespace, import_name, *middlewares, lazy=True)
+    return True
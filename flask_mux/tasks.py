@@ -0,0 +1,284 @@
+import atexit
+import os
+import weakref
+from queue import Empty, Full, Queue
+from threading import Condition, Lock, Thread
+from time import monotonic, perf_counter
+from typing import Callable, List, Optional
+from flask import Flask, after_this_request, current_app, has_request_context
+from flask_mux.context import Key
+from flask_mux.errors import MuxError
+from flask_mux.metrics import Timer
+
+EXTENSION = "flask_mux.tasks"
+
+# tasks scheduled by the current request, kept on its request context
+_TASKS: Key[list] = Key("after-response tasks")
+
+# pools drained when the interpreter exits
+_pools = weakref.WeakSet()
+
+
+class TaskPool:
+    """Bounded pool of worker threads running the tasks scheduled
+    with :func:`after_response`, once the response has been sent.
+
+    Tasks are queued up to `max_queued`. When the queue is full, the
+    thread scheduling a task waits up to `timeout` seconds for a free
+    slot (after the response was sent, so it only delays the next
+    request of that thread), then runs the task itself: tasks are
+    never dropped, and a saturated pool slows down the producers.
+
+    Each task runs within a fresh app context of the app that
+    scheduled it: flask.g and the request aren't available, the
+    values a task needs must be passed as arguments. Their exceptions
+    are logged by the app's logger.
+
+    The worker threads are started on the first task, in the process
+    running it (e.g: a forked worker), and the queued tasks are
+    drained when the interpreter exits (see :meth:`shutdown`).
+
+
+    Example:
+
+        mux = Mux(app, tasks=TaskPool(workers=8, max_queued=10000))
+
+        def create_order():
+            order = orders.create(request.json)
+            after_response(audit_log, 'order_created', order.id)
+            return {'id': order.id}, 201
+
+
+    Properties:
+        workers (int): maximum number of worker threads.
+        max_queued (int): capacity of the queue.
+        timeout (float): seconds waited for a slot in a full queue.
+        drain_timeout (float): seconds waited for the queued tasks
+        when the interpreter exits.
+        timer (Timer): wall times of the completed tasks.
+        peak_queued (int): highest number of queued tasks so far.
+        completed (int): number of tasks that returned.
+        failed (int): number of tasks that raised.
+        caller_ran (int): number of tasks run by the scheduling
+        thread because the queue was full.
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        max_queued: int = 1024,
+        timeout: float = 1.0,
+        drain_timeout: float = 30,
+    ):
+        if workers < 1:
+            raise MuxError("a task pool needs at least one worker")
+        self.workers = workers
+        self.max_queued = max_queued
+        self.timeout = timeout
+        self.drain_timeout = drain_timeout
+        self.timer = Timer()
+        self.peak_queued = 0
+        self.completed = 0
+        self.failed = 0
+        self.caller_ran = 0
+        self.running = 0
+        self.closed = False
+        self._lock = Lock()
+        self._idle = Condition(self._lock)
+        self._pending = 0
+        self._reset()
+
+    def submit(self, fn: Callable, *args, **kwargs):
+        """Queues a task, see :class:`TaskPool` for the backpressure.
+
+        Raises:
+            MuxError: if the pool was shut down.
+        """
+        if self.closed:
+            raise MuxError("can't submit tasks to a task pool once it's shut down")
+
+        app = current_app._get_current_object()
+        task = (app, fn, args, kwargs)
+        self._start()
+
+        with self._lock:
+            self._pending += 1
+        try:
+            self._queue.put(task, timeout=self.timeout)
+        except Full:
+            with self._lock:
+                self.caller_ran += 1
+            self._run(task)
+            return
+
+        depth = self._queue.qsize()
+        if depth > self.peak_queued:
+            self.peak_queued = depth
+
+    def drain(self, timeout: float = None) -> bool:
+        """Waits for the queued and running tasks to complete.
+
+        Returns:
+            bool: whether they completed within the timeout.
+        """
+        deadline = None if timeout is None else monotonic() + timeout
+        with self._idle:
+            while self._pending:
+                remaining = None if deadline is None else deadline - monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def shutdown(self, timeout: float = None) -> bool:
+        """Stops accepting tasks, drains the queued ones and stops
+        the worker threads.
+
+        Returns:
+            bool: whether the queued tasks completed within the timeout.
+        """
+        self.closed = True
+        drained = self.drain(timeout)
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            try:
+                self._queue.put_nowait(None)
+            except Full:
+                break
+        if drained:
+            for thread in threads:
+                thread.join(timeout)
+        return drained
+
+    def stats(self) -> dict:
+        """Returns the queue depth and the counters of the pool, along
+        with the percentiles of the tasks' wall times in milliseconds."""
+        return {
+            "workers": len(self._threads),
+            "queued": self._queue.qsize(),
+            "peak_queued": self.peak_queued,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "caller_ran": self.caller_ran,
+            "duration": self.timer.percentiles(),
+        }
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._queue = Queue(self.max_queued)
+        self._threads: List[Thread] = []
+
+    def _start(self):
+        if len(self._threads) >= self.workers and self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid != os.getpid():
+                # the threads of the parent process don't survive a fork
+                self._reset()
+                self._pending = 0
+            idle = len(self._threads) - self.running - self._queue.qsize()
+            if len(self._threads) >= self.workers or idle > 0:
+                return
+            thread = Thread(target=self._work, name=f"flask-mux-task-{len(self._threads)}", daemon=True)
+            self._threads.append(thread)
+            _pools.add(self)
+        thread.start()
+
+    def _work(self):
+        queue = self._queue
+        while True:
+            try:
+                task = queue.get(timeout=1)
+            except Empty:
+                if self.closed:
+                    return
+                continue
+            if task is None:
+                return
+            self._run(task)
+
+    def _run(self, task: tuple):
+        app, fn, args, kwargs = task
+        with self._lock:
+            self.running += 1
+
+        start = perf_counter()
+        failed = False
+        try:
+            with app.app_context():
+                fn(*args, **kwargs)
+        except Exception:
+            failed = True
+            app.logger.exception("after-response task %r failed", fn)
+        finally:
+            elapsed = perf_counter() - start
+            with self._lock:
+                self.timer.record(elapsed)
+                self.running -= 1
+                self._pending -= 1
+                if failed:
+                    self.failed += 1
+                else:
+                    self.completed += 1
+                if not self._pending:
+                    self._idle.notify_all()
+
+
+def init_app(app: Flask, pool: TaskPool):
+    """Makes the pool run the tasks scheduled by the app's requests."""
+    app.extensions[EXTENSION] = pool
+
+
+def after_response(fn: Callable, *args, **kwargs):
+    """Schedules a task to run on the app's :class:`TaskPool` once
+    the response of the current request has been sent, e.g: from a
+    view function or a middleware. Outside of a request, the task is
+    submitted right away.
+
+    Args:
+        fn (Callable): the task.
+        args (*Any): positional arguments of the task.
+        kwargs (**Any): keyword arguments of the task.
+
+    Raises:
+        MuxError: if the app has no task pool, see :class:`Mux`.
+    """
+    pool: Optional[TaskPool] = current_app.extensions.get(EXTENSION)
+    if pool is None:
+        raise MuxError("after-response tasks require a Mux instance created with tasks=True")
+
+    if not has_request_context():
+        pool.submit(fn, *args, **kwargs)
+        return
+
+    tasks = _TASKS.get(None)
+    if tasks is None:
+        tasks = _TASKS.set([])
+        after_this_request(_schedule(pool, tasks))
+    tasks.append((fn, args, kwargs))
+
+
+def _schedule(pool: TaskPool, tasks: list) -> Callable:
+    """Returns the after-request function submitting the request's
+    tasks when its response is closed by the WSGI server."""
+    app = current_app._get_current_object()
+
+    def submit():
+        with app.app_context():
+            for fn, args, kwargs in tasks:
+                pool.submit(fn, *args, **kwargs)
+
+    def schedule(response):
+        response.call_on_close(submit)
+        return response
+
+    return schedule
+
+
+@atexit.register
+def _shutdown():
+    for pool in list(_pools):
+        pool.shutdown(pool.drain_timeout)
@@ -0,0 +1,90 @@
+import re
+from typing import Optional, Tuple
+from urllib.parse import quote, urlencode
+from werkzeug.routing import Map
+from flask_mux.router import Record
+
+rule_re = re.compile(
+    r"<(?:(?P<converter>[a-zA-Z_][a-zA-Z0-9_]*)(?:\((?P<args>.*?)\))?:)?"
+    r"(?P<variable>[a-zA-Z_][a-zA-Z0-9_]*)>"
+)
+
+
+def _quote(static: str, url_map: Map) -> str:
+    return quote(static.encode(getattr(url_map, "charset", "utf-8")), safe="/:|+")
+
+
+class UrlBuilder(Record):
+    """Reverse URL builder of a single url rule.
+
+    The rule is split once into its static parts, quoted the way
+    werkzeug quotes them, and its converters: building a URL is then
+    a matter of converting the values and joining the parts.
+
+
+    Properties:
+        parts (tuple): (static prefix, variable, to_url) triples.
+        tail (str): static part following the last variable.
+        arguments (frozenset): names of the rule's variables.
+    """
+
+    __slots__ = ("parts", "tail", "arguments")
+
+    def __init__(self, parts: Tuple, tail: str, arguments: frozenset):
+        self._init(parts=parts, tail=tail, arguments=arguments)
+
+    @classmethod
+    def compile(cls, rule: str, url_map: Map) -> Optional["UrlBuilder"]:
+        """Splits the rule into its static parts and converters.
+
+        Returns:
+            UrlBuilder: the builder, or None if the rule uses
+            converters with arguments, which are left to werkzeug.
+        """
+        parts = []
+        index = 0
+        for match in rule_re.finditer(rule):
+            if match.group("args") is not None:
+                return None
+
+            converter = url_map.converters[match.group("converter") or "default"]
+            parts.append((
+                _quote(rule[index:match.start()], url_map),
+                match.group("variable"),
+                converter(url_map).to_url,
+            ))
+            index = match.end()
+
+        arguments = frozenset(variable for _, variable, _ in parts)
+        return cls(tuple(parts), _quote(rule[index:], url_map), arguments)
+
+    def build(self, values: dict) -> Optional[str]:
+        """Builds the URL path, the values that are not variables of
+        the rule are appended as query arguments.
+
+        Returns:
+            str: the URL, or None if a variable is missing or if
+            url_for's special arguments (e.g: _external) are provided.
+        """
+        try:
+            url = "".join([
+                f"{static}{to_url(values[variable])}"
+                for static, variable, to_url in self.parts
+            ]) + self.tail
+        except KeyError:
+            return None
+
+        if len(values) == len(self.arguments):
+            return url
+
+        query = []
+        for key, value in values.items():
+            if key in self.arguments or value is None:
+                continue
+            if key.startswith("_"):
+                return None
+            query.append((key, value))
+
+        if query:
+            url = f"{url}?{urlencode(query, doseq=True)}"
+        return url
@@ -1,5 +1,11 @@
 from functools import wraps
 from flask import request, has_request_context
+from flask_mux.responses import ConstantJSON
+
+# rejections of the guards, encoded once
+INVALID_JSON = ConstantJSON({'success': False, 'message': 'request body must be valid json'}, 400)
+FORBIDDEN = ConstantJSON({'success': False, 'message': 'only admins are allowed'}, 403)
+UNAUTHORIZED = ConstantJSON({'success': False, 'message': 'unauthorized access'}, 401)
 
 
 def is_json(next_middleware):
@@ -8,7 +14,7 @@ def is_json(next_middleware):
     @wraps(next_middleware)
     def wrapper(*args, **kwargs):
         if not request.is_json:
-            return {'success': False, 'message': 'request body must be valid json'}, 400
+            return INVALID_JSON
         return next_middleware(*args, **kwargs)
     return wrapper
 
@@ -19,7 +25,7 @@ def is_admin(next_middleware):
     def wrapper(*args, **kwargs):
 
         if not request.headers.get('admin'):
-            return {'success': False, 'message': 'only admins are allowed'}, 403
+            return FORBIDDEN
 
         return next_middleware(*args, **kwargs)
     return wrapper
@@ -30,7 +36,7 @@ def is_auth(next_middleware):
     @wraps(next_middleware)
     def wrapper(*args, **kwargs):
         if not request.headers.get('Authorization'):
-            return {'success': False, 'message': 'unauthorized access'}, 401
+            return UNAUTHORIZED
         return next_middleware(*args, **kwargs)
     return wrapper
 
@@ -0,0 +1,21 @@
+from flask import request, url_for
+from flask_mux import Router
+from testing.common import is_auth
+
+
+def get_reports():
+    return {'success': True, 'url': url_for('reports.get_report', id=1)}
+
+
+def get_report(id):
+    return {'success': True, 'id': id, 'rule': request.url_rule.rule}
+
+
+def post_report():
+    return {'success': True}
+
+
+reports_router = Router(__name__)
+reports_router.get('/', get_reports)
+reports_router.get('/<int:id>', get_report)
+reports_router.post('/new', is_auth, post_report)
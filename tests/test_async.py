@@ -0,0 +1,106 @@
+import asyncio
+from functools import wraps
+import pytest
+from flask import Flask, request
+from flask.testing import FlaskClient
+from flask_mux import Mux, Router
+from testing.common import is_auth, is_json
+
+
+def is_admin_async(next_middleware):
+    """Async middleware simulating an awaited access level check"""
+    @wraps(next_middleware)
+    async def wrapper(*args, **kwargs):
+        await asyncio.sleep(0)
+        if not request.headers.get('admin'):
+            return {'success': False, 'message': 'only admins are allowed'}, 403
+        return await next_middleware(*args, **kwargs)
+    return wrapper
+
+
+def record_loop(loops):
+    def middleware(next_middleware):
+        @wraps(next_middleware)
+        async def wrapper(*args, **kwargs):
+            loops.append(asyncio.get_running_loop())
+            return await next_middleware(*args, **kwargs)
+        return wrapper
+    return middleware
+
+
+async def async_view():
+    await asyncio.sleep(0)
+    return {'success': True, 'admin': request.headers.get('admin')}
+
+
+async def mixed_view():
+    return await async_view()
+
+
+async def one_hop_view():
+    return await async_view()
+
+
+def sync_view():
+    return {'success': True, 'admin': request.headers.get('admin')}
+
+
+loops = []
+async_router = Router(__name__)
+async_router.get('/async-view', async_view)
+async_router.get('/async-mw', is_admin_async, sync_view)
+async_router.post('/mixed', is_auth, is_admin_async, is_json, mixed_view)
+async_router.get(
+    '/one-hop', record_loop(loops), is_auth, record_loop(loops), one_hop_view
+)
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    mux = Mux(app)
+    mux.use('/', async_router)
+    return app.test_client()
+
+
+def test_async_view(client: FlaskClient):
+    resp = client.get('/async-view')
+    assert resp.status_code == 200
+    assert resp.json.get('success')
+
+
+def test_async_mw(client: FlaskClient):
+    headers = {'admin': 'Mehdi'}
+    resp = client.get('/async-mw', headers=headers)
+    assert resp.status_code == 200
+    assert resp.json.get('admin') == headers.get('admin')
+
+
+def test_async_mw_failing(client: FlaskClient):
+    resp = client.get('/async-mw')
+    assert resp.status_code == 403
+    assert not resp.json.get('success')
+
+
+def test_mixed(client: FlaskClient):
+    headers = {'Authorization': 'whatever', 'admin': 'Mehdi'}
+    resp = client.post('/mixed', headers=headers, json={})
+    assert resp.status_code == 200
+    assert resp.json.get('admin') == headers.get('admin')
+
+
+def test_mixed_failing(client: FlaskClient):
+    resp = client.post('/mixed', headers={'admin': 'Mehdi'}, json={})
+    assert resp.status_code == 401
+
+    headers = {'Authorization': 'whatever', 'admin': 'Mehdi'}
+    resp = client.post('/mixed', headers=headers)
+    assert resp.status_code == 400
+
+
+def test_one_hop(client: FlaskClient):
+    loops.clear()
+    resp = client.get('/one-hop', headers={'Authorization': 'whatever'})
+    assert resp.status_code == 200
+    assert len(loops) == 2
+    assert loops[0] is loops[1]
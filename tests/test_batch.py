@@ -0,0 +1,191 @@
+import asyncio
+import threading
+import pytest
+from flask import Flask, Response, g, request
+from flask_mux import Mux, Router
+from flask_mux.middlewares import compress
+from testing.common import is_auth
+
+threads = set()
+
+
+def get_me():
+    threads.add(threading.get_ident())
+    return {'user': request.headers['Authorization'], 'lang': request.headers.get('Accept-Language')}
+
+
+def get_item(id):
+    threads.add(threading.get_ident())
+    assert 'seen' not in g
+    g.seen = True
+    return {'id': id, 'page': request.args.get('page')}
+
+
+def create_item():
+    return request.json, 201
+
+
+async def get_async():
+    await asyncio.sleep(0)
+    return {'async': True}
+
+
+def get_text():
+    return 'plain'
+
+
+def get_failing():
+    raise RuntimeError('failing')
+
+
+def get_tag(name):
+    return {'name': name}
+
+
+def get_report():
+    return {'rows': list(range(200)), 'encoding': request.headers.get('Accept-Encoding')}
+
+
+def get_cookies():
+    response = Response('ok')
+    response.set_cookie('a', '1')
+    response.set_cookie('b', '2')
+    return response
+
+
+router = Router(__name__)
+router.get('/me', is_auth, get_me)
+router.get('/items/<int:id>', get_item)
+router.post('/items', create_item)
+router.get('/async', get_async)
+router.get('/text', get_text)
+router.get('/failing', get_failing)
+router.get('/tags/<name>', get_tag)
+router.get('/report', compress(), get_report)
+router.get('/cookies', get_cookies)
+
+
+def create_client(parallel=False, isolated=False, **kwargs):
+    app = Flask(__name__)
+    app.add_url_rule('/plain', 'plain', lambda: 'not a Mux route')
+    mux = Mux(app, **kwargs)
+    mux.use('/api', router, isolated=isolated)
+    mux.batch('/batch', parallel=parallel, max_requests=5)
+    return app.test_client()
+
+
+@pytest.fixture(autouse=True)
+def reset():
+    threads.clear()
+
+
+@pytest.mark.parametrize('parallel', [False, True])
+@pytest.mark.parametrize('isolated', [False, True])
+def test_batch(parallel, isolated):
+    client = create_client(parallel, isolated)
+    rv = client.post('/batch', headers={'Authorization': 'alice'}, json=[
+        {'method': 'GET', 'path': '/api/me', 'headers': {'Accept-Language': 'fr'}},
+        {'path': '/api/items/1?page=2'},
+        {'path': '/api/items/2'},
+        {'method': 'POST', 'path': '/api/items', 'body': {'name': 'new'}},
+        {'method': 'DELETE', 'path': '/api/items'},
+    ])
+    assert rv.status_code == 200
+
+    results = rv.json
+    assert [result['status'] for result in results] == [200, 200, 200, 201, 405]
+    assert results[0]['body'] == {'user': 'alice', 'lang': 'fr'}
+    assert results[1]['body'] == {'id': 1, 'page': '2'}
+    assert results[2]['body'] == {'id': 2, 'page': None}
+    assert results[3]['body'] == {'name': 'new'}
+    assert ['Content-Type', 'application/json'] in results[3]['headers']
+    if not parallel:
+        assert threads == {threading.get_ident()}
+
+
+def test_responses():
+    client = create_client(dispatcher='trie')
+    results = client.post('/batch', json=[
+        {'path': '/api/me'},
+        {'path': '/api/async'},
+        {'path': '/api/text'},
+        {'path': '/api/missing'},
+        {'path': '/plain'},
+    ]).json
+    assert [result['status'] for result in results] == [401, 200, 200, 404, 404]
+    assert results[1]['body'] == {'async': True}
+    assert results[2]['body'] == 'plain'
+
+
+def test_nested_batch():
+    client = create_client()
+    results = client.post('/batch', json=[{'method': 'POST', 'path': '/batch', 'body': []}]).json
+    assert results[0]['status'] == 404
+
+
+def test_exception():
+    client = create_client()
+    results = client.post('/batch', json=[{'path': '/api/failing'}, {'path': '/api/text'}]).json
+    assert [result['status'] for result in results] == [500, 200]
+
+
+@pytest.mark.parametrize('isolated', [False, True])
+def test_encoded_path(isolated):
+    client = create_client(isolated=isolated)
+    path = '/api/tags/caf%C3%A9%20x'
+    results = client.post('/batch', json=[{'path': path}, {'path': '/api/tags/café x'}]).json
+    assert [result['body'] for result in results] == [client.get(path).json] * 2
+    assert results[0]['body'] == {'name': 'café x'}
+
+
+def test_transport_headers():
+    client = create_client()
+    headers = {'Accept-Encoding': 'gzip', 'Connection': 'keep-alive'}
+    results = client.post('/batch', headers=headers, json=[
+        {'path': '/api/report'},
+        {'path': '/api/cookies'},
+    ]).json
+    assert [result['status'] for result in results] == [200, 200]
+    assert results[0]['body'] == {'rows': list(range(200)), 'encoding': None}
+    cookies = [value for name, value in results[1]['headers'] if name == 'Set-Cookie']
+    assert [cookie.split(';')[0] for cookie in cookies] == ['a=1', 'b=2']
+
+
+@pytest.mark.parametrize('parallel', [False, True])
+def test_propagated_exception(parallel):
+    client = create_client(parallel)
+    client.application.config['PROPAGATE_EXCEPTIONS'] = True
+    rv = client.post('/batch', json=[{'path': '/api/failing'}, {'path': '/api/text'}])
+    assert rv.status_code == 200
+    assert [result['status'] for result in rv.json] == [500, 200]
+    assert rv.json[0]['body']['success'] is False
+
+
+@pytest.mark.parametrize('body,status', [
+    ({'path': '/api/text'}, 400),
+    ([{'method': 'GET'}], 400),
+    ([{'path': 'api/text'}], 400),
+    ([{'path': '/api/text', 'headers': []}], 400),
+    ([{'path': '/api/text'}] * 6, 413),
+])
+def test_invalid(body, status):
+    rv = create_client().post('/batch', json=body)
+    assert rv.status_code == status
+    assert rv.json['success'] is False
+
+
+@pytest.mark.parametrize('use_many', [False, True])
+def test_root_namespace(use_many):
+    app = Flask(__name__)
+    mux = Mux(app)
+    if use_many:
+        mux.use_many({'/': router})
+    else:
+        mux.use('/', router)
+    mux.batch('/batch')
+
+    results = app.test_client().post('/batch', json=[{'path': '/items/1'}, {'path': '/text'}]).json
+    assert [result['status'] for result in results] == [200, 200]
+    assert mux.dispatch('GET', '/text').status_code == 200
+    with app.test_request_context():
+        assert mux.url_for('get_item', id=1) == '/items/1'
@@ -0,0 +1,117 @@
+import pytest
+from flask import Flask, jsonify, request
+from flask_mux import Mux, Router
+from flask_mux.middlewares import cache
+from testing.common import is_auth
+
+calls = []
+catalog_cache = cache(ttl=30, max_entries=2, headers=['Accept-Language'])
+expiring_cache = cache(ttl=0)
+
+
+def get_catalog(id):
+    calls.append(id)
+    return {'id': id, 'lang': request.headers.get('Accept-Language')}
+
+
+def get_expiring():
+    calls.append('expiring')
+    return {'success': True}
+
+
+def get_session():
+    calls.append('session')
+    response = jsonify(success=True)
+    response.set_cookie('session_id', 'abc')
+    return response
+
+
+def get_private():
+    calls.append('private')
+    return {'success': True}, {'Cache-Control': 'private, max-age=60'}
+
+
+def get_no_store():
+    calls.append('no-store')
+    return {'success': True}, {'Cache-Control': 'no-store'}
+
+
+def post_catalog(id):
+    calls.append(id)
+    return {'id': id}
+
+
+cache_router = Router(__name__)
+cache_router.get('/catalog/<int:id>', is_auth, catalog_cache, get_catalog)
+cache_router.post('/catalog/<int:id>', catalog_cache, post_catalog)
+cache_router.get('/expiring', expiring_cache, get_expiring)
+cache_router.get('/session', cache(), get_session)
+cache_router.get('/private', cache(), get_private)
+cache_router.get('/no-store', cache(), get_no_store)
+
+
+@pytest.fixture
+def client():
+    calls.clear()
+    catalog_cache.clear()
+    app = Flask(__name__)
+    Mux(app).use('/', cache_router)
+    return app.test_client()
+
+
+def test_hit(client):
+    headers = {'Authorization': 'whatever'}
+    first = client.get('/catalog/1', headers=headers)
+    second = client.get('/catalog/1', headers=headers)
+
+    assert first.json == second.json == {'id': 1, 'lang': None}
+    assert calls == [1]
+    assert catalog_cache.hits >= 1
+
+
+def test_middlewares_still_run(client):
+    client.get('/catalog/1', headers={'Authorization': 'whatever'})
+    assert client.get('/catalog/1').status_code == 401
+
+
+def test_vary_headers(client):
+    headers = {'Authorization': 'whatever'}
+    client.get('/catalog/1', headers=headers)
+    resp = client.get('/catalog/1', headers={**headers, 'Accept-Language': 'fr'})
+
+    assert resp.json.get('lang') == 'fr'
+    assert calls == [1, 1]
+
+
+def test_lru_eviction(client):
+    headers = {'Authorization': 'whatever'}
+    for id in (1, 2, 1, 3):
+        client.get(f'/catalog/{id}', headers=headers)
+    assert catalog_cache.stats()['entries'] == 2
+
+    client.get('/catalog/1', headers=headers)
+    client.get('/catalog/2', headers=headers)
+    assert calls == [1, 2, 3, 2]
+
+
+def test_ttl(client):
+    client.get('/expiring')
+    client.get('/expiring')
+    assert calls == ['expiring', 'expiring']
+
+
+def test_skip_unsafe_methods(client):
+    client.post('/catalog/1')
+    client.post('/catalog/1')
+    assert calls == [1, 1]
+
+
+@pytest.mark.parametrize('path,stage', [
+    ('/session', 'session'),
+    ('/private', 'private'),
+    ('/no-store', 'no-store'),
+])
+def test_skip_unshareable(client, path, stage):
+    client.get(path)
+    client.get(path)
+    assert calls == [stage, stage]
@@ -0,0 +1,121 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from flask import Flask, Response
+from flask_mux import Mux, Router
+from flask_mux.middlewares import coalesce
+
+CONCURRENCY = 6
+calls = []
+catalog_flight = coalesce()
+async_flight = coalesce()
+failing_flight = coalesce()
+stream_flight = coalesce()
+cookie_flight = coalesce()
+short_flight = coalesce(timeout=0.01)
+
+
+def wait_for_followers(flight, followers=CONCURRENCY - 1, timeout=5):
+    deadline = time.monotonic() + timeout
+    while flight.coalesced < followers and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+def get_catalog(id):
+    calls.append(id)
+    wait_for_followers(catalog_flight)
+    return {'id': id, 'call': len(calls)}
+
+
+async def get_async_catalog(id):
+    calls.append(id)
+    while async_flight.coalesced < CONCURRENCY - 1:
+        await asyncio.sleep(0.005)
+    return {'id': id, 'call': len(calls)}
+
+
+def get_failing():
+    calls.append('failing')
+    wait_for_followers(failing_flight)
+    raise RuntimeError('upstream unavailable')
+
+
+def get_stream():
+    calls.append('stream')
+    wait_for_followers(stream_flight)
+    return Response(iter([b'a', b'b']))
+
+
+def get_cookie():
+    calls.append('cookie')
+    wait_for_followers(cookie_flight)
+    response = Response(b'ok')
+    response.set_cookie('session_id', 'abc')
+    return response
+
+
+def get_slow():
+    calls.append('slow')
+    time.sleep(0.1)
+    return {'success': True}
+
+
+router = Router(__name__)
+router.get('/catalog/<int:id>', catalog_flight, get_catalog)
+router.get('/async/<int:id>', async_flight, get_async_catalog)
+router.get('/failing', failing_flight, get_failing)
+router.get('/stream', stream_flight, get_stream)
+router.get('/cookie', cookie_flight, get_cookie)
+router.get('/slow', short_flight, get_slow)
+
+
+@pytest.fixture
+def client():
+    calls.clear()
+    for flight in (catalog_flight, async_flight, failing_flight, stream_flight, cookie_flight, short_flight):
+        flight.coalesced = 0
+    app = Flask(__name__)
+    Mux(app).use('/', router)
+    return app.test_client()
+
+
+def get_concurrently(client, path, count=CONCURRENCY, headers=None):
+    with ThreadPoolExecutor(count) as executor:
+        return list(executor.map(lambda _: client.get(path, headers=headers), range(count)))
+
+
+@pytest.mark.parametrize('path', ['/catalog/1', '/async/1'])
+def test_single_flight(client, path):
+    responses = get_concurrently(client, path)
+    assert [rv.json for rv in responses] == [{'id': 1, 'call': 1}] * CONCURRENCY
+    assert calls == [1]
+
+
+def test_error_propagation(client):
+    responses = get_concurrently(client, '/failing')
+    assert [rv.status_code for rv in responses] == [500] * CONCURRENCY
+    assert calls == ['failing']
+
+
+@pytest.mark.parametrize('path,body', [('/stream', b'ab'), ('/cookie', b'ok')])
+def test_not_shared(client, path, body):
+    responses = get_concurrently(client, path)
+    assert [rv.data for rv in responses] == [body] * CONCURRENCY
+    assert len(calls) == CONCURRENCY
+
+
+def test_timeout(client):
+    responses = get_concurrently(client, '/slow', count=3)
+    assert [rv.status_code for rv in responses] == [200] * 3
+    assert len(calls) == 3
+
+
+def test_key(client):
+    catalog_flight.coalesced = CONCURRENCY
+    with ThreadPoolExecutor(2) as executor:
+        responses = list(executor.map(
+            lambda token: client.get('/catalog/2', headers={'Authorization': token}), ['a', 'b']
+        ))
+    assert [rv.status_code for rv in responses] == [200, 200]
+    assert calls == [2, 2]
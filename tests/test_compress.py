@@ -0,0 +1,103 @@
+import gzip
+import zlib
+import pytest
+from flask import Flask, Response
+from flask_mux import Mux, Router
+from flask_mux.middlewares import compress, conditional
+
+closed = []
+ROWS = [{'id': i, 'name': f'item {i}'} for i in range(200)]
+
+
+def get_items():
+    return {'items': ROWS}
+
+
+async def get_async_items():
+    return {'items': ROWS}
+
+
+def get_small():
+    return {'items': []}
+
+
+def export():
+    def rows():
+        try:
+            for row in ROWS:
+                yield f'{row["id"]},{row["name"]}\n'
+        finally:
+            closed.append(True)
+    return Response(rows(), mimetype='text/csv')
+
+
+def get_image():
+    return Response(b'\x89PNG' * 1000, mimetype='image/png')
+
+
+def get_encoded():
+    return Response(gzip.compress(b'x' * 1000), headers={'Content-Encoding': 'gzip'}, mimetype='text/plain')
+
+
+router = Router(__name__)
+router.get('/items', compress(), get_items)
+router.get('/async', compress(), get_async_items)
+router.get('/small', compress(), get_small)
+router.get('/export', compress(), export)
+router.get('/image', compress(), get_image)
+router.get('/encoded', compress(), get_encoded)
+router.get('/versioned', compress(), conditional(lambda: 'v1'), get_items)
+
+
+@pytest.fixture
+def client():
+    closed.clear()
+    app = Flask(__name__)
+    Mux(app).use('/', router)
+    return app.test_client()
+
+
+@pytest.mark.parametrize('path', ['/items', '/async'])
+def test_gzip(client, path):
+    rv = client.get(path, headers={'Accept-Encoding': 'gzip, deflate'})
+    assert rv.headers['Content-Encoding'] == 'gzip'
+    assert rv.headers['Vary'] == 'Accept-Encoding'
+    assert int(rv.headers['Content-Length']) == len(rv.data)
+    assert gzip.decompress(rv.data) == client.get(path).data
+
+
+def test_deflate(client):
+    rv = client.get('/items', headers={'Accept-Encoding': 'gzip;q=0.5, deflate'})
+    assert rv.headers['Content-Encoding'] == 'deflate'
+    assert zlib.decompress(rv.data) == client.get('/items').data
+
+
+def test_not_accepted(client):
+    rv = client.get('/items')
+    assert 'Content-Encoding' not in rv.headers
+    assert rv.headers['Vary'] == 'Accept-Encoding'
+    assert 'Content-Encoding' not in client.get('/items', headers={'Accept-Encoding': 'br'}).headers
+
+
+def test_streamed(client):
+    rv = client.get('/export', headers={'Accept-Encoding': 'gzip'}, buffered=False)
+    assert rv.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in rv.headers
+    body = gzip.decompress(b''.join(rv.response))
+    rv.close()
+    assert body.decode().splitlines()[1] == '1,item 1'
+    assert closed == [True]
+
+
+@pytest.mark.parametrize('path', ['/small', '/image', '/encoded'])
+def test_skipped(client, path):
+    rv = client.get(path, headers={'Accept-Encoding': 'deflate'})
+    assert rv.headers.get('Content-Encoding') != 'deflate'
+
+
+def test_etag(client):
+    rv = client.get('/versioned', headers={'Accept-Encoding': 'gzip'})
+    assert rv.headers['ETag'].startswith('W/')
+
+    rv = client.get('/versioned', headers={'Accept-Encoding': 'gzip', 'If-None-Match': rv.headers['ETag']})
+    assert rv.status_code == 304
@@ -0,0 +1,94 @@
+from datetime import datetime, timezone
+import pytest
+from flask import Flask
+from flask_mux import Mux, Router
+from flask_mux.middlewares import conditional
+
+calls = []
+versions = {1: 'v1', 2: 'v1'}
+updated_at = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+
+def get_catalog(id):
+    calls.append(id)
+    return {'id': id, 'items': list(range(100))}
+
+
+async def get_async_catalog(id):
+    return get_catalog(id)
+
+
+def get_countries():
+    calls.append('countries')
+    return {'countries': ['fr', 'ma']}
+
+
+def get_report():
+    calls.append('report')
+    return {'report': True}
+
+
+def post_catalog(id):
+    calls.append(id)
+    return {'id': id}
+
+
+router = Router(__name__)
+router.get('/catalogs/<int:id>', conditional(lambda id: versions[id]), get_catalog)
+router.post('/catalogs/<int:id>', conditional(lambda id: versions[id]), post_catalog)
+router.get('/async/<int:id>', conditional(lambda id: versions[id]), get_async_catalog)
+router.get('/countries', conditional(), get_countries)
+router.get('/report', conditional(last_modified=lambda: updated_at), get_report)
+
+
+@pytest.fixture
+def client():
+    calls.clear()
+    versions[1] = 'v1'
+    app = Flask(__name__)
+    Mux(app).use('/', router)
+    return app.test_client()
+
+
+@pytest.mark.parametrize('path', ['/catalogs/1', '/async/1'])
+def test_version(client, path):
+    rv = client.get(path)
+    etag = rv.headers['ETag']
+    assert rv.status_code == 200 and calls == [1]
+
+    rv = client.get(path, headers={'If-None-Match': etag})
+    assert rv.status_code == 304
+    assert rv.headers['ETag'] == etag
+    assert rv.data == b''
+    assert calls == [1]
+
+    versions[1] = 'v2'
+    rv = client.get(path, headers={'If-None-Match': etag})
+    assert rv.status_code == 200
+    assert rv.headers['ETag'] != etag
+    assert calls == [1, 1]
+
+
+def test_body_hash(client):
+    etag = client.get('/countries').headers['ETag']
+    rv = client.get('/countries', headers={'If-None-Match': etag})
+    assert rv.status_code == 304
+    assert calls == ['countries', 'countries']
+    assert client.get('/countries', headers={'If-None-Match': '"other"'}).status_code == 200
+
+
+def test_last_modified(client):
+    rv = client.get('/report')
+    assert rv.last_modified == updated_at
+
+    rv = client.get('/report', headers={'If-Modified-Since': 'Fri, 02 Jan 2026 03:04:05 GMT'})
+    assert rv.status_code == 304
+    rv = client.get('/report', headers={'If-Modified-Since': 'Fri, 02 Jan 2026 03:04:04 GMT'})
+    assert rv.status_code == 200
+    assert calls == ['report', 'report']
+
+
+def test_unsafe_methods(client):
+    rv = client.post('/catalogs/1', headers={'If-None-Match': '*'})
+    assert rv.status_code == 200
+    assert 'ETag' not in rv.headers
@@ -0,0 +1,128 @@
+import asyncio
+from functools import wraps
+import pytest
+from flask import Flask, request
+from flask_mux import Mux, Router
+from flask_mux.context import Key
+from flask_mux.errors import MissingValueError
+
+decoded = []
+
+
+def decode(token):
+    decoded.append(token)
+    name, _, role = token.partition(':')
+    return {'name': name, 'admin': role == 'admin'}
+
+
+CURRENT_USER: Key[dict] = Key('user', factory=lambda: decode(request.headers['Authorization']))
+TOKEN: Key[str] = Key('token')
+ATTEMPTS: Key[int] = Key('attempts')
+
+
+def is_auth(next_middleware):
+    @wraps(next_middleware)
+    def wrapper(*args, **kwargs):
+        token = request.headers.get('Authorization')
+        if not token:
+            return {'success': False, 'message': 'unauthorized access'}, 401
+        TOKEN.set(token)
+        return next_middleware(*args, **kwargs)
+    return wrapper
+
+
+def is_admin(next_middleware):
+    @wraps(next_middleware)
+    def wrapper(*args, **kwargs):
+        if not CURRENT_USER.get()['admin']:
+            return {'success': False, 'message': 'only admins are allowed'}, 403
+        return next_middleware(*args, **kwargs)
+    return wrapper
+
+
+def get_admin():
+    return {'user': CURRENT_USER.get()['name'], 'token': TOKEN.get()}
+
+
+async def get_async_admin():
+    await asyncio.sleep(0)
+    return {'user': CURRENT_USER.get()['name']}
+
+
+def get_attempts():
+    assert not ATTEMPTS.is_set()
+    ATTEMPTS.set(ATTEMPTS.get(0) + 1)
+    ATTEMPTS.set(ATTEMPTS.get() + 1)
+    value = ATTEMPTS.get()
+    ATTEMPTS.unset()
+    with pytest.raises(MissingValueError):
+        ATTEMPTS.get()
+    return {'attempts': value}
+
+
+router = Router(__name__)
+router.get('/admin', is_auth, is_admin, get_admin)
+router.get('/async', is_auth, is_admin, get_async_admin)
+router.get('/attempts', get_attempts)
+
+
+@pytest.fixture
+def mux():
+    decoded.clear()
+    app = Flask(__name__)
+    mux = Mux(app)
+    mux.use('/', router)
+    mux.batch('/batch')
+    return mux
+
+
+@pytest.mark.parametrize('path', ['/admin', '/async'])
+def test_computed_once(mux, path):
+    client = mux.app.test_client()
+    rv = client.get(path, headers={'Authorization': 'alice:admin'})
+    assert rv.status_code == 200
+    assert rv.json['user'] == 'alice'
+    assert decoded == ['alice:admin']
+
+    assert client.get(path, headers={'Authorization': 'bob'}).status_code == 403
+    assert decoded == ['alice:admin', 'bob']
+
+
+def test_values(mux):
+    assert mux.app.test_client().get('/attempts').json == {'attempts': 2}
+
+
+def test_isolated_requests(mux):
+    results = mux.app.test_client().post('/batch', json=[
+        {'path': '/admin', 'headers': {'Authorization': 'alice:admin'}},
+        {'path': '/admin', 'headers': {'Authorization': 'bob'}},
+        {'path': '/attempts'},
+        {'path': '/attempts'},
+    ]).json
+    assert [result['status'] for result in results] == [200, 403, 200, 200]
+    assert decoded == ['alice:admin', 'bob']
+
+
+def get_count():
+    ATTEMPTS.set(ATTEMPTS.get(0) + 1)
+    return {'count': ATTEMPTS.get()}
+
+
+def test_shared_app_context():
+    app = Flask(__name__)
+    router = Router(__name__)
+    router.get('/count', get_count)
+    Mux(app).use('/', router)
+
+    client = app.test_client()
+    with app.app_context():
+        assert [client.get('/count').json['count'] for _ in range(2)] == [1, 1]
+
+
+def test_late_key(mux):
+    with mux.app.test_request_context():
+        TOKEN.set('token')
+        late = Key('late')
+        assert late.get('default') == 'default'
+        late.set(1)
+        assert (late.get(), TOKEN.get()) == (1, 'token')
@@ -0,0 +1,208 @@
+import random
+import pytest
+from werkzeug.exceptions import HTTPException
+from werkzeug.routing import Map, RequestRedirect, Rule as UrlRule
+from flask import Flask, request, url_for
+from flask_mux import Mux, Router
+from flask_mux.dispatch import Trie
+from flask_mux.errors import MuxError
+from testing.test_cases.middlewares import test_mws_router
+from testing import test_router
+
+
+def get_me():
+    return {'view': 'me', 'rule': request.url_rule.rule}
+
+
+def get_user(name):
+    return {'view': 'user', 'name': name}
+
+
+def get_user_post(name, id):
+    return {'view': 'post', 'name': name, 'id': id}
+
+
+def update_user(name):
+    return {'view': 'update', 'name': name}
+
+
+def get_file(path):
+    return {'view': 'file', 'path': path}
+
+
+def list_users():
+    return {'view': 'list'}
+
+
+users_router = Router(__name__)
+users_router.get('/me', get_me)
+users_router.get('/<name>', get_user)
+users_router.get('/<name>/posts/<int:id>', get_user_post)
+users_router.put('/<name>/', update_user)
+users_router.get('/files/<path:path>', get_file)
+users_router.get('/list/', list_users)
+
+
+@pytest.fixture
+def mux():
+    app = Flask(__name__)
+    mux = Mux(app, dispatcher='trie')
+    mux.use('/', test_mws_router)
+    mux.use('/users', users_router)
+    return mux
+
+
+@pytest.fixture
+def client(mux: Mux):
+    return mux.app.test_client()
+
+
+def test_unknown_dispatcher():
+    with pytest.raises(MuxError):
+        Mux(Flask(__name__), dispatcher='regex')
+
+
+def test_routes(client):
+    test_router.test_extra_mws(client, 'post')
+    test_router.test_extra_mws_failing_3(client, 'put')
+
+    assert client.get('/users/me').json == {'view': 'me', 'rule': '/users/me'}
+    assert client.get('/users/mehdi').json == {'view': 'user', 'name': 'mehdi'}
+    assert client.get('/users/mehdi/posts/3').json == {'view': 'post', 'name': 'mehdi', 'id': 3}
+    assert client.put('/users/mehdi/').json == {'view': 'update', 'name': 'mehdi'}
+
+
+def test_fallback(client):
+    assert client.get('/users/mehdi/posts/x').status_code == 404
+    assert client.delete('/users/me').status_code == 405
+    assert client.put('/users/mehdi').status_code == 308
+    assert client.get('/users/files/a/b.txt').json == {'view': 'file', 'path': 'a/b.txt'}
+
+
+@pytest.mark.parametrize('path,method,matched', [
+    ('/users/me', 'GET', True),
+    ('/users/mehdi', 'GET', True),
+    ('/users/mehdi/posts/3', 'GET', True),
+    ('/users/mehdi/', 'PUT', True),
+    ('/get-with-auth', 'GET', True),
+    ('/users/mehdi/posts/x', 'GET', False),
+    ('/users/files/a', 'GET', False),
+    ('/static/a.css', 'GET', False),
+])
+def test_same_as_werkzeug(mux: Mux, path, method, matched):
+    url_map = mux.app.url_map
+    rv = Trie(url_map).match(path, method)
+    assert (rv is not None) == matched
+    if rv is None:
+        return
+
+    rule, values = rv
+    expected_rule, expected_values = url_map.bind('localhost').match(path, method, return_rule=True)
+    assert rule is expected_rule
+    assert values == expected_values
+
+
+def assert_same_as_werkzeug(url_map, path, method):
+    rv = Trie(url_map).match(path, method)
+    try:
+        expected = url_map.bind('localhost').match(path, method, return_rule=True)
+    except (HTTPException, RequestRedirect):
+        assert rv is None
+        return
+    if rv is not None:
+        assert rv[0] is expected[0]
+        assert rv[1] == expected[1]
+
+
+def test_werkzeug_order():
+    url_map = Map([
+        UrlRule('/<int:i0>/<x1>/<x2>', endpoint='first', methods=['POST']),
+        UrlRule('/<x0>/b/<float:f2>', endpoint='second', methods=['POST']),
+    ])
+    rule, values = Trie(url_map).match('/1/b/2.5', 'POST')
+    assert rule.endpoint == url_map.bind('localhost').match('/1/b/2.5', 'POST')[0]
+    assert values == {'x0': '1', 'f2': 2.5}
+
+
+def test_random_rules():
+    rng = random.Random(0)
+    segments = ['a', 'b', '1', '2.5', '<{}>', '<int:{}>', '<float:{}>', '<string(length=1):{}>']
+    for _ in range(200):
+        rules = set()
+        for _ in range(rng.randint(1, 6)):
+            parts = [rng.choice(segments).format(f'v{i}') for i in range(rng.randint(1, 3))]
+            rules.add('/' + '/'.join(parts) + rng.choice(['', '', '/']))
+        url_map = Map([
+            UrlRule(rule, endpoint=str(i), methods=[rng.choice(['GET', 'POST'])])
+            for i, rule in enumerate(sorted(rules))
+        ])
+        for _ in range(10):
+            path = '/' + '/'.join(rng.choice(['a', 'b', '1', '2.5', 'x']) for _ in range(rng.randint(1, 3)))
+            path += rng.choice(['', '/'])
+            assert_same_as_werkzeug(url_map, path, rng.choice(['GET', 'POST']))
+
+
+def test_trie_rebuilt(mux: Mux, client):
+    client.get('/users/me')
+    trie = mux.dispatcher.trie
+
+    router = Router(__name__)
+    router.get('/new', get_me)
+    mux.use('/other', router)
+
+    assert client.get('/other/new').status_code == 200
+    assert mux.dispatcher.trie is not trie
+
+
+def test_static_table():
+    app = Flask(__name__)
+    mux = Mux(app)
+    mux.use('/', test_mws_router)
+    mux.use('/users', users_router)
+    client = app.test_client()
+
+    assert client.get('/users/me').json == {'view': 'me', 'rule': '/users/me'}
+    assert ('GET', '/users/me') in mux.dispatcher.static
+    assert ('PUT', '/basic') in mux.dispatcher.static
+    assert ('GET', '/users/<name>') not in mux.dispatcher.static
+
+    assert client.get('/users/list/').json == {'view': 'list'}
+    assert client.get('/users/list').status_code == 308
+    assert client.post('/get-with-auth').status_code == 405
+    assert client.get('/users/mehdi').json == {'view': 'user', 'name': 'mehdi'}
+    assert client.get('/static/unknown.css').status_code == 404
+
+
+def test_shared_dispatcher():
+    app = Flask(__name__)
+    app.add_url_rule('/plain', 'plain', lambda: 'plain')
+    first = Mux(app)
+    first.use('/users', users_router)
+    create_url_adapter = app.create_url_adapter
+    second = Mux(app, dispatcher='trie')
+    second.use('/', test_mws_router)
+
+    assert second.dispatcher is first.dispatcher
+    assert second.dispatcher.use_trie
+    assert app.create_url_adapter == create_url_adapter
+
+    client = app.test_client()
+    assert client.get('/users/me').status_code == 200
+    assert client.get('/plain').data == b'plain'
+    assert ('GET', '/users/me') in first.dispatcher.static
+    assert ('PUT', '/basic') in first.dispatcher.static
+    assert ('GET', '/plain') not in first.dispatcher.static
+
+
+def test_url_scheme(mux: Mux):
+    with mux.app.test_request_context():
+        assert url_for('users.get_me', _external=True, _scheme='https') == 'https://localhost/users/me'
+
+
+def test_no_dispatcher():
+    app = Flask(__name__)
+    mux = Mux(app, dispatcher=None)
+    mux.use('/users', users_router)
+
+    assert mux.dispatcher is None
+    assert app.test_client().get('/users/me').status_code == 200
@@ -0,0 +1,117 @@
+import json
+from datetime import datetime
+import pytest
+from flask import Flask
+from flask_mux import Mux, Router
+from flask_mux.responses import ConstantJSON, compile_encoder
+from testing.common import is_auth
+
+FORBIDDEN = ConstantJSON({'success': False, 'message': 'forbidden'}, 403, {'X-Reason': 'flag'})
+
+
+def get_item():
+    return {'name': 'café', 'id': 1, 'at': datetime(2026, 1, 2), 'tags': ['a', None, 1.5]}
+
+
+def create_item():
+    return {'created': True}, 201, {'Location': '/items/2'}
+
+
+def get_headers():
+    return {'success': True}, {'X-Custom': 'yes'}
+
+
+async def get_async():
+    return {'async': True}, 202
+
+
+def get_list():
+    return [1, 2, 3]
+
+
+def get_text():
+    return 'plain', 200
+
+
+def forbidden(next_middleware):
+    return lambda *args, **kwargs: FORBIDDEN
+
+
+router = Router(__name__)
+router.get('/item', is_auth, get_item)
+router.post('/item', create_item)
+router.get('/headers', get_headers)
+router.get('/async', get_async)
+router.get('/text', get_text)
+router.get('/forbidden', forbidden, get_item)
+
+
+def create_client(fast_json):
+    app = Flask(__name__)
+    Mux(app, fast_json=fast_json).use('/', router)
+    return app.test_client()
+
+
+@pytest.mark.parametrize('method,path,headers', [
+    ('get', '/item', {'Authorization': 'x'}),
+    ('get', '/item', {}),
+    ('post', '/item', {}),
+    ('get', '/headers', {}),
+    ('get', '/async', {}),
+    ('get', '/text', {}),
+    ('get', '/forbidden', {}),
+])
+def test_same_responses(method, path, headers):
+    flask_rv = getattr(create_client(False), method)(path, headers=headers)
+    fast_rv = getattr(create_client(True), method)(path, headers=headers)
+
+    assert fast_rv.status_code == flask_rv.status_code
+    assert fast_rv.data == flask_rv.data
+    assert fast_rv.headers == flask_rv.headers
+
+
+def test_list():
+    fast_router = Router(__name__)
+    fast_router.get('/list', get_list)
+    app = Flask(__name__)
+    Mux(app, fast_json=True).use('/', fast_router)
+
+    rv = app.test_client().get('/list')
+    assert rv.json == [1, 2, 3]
+    assert rv.mimetype == 'application/json'
+
+
+def test_custom_encoder():
+    encoded = []
+
+    def encode(obj):
+        encoded.append(obj)
+        return json.dumps(obj, default=str)
+
+    client = create_client(encode)
+    assert client.post('/item').json == {'created': True}
+    assert encoded == [{'created': True}]
+
+
+def test_encoder_config():
+    app = Flask(__name__)
+    app.config['JSON_SORT_KEYS'] = False
+    app.config['JSON_AS_ASCII'] = False
+    assert compile_encoder(app)({'b': 'é', 'a': 1}) == '{"b":"é","a":1}\n'.encode()
+
+
+@pytest.mark.parametrize('setting', ['debug', 'JSONIFY_PRETTYPRINT_REGULAR'])
+def test_pretty_print(setting):
+    responses = []
+    for fast_json in (False, True):
+        client = create_client(fast_json)
+        if setting == 'debug':
+            client.application.debug = True
+        else:
+            client.application.config[setting] = True
+        responses.append(client.get('/item', headers={'Authorization': 'x'}))
+
+    flask_rv, fast_rv = responses
+    assert b'\n  ' in flask_rv.data
+    assert fast_rv.data == flask_rv.data
+    assert fast_rv.headers == flask_rv.headers
@@ -0,0 +1,45 @@
+import gc
+import sys
+import pytest
+from flask import Flask
+from flask_mux import Mux
+from flask_mux.errors import MuxError
+from testing.test_cases.middlewares import test_mws_router
+from testing.test_cases.router import auth_router
+
+
+@pytest.fixture
+def mux():
+    sys.modules.pop('testing.test_cases.lazy', None)
+    app = Flask(__name__)
+    mux = Mux(app)
+    mux.use('/', test_mws_router)
+    mux.use('/reports', 'testing.test_cases.lazy:reports_router', lazy=True)
+    mux.freeze()
+    yield mux
+    gc.unfreeze()
+
+
+def test_frozen(mux: Mux):
+    assert mux.frozen
+    assert mux.lazy['/reports'].loaded
+    assert isinstance(mux.rules.get(''), tuple)
+    assert gc.get_freeze_count() > 0
+    assert ('GET', '/basic') in mux.dispatcher.static
+    assert mux.dispatcher.trie.size == len(mux.app.url_map._rules)
+
+    with pytest.raises(TypeError):
+        mux.rules['auth'] = []
+    with pytest.raises(MuxError):
+        mux.use('/auth', auth_router)
+    with pytest.raises(MuxError):
+        mux.use_many({'/auth': auth_router})
+
+
+def test_routes(mux: Mux):
+    trie = mux.dispatcher.trie
+    client = mux.app.test_client()
+    assert client.get('/basic').status_code == 200
+    assert client.get('/reports/1').status_code == 200
+    assert mux.find('reports', 'get_report').rule == '/<int:id>'
+    assert mux.dispatcher.trie is trie
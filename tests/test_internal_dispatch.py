@@ -0,0 +1,108 @@
+import asyncio
+import pytest
+from flask import Flask, request
+from flask_mux import Mux, Router
+from flask_mux.tasks import after_response
+from testing.common import is_auth
+
+done = []
+
+
+def get_me():
+    return {'user': request.headers['Authorization']}
+
+
+def get_tag(name):
+    return {'name': name}
+
+
+def get_order(id):
+    return {'id': id, 'expand': request.args.get('expand')}
+
+
+def create_order():
+    after_response(done.append, request.json['item'])
+    return {'created': request.json}, 201
+
+
+async def get_async():
+    await asyncio.sleep(0)
+    return {'async': True}
+
+
+def get_profile():
+    # fan-out to the routes of another router
+    me = mux.dispatch('GET', '/auth/me', headers={'Authorization': request.headers.get('Authorization')})
+    orders = [mux.dispatch('GET', f'/api/orders/{id}').json for id in (1, 2)]
+    return {'me': me.json, 'orders': orders, 'path': request.path}
+
+
+auth_router = Router(__name__)
+auth_router.get('/me', is_auth, get_me)
+auth_router.get('/tags/<name>', get_tag)
+
+api_router = Router(__name__)
+api_router.get('/orders/<int:id>', get_order)
+api_router.post('/orders', create_order)
+api_router.get('/async', get_async)
+api_router.get('/profile', get_profile)
+
+app = Flask(__name__)
+app.add_url_rule('/plain', 'plain', lambda: 'not a Mux route')
+mux = Mux(app, tasks=True)
+mux.use('/auth', auth_router)
+mux.use('/api', api_router, isolated=True)
+
+
+@pytest.fixture(autouse=True)
+def reset():
+    done.clear()
+
+
+def test_dispatch():
+    rv = mux.dispatch('GET', '/api/orders/3?expand=items')
+    assert rv.status_code == 200
+    assert rv.json == {'id': 3, 'expand': 'items'}
+
+
+def test_encoded_path():
+    path = '/auth/tags/caf%C3%A9%20x'
+    assert mux.dispatch('GET', path).json == app.test_client().get(path).json == {'name': 'café x'}
+
+
+def test_headers():
+    assert mux.dispatch('GET', '/auth/me').status_code == 401
+    assert mux.dispatch('GET', '/auth/me', headers={'Authorization': 'alice'}).json == {'user': 'alice'}
+
+
+def test_json():
+    rv = mux.dispatch('post', '/api/orders', json={'item': 42})
+    assert rv.status_code == 201
+    assert rv.json == {'created': {'item': 42}}
+
+    assert done == []
+    rv.close()
+    assert mux.tasks.drain(5)
+    assert done == [42]
+
+
+def test_async():
+    assert mux.dispatch('GET', '/api/async').json == {'async': True}
+
+
+@pytest.mark.parametrize('method,path,status', [
+    ('GET', '/api/missing', 404),
+    ('GET', '/plain', 404),
+    ('DELETE', '/api/orders/1', 405),
+])
+def test_errors(method, path, status):
+    assert mux.dispatch(method, path).status_code == status
+
+
+def test_nested():
+    rv = app.test_client().get('/api/profile', headers={'Authorization': 'bob'})
+    assert rv.json == {
+        'me': {'user': 'bob'},
+        'orders': [{'id': 1, 'expand': None}, {'id': 2, 'expand': None}],
+        'path': '/api/profile',
+    }
@@ -0,0 +1,91 @@
+import pytest
+from flask import Flask, request, url_for
+from flask_mux import Mux, Router
+from testing.common import is_auth
+from testing.test_cases.router import api_router
+
+
+def get_users():
+    return {'view': 'users', 'rule': request.url_rule.rule}
+
+
+def get_user(id):
+    return {'view': 'user', 'id': id, 'rule': request.url_rule.rule}
+
+
+def create_user():
+    return {'view': 'create'}, 201
+
+
+users_router = Router(__name__)
+users_router.get('/', get_users)
+users_router.post('/', is_auth, create_user)
+users_router.get('/<int:id>', get_user)
+
+
+@pytest.fixture(params=['static', None])
+def mux(request):
+    app = Flask(__name__)
+    mux = Mux(app, dispatcher=request.param)
+    mux.use('/users', users_router, isolated=True)
+    mux.use('/api', api_router)
+    return mux
+
+
+@pytest.fixture
+def client(mux: Mux):
+    return mux.app.test_client()
+
+
+def test_own_url_map(mux: Mux):
+    rules = {rule.rule for rule in mux.app.url_map.iter_rules()}
+    assert '/users/<int:id>' not in rules
+    assert '/api/users' in rules
+
+    isolated_router = mux.isolated['/users']
+    assert isolated_router.loaded
+    assert {rule.rule for rule in isolated_router.url_map.iter_rules()} == {'/users/', '/users/<int:id>'}
+    assert len(mux.rules['users']) == len(users_router.routes)
+
+
+def test_routing(client):
+    assert client.get('/users/').json == {'view': 'users', 'rule': '/users/'}
+    assert client.get('/users/3').json == {'view': 'user', 'id': 3, 'rule': '/users/<int:id>'}
+    assert client.post('/users/').status_code == 401
+    assert client.post('/users/', headers={'Authorization': 'x'}).status_code == 201
+    assert client.delete('/users/3').status_code == 405
+    assert client.get('/users/unknown').status_code == 404
+    assert client.get('/users').status_code == 308
+    assert client.get('/api/users').status_code == 200
+
+
+def test_options(client):
+    rv = client.options('/users/3')
+    assert rv.status_code == 200
+    assert set(rv.headers['Allow'].split(', ')) == {'GET', 'HEAD', 'OPTIONS'}
+
+
+def test_url_for(mux: Mux):
+    with mux.app.test_request_context():
+        assert url_for('users.get_user', id=3) == '/users/3'
+        assert url_for('users.create_user') == '/users/'
+        assert mux.url_for('users.get_user', id=3, page=2) == '/users/3?page=2'
+
+
+def test_url_for_arguments(mux: Mux):
+    with mux.app.test_request_context(base_url='http://example.com/root/'):
+        assert url_for('users.get_user', id=3, _external=True) == 'http://example.com/root/users/3'
+        assert url_for('users.get_user', id=3, _external=True, _scheme='https') == 'https://example.com/root/users/3'
+        assert url_for('users.get_user', id=3, _anchor='a b') == '/root/users/3#a%20b'
+        assert url_for('users.create_user', _method='POST') == '/root/users/'
+
+    mux.app.config['SERVER_NAME'] = 'api.example.com'
+    with mux.app.app_context():
+        assert url_for('users.get_user', id=3) == 'http://api.example.com/users/3'
+
+
+def test_isolation(mux: Mux):
+    url_map = mux.isolated['/users'].url_map
+    mux.use('/admin', Router(__name__))
+    mux.app.test_client().get('/users/')
+    assert mux.isolated['/users'].url_map is url_map
@@ -0,0 +1,62 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from flask import Flask, url_for
+from flask_mux import Mux
+from testing.common import is_admin
+
+LAZY_MODULE = 'testing.test_cases.lazy'
+
+
+@pytest.fixture
+def mux():
+    sys.modules.pop(LAZY_MODULE, None)
+    app = Flask(__name__)
+    mux = Mux(app)
+    mux.use('/reports', f'{LAZY_MODULE}:reports_router', lazy=True)
+    return mux
+
+
+def test_import_on_first_request(mux: Mux):
+    assert LAZY_MODULE not in sys.modules
+    assert not mux.rules.get('reports')
+
+    resp = mux.app.test_client().get('/reports/42')
+    assert resp.status_code == 200
+    assert resp.json == {'success': True, 'id': 42, 'rule': '/reports/<int:id>'}
+    assert LAZY_MODULE in sys.modules
+    assert len(mux.rules.get('reports')) == 3
+
+
+def test_routing(mux: Mux):
+    client = mux.app.test_client()
+    assert client.get('/reports/').json.get('url') == '/reports/1'
+    assert client.get('/reports/unknown').status_code == 404
+    assert client.get('/reports/new').status_code == 405
+    assert client.post('/reports/new').status_code == 401
+    assert client.post('/reports/new', headers={'Authorization': 'x'}).status_code == 200
+
+
+def test_concurrent_load(mux: Mux):
+    client = mux.app.test_client()
+    with ThreadPoolExecutor(8) as executor:
+        codes = list(executor.map(lambda id: client.get(f'/reports/{id}').status_code, range(32)))
+    assert codes == [200] * 32
+    assert len(mux.rules.get('reports')) == 3
+
+
+def test_warmup(mux: Mux):
+    mux.warmup()
+    assert mux.lazy['/reports'].loaded
+    with mux.app.test_request_context():
+        assert url_for('reports.get_report', id=3) == '/reports/3'
+
+
+def test_shared_mws():
+    sys.modules.pop(LAZY_MODULE, None)
+    app = Flask(__name__)
+    Mux(app).use('/reports', f'{LAZY_MODULE}:reports_router', is_admin, lazy=True)
+    client = app.test_client()
+
+    assert client.get('/reports/1').status_code == 403
+    assert client.get('/reports/1', headers={'admin': 'Mehdi'}).status_code == 200
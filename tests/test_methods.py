@@ -0,0 +1,98 @@
+import asyncio
+import pytest
+from flask import Flask, request, url_for
+from flask_mux import Mux, Router
+from flask_mux.methods import MethodTable
+from testing.common import is_auth
+
+
+def get_articles():
+    return {'view': 'get_articles'}
+
+
+def create_article():
+    return {'view': 'create_article'}, 201
+
+
+async def update_article(id):
+    await asyncio.sleep(0)
+    return {'view': 'update_article', 'id': id}
+
+
+def get_article(id):
+    return {'view': 'get_article', 'id': id}
+
+
+def handler():
+    return {'view': 'handler', 'rule': request.url_rule.rule}
+
+
+articles_router = Router(__name__)
+articles_router.get('/', get_articles)
+articles_router.post('/', is_auth, create_article)
+articles_router.get('/<int:id>', get_article)
+articles_router.put('/<int:id>', update_article)
+articles_router.get('/latest', handler)
+articles_router.get('/drafts', is_auth, handler)
+
+
+@pytest.fixture(params=['use', 'use_many'])
+def mux(request):
+    app = Flask(__name__)
+    mux = Mux(app)
+    if request.param == 'use':
+        mux.use('/articles', articles_router)
+    else:
+        mux.use_many({'/articles': articles_router})
+    return mux
+
+
+@pytest.fixture
+def client(mux: Mux):
+    return mux.app.test_client()
+
+
+def test_single_rule_per_path(mux: Mux):
+    rules = [rule for rule in mux.app.url_map.iter_rules() if rule.endpoint != 'static']
+    assert sorted(rule.rule for rule in rules) == [
+        '/articles/', '/articles/<int:id>', '/articles/drafts', '/articles/latest'
+    ]
+    assert len(mux.rules['articles']) == len(articles_router.routes)
+
+    table = mux.app.view_functions['articles.get_articles']
+    assert isinstance(table, MethodTable)
+    assert table.methods == ('GET', 'HEAD', 'POST')
+
+
+def test_dispatch(client):
+    assert client.get('/articles/').json == {'view': 'get_articles'}
+    assert client.post('/articles/').status_code == 401
+    assert client.post('/articles/', headers={'Authorization': 'token'}).status_code == 201
+    assert client.get('/articles/3').json == {'view': 'get_article', 'id': 3}
+    assert client.put('/articles/3').json == {'view': 'update_article', 'id': 3}
+    assert client.head('/articles/').status_code == 200
+
+
+def test_method_not_allowed(client):
+    rv = client.delete('/articles/3')
+    assert rv.status_code == 405
+    assert set(rv.headers['Allow'].split(', ')) == {'GET', 'HEAD', 'OPTIONS', 'PUT'}
+
+
+def test_unique_endpoints(mux: Mux, client):
+    assert 'articles.handler' in mux.app.view_functions
+    assert 'articles.handler_2' in mux.app.view_functions
+    assert client.get('/articles/latest').json == {'view': 'handler', 'rule': '/articles/latest'}
+    assert client.get('/articles/drafts').status_code == 401
+
+
+@pytest.mark.parametrize('endpoint,values,url', [
+    ('articles.get_articles', {}, '/articles/'),
+    ('articles.create_article', {'page': 2}, '/articles/?page=2'),
+    ('articles.update_article', {'id': 3}, '/articles/3'),
+    ('articles.handler', {}, '/articles/latest'),
+])
+def test_url_for_aliases(mux: Mux, endpoint, values, url):
+    with mux.app.test_request_context():
+        assert mux.url_for(endpoint, **values) == url
+        assert url_for(endpoint, **values) == url
@@ -0,0 +1,101 @@
+import time
+from functools import wraps
+import pytest
+from flask import Flask
+from flask_mux import Mux, Router
+from flask_mux.metrics import Timer
+from testing.common import is_auth
+
+
+def slow(next_middleware):
+    @wraps(next_middleware)
+    def wrapper(*args, **kwargs):
+        time.sleep(0.02)
+        return next_middleware(*args, **kwargs)
+    return wrapper
+
+
+def get_me():
+    return {'success': True}
+
+
+def get_other():
+    return {'success': True}
+
+
+metrics_router = Router(__name__)
+metrics_router.use(slow)
+metrics_router.get('/me', is_auth, get_me)
+
+
+@pytest.fixture
+def mux():
+    app = Flask(__name__)
+    mux = Mux(app, instrument=True)
+    mux.use('/auth', metrics_router)
+    return mux
+
+
+def test_disabled():
+    app = Flask(__name__)
+    mux = Mux(app)
+    router = Router(__name__)
+    router.get('/other', get_other)
+    mux.use('/', router)
+    assert mux.metrics is None
+    assert mux.rules[''][0].view_func is get_other
+
+
+def test_stages(mux: Mux):
+    client = mux.app.test_client()
+    for _ in range(3):
+        client.get('/auth/me', headers={'Authorization': 'whatever'})
+    client.get('/auth/me')
+
+    stats = mux.metrics.percentiles('GET /auth/me')
+    assert set(stats) == {'slow', 'is_auth', 'get_me', 'total'}
+    assert stats['slow']['count'] == 4
+    assert stats['is_auth']['count'] == 4
+    assert stats['get_me']['count'] == 3
+
+    # the time spent in the following stages is not accounted for
+    assert stats['slow']['p50'] >= 20
+    assert stats['is_auth']['p99'] < 20
+    assert stats['total']['p50'] >= stats['slow']['p50']
+
+
+def test_summary(mux: Mux):
+    mux.app.test_client().get('/auth/me')
+    assert 'GET /auth/me' in mux.metrics.summary()
+
+    mux.metrics.reset()
+    assert mux.metrics.percentiles('GET /auth/me')['total']['count'] == 0
+
+
+def test_timer_percentiles():
+    timer = Timer(size=100)
+    for ms in range(1, 101):
+        timer.record(ms / 1000)
+
+    stats = timer.percentiles((50, 99))
+    assert stats['count'] == 100
+    assert round(stats['p50']) == 51
+    assert round(stats['p99']) == 99
+
+
+def test_compiled_once():
+    calls = []
+
+    def counting(next_middleware):
+        calls.append('counting')
+        return next_middleware
+
+    router = Router(__name__)
+    router.get('/counted', counting, get_other)
+    app = Flask(__name__)
+    mux = Mux(app, instrument=True)
+    mux.use('/', router, is_auth)
+
+    assert calls == ['counting']
+    assert app.test_client().get('/counted', headers={'Authorization': 'x'}).status_code == 200
+    assert set(mux.metrics.percentiles('GET /counted')) == {'is_auth', 'counting', 'get_other', 'total'}
@@ -0,0 +1,108 @@
+from functools import partial, wraps
+from flask import Flask
+from flask_mux import Mux, Router
+from flask_mux.pipeline import compile_pipeline
+
+
+def counting_middleware(calls, name):
+    def middleware(next_middleware):
+        calls.append(name)
+
+        @wraps(next_middleware)
+        def wrapper(*args, **kwargs):
+            calls.append(f'{name}:request')
+            return next_middleware(*args, **kwargs)
+        return wrapper
+    return middleware
+
+
+def test_compile_order():
+    calls = []
+    pipeline = compile_pipeline(
+        lambda: calls.append('view') or 'ok',
+        [counting_middleware(calls, 'first'), counting_middleware(calls, 'second')]
+    )
+    assert calls == ['second', 'first']
+
+    calls.clear()
+    assert pipeline() == 'ok'
+    assert calls == ['first:request', 'second:request', 'view']
+
+
+def test_compiled_once():
+    calls = []
+    router = Router(__name__)
+    router.get(
+        '/compiled',
+        counting_middleware(calls, 'first'),
+        counting_middleware(calls, 'second'),
+        lambda: {'success': True}
+    )
+    app = Flask(__name__)
+    Mux(app).use('/', router)
+    client = app.test_client()
+
+    calls.clear()
+    for _ in range(3):
+        assert client.get('/compiled').status_code == 200
+    assert calls == ['first:request', 'second:request'] * 3
+
+
+def test_view_args():
+    router = Router(__name__)
+    router.get(
+        '/users/<int:id>',
+        counting_middleware([], 'mw'),
+        lambda id: {'id': id}
+    )
+    app = Flask(__name__)
+    Mux(app).use('/', router)
+
+    resp = app.test_client().get('/users/7')
+    assert resp.json.get('id') == 7
+
+
+def async_wrapper_of(calls, next_middleware):
+    @wraps(next_middleware)
+    async def wrapper(*args, **kwargs):
+        calls.append('wrapper:request')
+        return await next_middleware(*args, **kwargs)
+    return wrapper
+
+
+def counting_async_middleware(calls):
+    def middleware(next_middleware):
+        calls.append('async')
+
+        @wraps(next_middleware)
+        async def wrapper(*args, **kwargs):
+            calls.append('async:request')
+            return await next_middleware(*args, **kwargs)
+        return wrapper
+    return middleware
+
+
+def build_async_wrapper(calls, next_middleware):
+    # the wrapper isn't defined by the middleware itself
+    calls.append('factory')
+    return async_wrapper_of(calls, next_middleware)
+
+
+def test_factories_called_once():
+    calls = []
+    router = Router(__name__)
+    router.get(
+        '/mixed',
+        counting_async_middleware(calls),
+        counting_middleware(calls, 'sync'),
+        partial(build_async_wrapper, calls),
+        counting_middleware(calls, 'inner'),
+        lambda: {'success': True}
+    )
+    app = Flask(__name__)
+    Mux(app).use('/', router)
+    assert calls == ['inner', 'factory', 'sync', 'async']
+
+    calls.clear()
+    assert app.test_client().get('/mixed').json == {'success': True}
+    assert calls == ['async:request', 'sync:request', 'wrapper:request', 'inner:request']
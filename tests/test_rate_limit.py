@@ -0,0 +1,103 @@
+import multiprocessing
+import time
+import pytest
+from flask import Flask, request
+from flask_mux import Mux, Router
+from flask_mux.middlewares import rate_limit
+from flask_mux.middlewares.ratelimit import SharedTokenBuckets, TokenBuckets
+
+
+def handler():
+    return {'success': True}
+
+
+async def async_handler():
+    return {'success': True}
+
+
+def create_client(limiter, view=handler):
+    router = Router(__name__)
+    router.get('/limited', limiter, view)
+    app = Flask(__name__)
+    Mux(app).use('/', router)
+    return app.test_client()
+
+
+def test_limit():
+    limiter = rate_limit(2, per=60)
+    client = create_client(limiter)
+
+    assert client.get('/limited').status_code == 200
+    assert client.get('/limited').status_code == 200
+    rv = client.get('/limited')
+    assert rv.status_code == 429
+    assert rv.json == {'success': False, 'message': 'too many requests'}
+    assert rv.headers['Retry-After'] == '30'
+    assert limiter.limited == 1
+
+    other = {'REMOTE_ADDR': '10.0.0.2'}
+    assert client.get('/limited', environ_base=other).status_code == 200
+
+
+def test_async_chain():
+    client = create_client(rate_limit(1, per=60), async_handler)
+    assert client.get('/limited').status_code == 200
+    assert client.get('/limited').status_code == 429
+
+
+def test_key():
+    limiter = rate_limit(1, per=60, key=lambda: request.headers.get('X-Api-Key'))
+    client = create_client(limiter)
+
+    assert client.get('/limited', headers={'X-Api-Key': 'a'}).status_code == 200
+    assert client.get('/limited', headers={'X-Api-Key': 'a'}).status_code == 429
+    assert client.get('/limited', headers={'X-Api-Key': 'b'}).status_code == 200
+    assert client.get('/limited').status_code == 200
+    assert client.get('/limited').status_code == 200
+
+
+@pytest.mark.parametrize('create', [
+    lambda tmp_path: TokenBuckets(rate=20, burst=2),
+    lambda tmp_path: SharedTokenBuckets(str(tmp_path / 'buckets'), rate=20, burst=2),
+])
+def test_refill(tmp_path, create):
+    buckets = create(tmp_path)
+    assert buckets.acquire('key') == buckets.acquire('key') == 0
+    assert 0 < buckets.acquire('key') <= 0.05
+    time.sleep(0.06)
+    assert buckets.acquire('key') == 0
+
+
+def test_sweep():
+    buckets = TokenBuckets(rate=1000, burst=1, max_keys=4)
+    for i in range(4):
+        buckets.acquire(str(i))
+    time.sleep(0.01)
+    buckets.acquire('last')
+    assert list(buckets._buckets) == ['last']
+
+
+def test_shared_slots(tmp_path):
+    buckets = SharedTokenBuckets(str(tmp_path / 'buckets'), rate=0.01, burst=1, slots=8)
+    for i in range(32):
+        assert buckets.acquire(str(i)) == 0
+    assert buckets.acquire('31') > 0
+
+
+def consume(filename, count, queue):
+    buckets = SharedTokenBuckets(filename, rate=0.01, burst=10)
+    queue.put([buckets.acquire('key') == 0 for _ in range(count)])
+
+
+def test_shared_across_processes(tmp_path):
+    filename = str(tmp_path / 'buckets')
+    context = multiprocessing.get_context('fork')
+    queue = context.Queue()
+    workers = [context.Process(target=consume, args=(filename, 4, queue)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    allowed = sum(sum(queue.get(timeout=10)) for _ in workers)
+    for worker in workers:
+        worker.join()
+
+    assert allowed == 10
@@ -0,0 +1,32 @@
+import pytest
+from flask_mux import Router
+from flask_mux.mux import Rule
+from testing.test_cases.router import handler
+
+
+def test_interned_methods():
+    router = Router(__name__)
+    router.get('/a', handler)
+    router.get('/b', handler)
+    router.handle('/c', handler)
+    router.handle('/d', handler)
+
+    a, b, c, d = router.routes
+    assert a.http_methods == ('GET',)
+    assert a.http_methods is b.http_methods
+    assert c.http_methods == ('DELETE', 'GET', 'PATCH', 'POST', 'PUT')
+    assert c.http_methods is d.http_methods
+
+
+def test_immutable():
+    router = Router(__name__)
+    router.get('/a', handler)
+    route = router.routes[0]
+    rule = Rule.create_from_route(route)
+
+    for record in (route, rule):
+        assert not hasattr(record, '__dict__')
+        with pytest.raises(AttributeError):
+            record.view_func = None
+        with pytest.raises(AttributeError):
+            del record.view_func
@@ -0,0 +1,69 @@
+import pytest
+from flask import Flask, url_for
+from flask_mux import Mux, Router
+from testing.test_cases.router import auth_router, api_router
+
+
+def get_article(id, slug):
+    return {'id': id, 'slug': slug}
+
+
+def get_file(name):
+    return {'name': name}
+
+
+articles_router = Router(__name__)
+articles_router.get('/<int:id>/<slug>', get_article)
+articles_router.get('/files/<string(length=8):name>', get_file)
+articles_router.get('/café au lait/<int:id>/a+b|c', get_article)
+
+
+@pytest.fixture
+def mux():
+    app = Flask(__name__)
+    mux = Mux(app)
+    mux.use('/auth', auth_router)
+    mux.use('/api', api_router)
+    mux.use('/articles', articles_router)
+    return mux
+
+
+def test_find(mux: Mux):
+    rule = mux.find('api', 'handler', 'put')
+    assert rule.rule == '/articles'
+    assert rule.methods == ('PUT',)
+
+    assert mux.find('articles', 'get_article').rule == '/<int:id>/<slug>'
+    assert mux.find('api', 'handler', 'DELETE') is None
+    assert mux.find('admin', 'handler') is None
+
+
+def test_find_shared_view(mux: Mux):
+    # /login and /join are both handled by handler
+    assert mux.find('auth', 'handler', 'POST').rule == '/login'
+    assert mux.find('auth', 'handler_2', 'POST').rule == '/join'
+    assert mux.find('auth', 'handler_3').rule == '/logout'
+    assert 'auth.handler_2' in mux.app.view_functions
+
+
+@pytest.mark.parametrize('endpoint,values', [
+    ('articles.get_article', {'id': 3, 'slug': 'hello world'}),
+    ('articles.get_article', {'id': 3, 'slug': 'x', 'page': 2, 'tag': ['a', 'b']}),
+    ('articles.get_article', {'id': 3, 'slug': 'x', 'page': None}),
+    ('articles.get_file', {'name': 'abcdefgh'}),
+    ('api.handler', {}),
+    ('articles.get_article_2', {'id': 1}),
+])
+def test_url_for(mux: Mux, endpoint, values):
+    with mux.app.test_request_context(base_url='http://localhost/root'):
+        assert mux.url_for(endpoint, **values) == url_for(endpoint, **values)
+
+
+def test_url_for_fallback(mux: Mux):
+    endpoint = 'articles.get_article'
+    with mux.app.test_request_context():
+        assert mux.url_for(endpoint, id=1, slug='x', _external=True) == 'http://localhost/articles/1/x'
+        assert mux.url_for('static', filename='a.css') == '/static/a.css'
+        assert mux.url_for('articles.get_file', name='abcdefgh') == '/articles/files/abcdefgh'
+    assert mux._url_builders[endpoint] is not None
+    assert mux._url_builders['articles.get_file'] is None
@@ -0,0 +1,68 @@
+import pytest
+from flask import Flask, request
+from flask.testing import FlaskClient
+from flask_mux import Mux, Router
+from flask_mux.errors import MissingHandlerError, UncallableMiddlewareError
+from testing.common import is_auth, is_admin, is_json
+
+
+def get_users():
+    return {'success': True, 'admin': request.headers.get('admin')}
+
+
+def post_users():
+    return {'success': True, 'req_body': request.json}
+
+
+admin_router = Router(__name__)
+admin_router.get('/users', get_users)
+admin_router.use(is_admin)
+admin_router.post('/users', is_json, post_users)
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    mux = Mux(app)
+    mux.use('/admin', admin_router, is_auth)
+    return app.test_client()
+
+
+def test_shared_mws(client: FlaskClient):
+    headers = {'Authorization': 'whatever', 'admin': 'Mehdi'}
+    resp = client.get('/admin/users', headers=headers)
+    assert resp.status_code == 200
+    assert resp.json.get('admin') == headers.get('admin')
+
+
+def test_shared_mws_order(client: FlaskClient):
+    resp = client.get('/admin/users', headers={'admin': 'Mehdi'})
+    assert resp.status_code == 401
+
+    resp = client.get('/admin/users', headers={'Authorization': 'whatever'})
+    assert resp.status_code == 403
+
+
+def test_route_mws(client: FlaskClient):
+    headers = {'Authorization': 'whatever', 'admin': 'Mehdi'}
+    body = {'message': 'samcro'}
+    resp = client.post('/admin/users', headers=headers, json=body)
+    assert resp.status_code == 200
+    assert resp.json.get('req_body') == body
+
+    resp = client.post('/admin/users', headers=headers)
+    assert resp.status_code == 400
+
+
+def test_uncallable_mws():
+    router = Router(__name__)
+    with pytest.raises(UncallableMiddlewareError):
+        router.use(is_auth, 'is_admin')
+
+    with pytest.raises(UncallableMiddlewareError):
+        Mux(Flask(__name__)).use('/', router, None)
+
+
+def test_missing_mws():
+    with pytest.raises(MissingHandlerError, match='no middleware was provided to Router.use'):
+        Router(__name__).use()
@@ -0,0 +1,136 @@
+import gc
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from flask import Flask
+from flask_mux import Mux, Router
+from flask_mux.errors import MuxError
+from testing.common import is_auth
+from testing.test_cases.router import api_router
+
+
+def search():
+    return {'view': 'search'}
+
+
+def create_search():
+    return {'view': 'create_search'}, 201
+
+
+def get_feature(id):
+    return {'view': 'feature', 'id': id}
+
+
+def get_feature_v2(id):
+    return {'view': 'feature_v2', 'id': id}
+
+
+def create_router(view):
+    router = Router(__name__)
+    router.get('/<int:id>', view)
+    return router
+
+
+@pytest.fixture
+def mux():
+    app = Flask(__name__)
+    mux = Mux(app)
+    mux.use('/beta', create_router(get_feature), isolated=True)
+    mux.use('/api', api_router)
+    return mux
+
+
+@pytest.fixture
+def client(mux: Mux):
+    return mux.app.test_client()
+
+
+def test_add_route(mux: Mux, client):
+    assert client.get('/beta/search').status_code == 404
+
+    mux.add_route('/beta', '/search', search)
+    assert client.get('/beta/search').json == {'view': 'search'}
+    assert client.post('/beta/search').status_code == 405
+
+    mux.add_route('/beta', '/search', is_auth, create_search, methods=['POST'])
+    assert client.post('/beta/search').status_code == 401
+    assert client.post('/beta/search', headers={'Authorization': 'x'}).status_code == 201
+    assert client.get('/beta/3').json == {'view': 'feature', 'id': 3}
+
+    with mux.app.test_request_context():
+        assert mux.url_for('beta.search') == '/beta/search'
+        assert mux.url_for('beta.create_search', page=2) == '/beta/search?page=2'
+    assert mux.find('beta', 'create_search', 'POST').rule == '/search'
+
+
+def test_remove_route(mux: Mux, client):
+    mux.add_route('/beta', '/search', search, methods=['GET', 'POST'])
+
+    assert mux.remove_route('/beta', '/search', ['POST'])
+    assert client.get('/beta/search').status_code == 200
+    assert client.post('/beta/search').status_code == 405
+
+    assert mux.remove_route('/beta', '/search')
+    assert client.get('/beta/search').status_code == 404
+    assert mux.find('beta', 'search') is None
+    assert not mux.remove_route('/beta', '/search')
+    assert client.get('/beta/3').status_code == 200
+
+
+def test_endpoints_stay_stable(mux: Mux, client):
+    for _ in range(3):
+        mux.add_route('/beta', '/search', search)
+        mux.remove_route('/beta', '/search')
+    mux.add_route('/beta', '/search', search)
+    assert 'beta.search_2' not in mux.app.view_functions
+    assert client.get('/beta/search').status_code == 200
+
+
+def test_replace_router(mux: Mux, client):
+    mux.replace_router('/beta', create_router(get_feature_v2))
+    assert client.get('/beta/3').json == {'view': 'feature_v2', 'id': 3}
+    assert [mount[0] for mount in mux.mounts].count('/beta') == 1
+
+
+def test_matched_before_replace(mux: Mux):
+    # same endpoint, different view function
+    def get_feature(name):
+        return {'view': 'feature_by_name', 'name': name}
+
+    router = Router(__name__)
+    router.get('/<name>', get_feature)
+    with mux.app.test_request_context('/beta/3'):
+        mux.replace_router('/beta', router)
+        assert mux.app.full_dispatch_request().json == {'view': 'feature', 'id': 3}
+    assert mux.app.test_client().get('/beta/3').json == {'view': 'feature_by_name', 'name': '3'}
+
+
+def test_concurrent_replace(mux: Mux, client):
+    routers = [create_router(get_feature), create_router(get_feature_v2)]
+
+    def request(i):
+        if i % 8 == 0:
+            mux.replace_router('/beta', routers[i % 16 == 0])
+        return client.get(f'/beta/{i}').status_code
+
+    with ThreadPoolExecutor(8) as executor:
+        codes = list(executor.map(request, range(256)))
+    assert codes == [200] * 256
+
+
+def test_not_isolated(mux: Mux):
+    with pytest.raises(MuxError):
+        mux.add_route('/api', '/search', search)
+    with pytest.raises(MuxError):
+        mux.replace_router('/unknown', create_router(get_feature))
+
+
+@pytest.fixture
+def unfreeze():
+    yield
+    gc.unfreeze()
+
+
+def test_frozen(mux: Mux, unfreeze):
+    mux.freeze()
+    with pytest.raises(MuxError):
+        mux.add_route('/beta', '/search', search)
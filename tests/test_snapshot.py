@@ -0,0 +1,113 @@
+import json
+import pytest
+from flask import Flask
+from flask_mux import Mux, Router
+from flask_mux.errors import MuxError
+from testing.common import is_auth
+from testing.test_cases.decorator import tc_mw_router
+from testing.test_cases.middlewares import test_mws_router
+from testing import test_router
+
+
+def get_users():
+    return {'success': True}
+
+
+def post_users():
+    return {'success': True}
+
+
+api_router = Router(__name__)
+api_router.get('/users', get_users)
+api_router.post('/users', post_users)
+
+
+@pytest.fixture
+def filename(tmp_path):
+    app = Flask(__name__)
+    mux = Mux(app)
+    mux.use('/', test_mws_router)
+    mux.use('/api', api_router, is_auth)
+    mux.use('/reports', 'testing.test_cases.lazy:reports_router', lazy=True)
+    mux.use_many({'/decorator': tc_mw_router})
+
+    filename = str(tmp_path / 'routes.snapshot')
+    mux.save_snapshot(filename)
+    return filename
+
+
+@pytest.fixture
+def mux(filename):
+    app = Flask(__name__)
+    mux = Mux(app)
+    assert mux.load_snapshot(filename)
+    return mux
+
+
+def test_rules(mux: Mux):
+    assert len(mux.rules.get('')) == len(test_mws_router.routes)
+    assert len(mux.rules.get('api')) == len(api_router.routes)
+    assert len(mux.rules.get('decorator')) == len(tc_mw_router.routes)
+    assert '/reports' in mux.lazy
+
+
+def test_routes(mux: Mux):
+    client = mux.app.test_client()
+    test_router.test_extra_mws(client, 'patch')
+    test_router.test_extra_mws_failing_3(client, 'patch')
+
+    assert client.get('/api/users').status_code == 401
+    assert client.get('/api/users', headers={'Authorization': 'x'}).status_code == 200
+    assert client.get('/reports/1').status_code == 200
+
+    headers = {'Authorization': 'x', 'admin': 'Mehdi'}
+    assert client.post('/decorator/multi-mws', headers=headers, json={}).status_code == 200
+    assert client.post('/decorator/multi-mws', headers=headers).status_code == 400
+
+
+def test_stale(filename):
+    with open(filename) as f:
+        snapshot = json.load(f)
+    snapshot['modules']['testing.common'] = 'outdated'
+    with open(filename, 'w') as f:
+        json.dump(snapshot, f)
+
+    mux = Mux(Flask(__name__))
+    assert not mux.load_snapshot(filename)
+    assert not mux.rules
+
+
+def test_missing(tmp_path):
+    mux = Mux(Flask(__name__))
+    assert not mux.load_snapshot(str(tmp_path / 'missing.snapshot'))
+
+
+def test_not_importable(tmp_path):
+    router = Router(__name__)
+    router.get('/', lambda: {'success': True})
+    mux = Mux(Flask(__name__))
+    mux.use('/', router)
+
+    with pytest.raises(MuxError):
+        mux.save_snapshot(str(tmp_path / 'routes.snapshot'))
+
+
+def test_router_module(tmp_path):
+    router = Router('accounts')
+    router.get('/users', get_users)
+    assert router.module == __name__
+    mux = Mux(Flask(__name__))
+    mux.use('/accounts', router)
+
+    filename = str(tmp_path / 'routes.snapshot')
+    mux.save_snapshot(filename)
+    with open(filename) as f:
+        snapshot = json.load(f)
+    assert snapshot['modules'][__name__] is not None
+    assert 'accounts' not in snapshot['modules']
+
+    # e.g: a route added to or removed from the module creating the router
+    snapshot['modules'][__name__] = 'outdated'
+    with open(filename, 'w') as f:
+        json.dump(snapshot, f)
+    assert not Mux(Flask(__name__)).load_snapshot(filename)
@@ -0,0 +1,153 @@
+import asyncio
+from threading import Event
+import pytest
+from flask import Flask, current_app, request
+from flask_mux import Mux, Router
+from flask_mux.errors import MuxError
+from flask_mux.tasks import TaskPool, after_response
+
+done = []
+release = Event()
+
+
+def audit(action, user=None):
+    done.append((action, user, current_app.name))
+
+
+def blocked(action):
+    release.wait(5)
+    done.append(action)
+
+
+def failing():
+    raise RuntimeError('audit log unavailable')
+
+
+def create_order():
+    after_response(audit, 'order_created', user=request.headers.get('Authorization'))
+    after_response(audit, 'cache_warmed')
+    assert done == []
+    return {'success': True}, 201
+
+
+async def get_async_order():
+    after_response(audit, 'order_read')
+    await asyncio.sleep(0)
+    return {'success': True}
+
+
+def get_blocked():
+    after_response(blocked, request.args['id'])
+    return {'success': True}
+
+
+def get_failing():
+    after_response(failing)
+    after_response(audit, 'after_failure')
+    return {'success': True}
+
+
+router = Router(__name__)
+router.post('/orders', create_order)
+router.get('/orders', get_async_order)
+router.get('/blocked', get_blocked)
+router.get('/failing', get_failing)
+
+
+def create_app(tasks):
+    app = Flask(__name__)
+    mux = Mux(app, tasks=tasks)
+    mux.use('/', router)
+    return app, mux
+
+
+@pytest.fixture(autouse=True)
+def reset():
+    done.clear()
+    release.clear()
+    yield
+    release.set()
+
+
+def test_after_response():
+    app, mux = create_app(True)
+    rv = app.test_client().post('/orders', headers={'Authorization': 'alice'}, buffered=True)
+    assert rv.status_code == 201
+
+    assert mux.tasks.drain(5)
+    assert done == [('order_created', 'alice', app.name), ('cache_warmed', None, app.name)]
+    assert mux.tasks.stats()['completed'] == 2
+
+
+def test_async_view():
+    app, mux = create_app(True)
+    assert app.test_client().get('/orders', buffered=True).status_code == 200
+    assert mux.tasks.drain(5)
+    assert done == [('order_read', None, app.name)]
+
+
+def test_failure():
+    app, mux = create_app(TaskPool(workers=1))
+    assert app.test_client().get('/failing', buffered=True).status_code == 200
+    assert mux.tasks.drain(5)
+
+    stats = mux.tasks.stats()
+    assert (stats['completed'], stats['failed']) == (1, 1)
+    assert done == [('after_failure', None, app.name)]
+
+
+def test_backpressure():
+    pool = TaskPool(workers=1, max_queued=1, timeout=0.01)
+    app, mux = create_app(pool)
+    client = app.test_client()
+
+    for i in range(2):
+        client.get(f'/blocked?id={i}', buffered=True)
+    # the worker blocks on the first task and the second one is
+    # queued, the next tasks are run by the thread of the request
+    client.post('/orders', buffered=True)
+    assert [action for action, *_ in done] == ['order_created', 'cache_warmed']
+    assert pool.stats()['caller_ran'] == 2
+    assert pool.stats()['peak_queued'] == 1
+    assert not pool.drain(0.01)
+
+    release.set()
+    assert pool.drain(5)
+    assert done[2:] == ['0', '1']
+
+
+def test_shutdown():
+    app, mux = create_app(TaskPool(workers=2))
+    app.test_client().get('/blocked?id=1', buffered=True)
+    release.set()
+
+    assert mux.tasks.shutdown(5)
+    assert done == ['1']
+    assert mux.tasks.stats()['workers'] == 0
+    with app.app_context(), pytest.raises(MuxError):
+        after_response(audit, 'late')
+
+
+def test_no_pool():
+    app, _ = create_app(False)
+    with app.app_context(), pytest.raises(MuxError):
+        after_response(audit, 'orphan')
+
+
+def test_outside_request():
+    app, mux = create_app(True)
+    with app.app_context():
+        after_response(audit, 'startup')
+    assert mux.tasks.drain(5)
+    assert done == [('startup', None, app.name)]
+
+
+def test_shared_app_context():
+    app, mux = create_app(True)
+    client = app.test_client()
+    with app.app_context():
+        for _ in range(3):
+            assert client.get('/orders', buffered=True).status_code == 200
+    assert mux.tasks.drain(5)
+    assert done == [('order_read', None, app.name)] * 3
+    assert mux.tasks.stats()['completed'] == 3
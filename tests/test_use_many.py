@@ -0,0 +1,85 @@
+import pytest
+from flask import Flask, url_for
+from werkzeug.routing import Rule
+from flask_mux import Mux, Router
+from flask_mux.mux import _builds_like, lazy_rule_class
+from testing.test_cases.middlewares import test_mws_router
+from testing.test_cases.router import auth_router, api_router, admin_router
+from testing import test_router
+
+
+@pytest.fixture
+def mux():
+    app = Flask(__name__)
+    mux = Mux(app)
+    mux.use_many({
+        '/': test_mws_router,
+        '/auth': auth_router,
+        '/api': api_router,
+        '/admin': admin_router,
+    })
+    return mux
+
+
+@pytest.fixture
+def client(mux: Mux):
+    return mux.app.test_client()
+
+
+def test_registered(mux: Mux):
+    assert len(mux.rules.get('auth')) == len(auth_router.routes)
+    assert len(mux.rules.get('api')) == len(api_router.routes)
+    assert len(mux.rules.get('admin')) == len(admin_router.routes)
+
+
+def test_routes(client):
+    assert client.post('/auth/login').status_code == 200
+    assert client.get('/api/users').status_code == 200
+    assert client.get('/admin/login').status_code == 405
+    test_router.test_extra_mws(client, 'post')
+    test_router.test_extra_mws_failing_2(client, 'post')
+
+
+def test_url_for(mux: Mux):
+    with mux.app.test_request_context():
+        assert url_for('auth.handler').startswith('/auth/')
+        assert url_for('api.handler', page=2).endswith('?page=2')
+
+
+def test_lazy_rule_class():
+    class BrokenRule(Rule):
+        def _compile_builder(self, append_unknown=True):
+            return lambda *args, **kwargs: ('', '/broken')
+
+    assert lazy_rule_class(Rule) is not Rule
+    assert _builds_like(lazy_rule_class(Rule), Rule)
+    assert not _builds_like(BrokenRule, Rule)
+
+
+def test_rule_class_restored():
+    app = Flask(__name__)
+    router = Router(__name__)
+    router.get('/<unknown:id>', lambda id: id)
+    mux = Mux(app)
+
+    with pytest.raises(LookupError):
+        mux.use_many({'/': router})
+    with pytest.raises(LookupError):
+        mux.use('/api', router)
+    assert app.url_rule_class is Rule
+
+
+def test_failed_registration():
+    app = Flask(__name__)
+    router = Router(__name__)
+    router.get('/<unknown:id>', lambda id: id)
+    mux = Mux(app)
+
+    with pytest.raises(LookupError):
+        mux.use_many({'/auth': auth_router, '/broken': router})
+    with pytest.raises(LookupError):
+        mux.use('/broken', router)
+    assert not mux.mounts
+    assert not any(mux.rules.values())
+    assert not mux.url_rules and not mux.aliases and not mux.index
+    assert mux.find('auth', 'handler', 'POST') is None